@@ -7,7 +7,7 @@ from bs4 import BeautifulSoup
 from langdetect import detect, DetectorFactory
 from typing import List, Union, Set, Dict, Any, cast, Optional
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sentence_transformers import SentenceTransformer
+from src.embedding_backend import backend_options, backend_settings, get_sentence_encoder
 
 # Ensure langdetect produces consistent results
 DetectorFactory.seed = 0
@@ -96,8 +96,8 @@ class UltraTokenizerStopwordEngine:
         self.domain_keywords = domain_keywords if domain_keywords is not None else self._get_default_domain_keywords()
         self.nlp = self._load_spacy_model(default_model) # Load default model initially
 
-        # Initialize sentence transformer model for embeddings
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Initialize sentence transformer model for embeddings (backend set in config.yaml)
+        self.embedding_model = get_sentence_encoder('all-MiniLM-L6-v2', **backend_options(backend_settings()))
 
         if kwargs.get('custom_stopwords'):
             self.add_stopwords(kwargs['custom_stopwords'])
@@ -0,0 +1,78 @@
+"""dashboard stats rollup
+
+Per (day, job, status) match counts and score sums for the dashboard, kept
+current by triggers on matches (SQLite) and backfilled from existing matches.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+DAY = "COALESCE(date({row}.created_at), '1970-01-01')"
+JOB = "COALESCE({row}.job_id, 0)"
+STATUS = "COALESCE({row}.status, '')"
+
+def _add(row: str) -> str:
+    return (
+        "INSERT INTO dashboard_stats (day, job_id, status, match_count, score_sum) "
+        f"VALUES ({DAY}, {JOB}, {STATUS}, 1, COALESCE({{row}}.score, 0)) "
+        "ON CONFLICT (day, job_id, status) DO UPDATE SET "
+        "match_count = match_count + 1, score_sum = score_sum + excluded.score_sum;"
+    ).format(row=row)
+
+def _remove(row: str) -> str:
+    return (
+        "UPDATE dashboard_stats SET match_count = match_count - 1, "
+        "score_sum = score_sum - COALESCE({row}.score, 0) "
+        f"WHERE day = {DAY} AND job_id = {JOB} AND status = {STATUS};"
+    ).format(row=row)
+
+TRIGGERS = {
+    'trg_matches_stats_insert': f"AFTER INSERT ON matches BEGIN {_add('NEW')} END",
+    'trg_matches_stats_update': (
+        "AFTER UPDATE OF score, status, created_at, job_id ON matches "
+        f"BEGIN {_remove('OLD')} {_add('NEW')} END"
+    ),
+    'trg_matches_stats_delete': f"AFTER DELETE ON matches BEGIN {_remove('OLD')} END",
+}
+
+def upgrade() -> None:
+    op.create_table(
+        'dashboard_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.String(length=10), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('match_count', sa.Integer(), nullable=False),
+        sa.Column('score_sum', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'job_id', 'status', name='uq_dashboard_stats_key')
+    )
+
+    # Backfill from existing matches
+    op.execute(
+        "INSERT INTO dashboard_stats (day, job_id, status, match_count, score_sum) "
+        f"SELECT {DAY.format(row='matches')}, {JOB.format(row='matches')}, {STATUS.format(row='matches')}, "
+        "COUNT(*), COALESCE(SUM(score), 0) FROM matches "
+        f"GROUP BY {DAY.format(row='matches')}, {JOB.format(row='matches')}, {STATUS.format(row='matches')}"
+    )
+
+    # Other databases rely on the reconciler in app.core.dashboard_stats
+    if op.get_bind().dialect.name == 'sqlite':
+        for name, body in TRIGGERS.items():
+            op.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for name in TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table('dashboard_stats')
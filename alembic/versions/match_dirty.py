@@ -0,0 +1,40 @@
+"""match dirty queue
+
+Queue of (profile, job) pairs whose stored match must be recomputed by the
+rematch worker (app.core.rematch).
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'match_dirty',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('profile_id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('marked_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['profile_id'], ['profiles.id']),
+        sa.ForeignKeyConstraint(['job_id'], ['job_descriptions.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('profile_id', 'job_id', name='uq_match_dirty_pair')
+    )
+    op.create_index(op.f('ix_match_dirty_id'), 'match_dirty', ['id'], unique=False)
+    op.create_index(op.f('ix_match_dirty_marked_at'), 'match_dirty', ['marked_at'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_match_dirty_marked_at'), table_name='match_dirty')
+    op.drop_index(op.f('ix_match_dirty_id'), table_name='match_dirty')
+    op.drop_table('match_dirty')
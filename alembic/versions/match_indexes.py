@@ -0,0 +1,65 @@
+"""match indexes
+
+Composite indexes for the match listing, dashboard and re-matching queries,
+a unique (profile_id, job_id) index so matches can be upserted, and a NOT
+NULL created_at so keyset pages never skip or fail on undated matches.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+MATCH_INDEXES = [
+    ('ix_matches_score_id', ['score', 'id']),
+    ('ix_matches_created_at_id', ['created_at', 'id']),
+    ('ix_matches_job_id_score', ['job_id', 'score', 'id']),
+    ('ix_matches_status_score', ['status', 'score', 'id']),
+    ('ix_matches_user_id_created_at', ['user_id', 'created_at', 'id']),
+]
+
+def upgrade() -> None:
+    # Databases created from 001 predate matches.user_id
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('matches')}
+    if 'user_id' not in columns:
+        op.add_column('matches', sa.Column('user_id', sa.Integer(), nullable=True))
+
+    # Keep the newest match of each duplicated (profile, job) pair
+    op.execute(
+        """
+        DELETE FROM matches
+        WHERE profile_id IS NOT NULL AND job_id IS NOT NULL
+          AND id NOT IN (
+            SELECT MAX(id) FROM matches
+            WHERE profile_id IS NOT NULL AND job_id IS NOT NULL
+            GROUP BY profile_id, job_id
+          )
+        """
+    )
+    op.create_index('uq_matches_profile_job', 'matches', ['profile_id', 'job_id'], unique=True, if_not_exists=True)
+
+    # Keyset pagination seeks on (created_at, id) and (score, id); score is already NOT NULL
+    op.execute("UPDATE matches SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL")
+    with op.batch_alter_table('matches') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+    # (score, id) supersedes the single-column score index
+    op.drop_index('ix_matches_score', table_name='matches', if_exists=True)
+    for name, columns in MATCH_INDEXES:
+        op.create_index(name, 'matches', columns, unique=False, if_not_exists=True)
+
+def downgrade() -> None:
+    for name, _ in reversed(MATCH_INDEXES):
+        op.drop_index(name, table_name='matches', if_exists=True)
+    op.create_index('ix_matches_score', 'matches', ['score'], unique=False, if_not_exists=True)
+    with op.batch_alter_table('matches') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
+    op.drop_index('uq_matches_profile_job', table_name='matches', if_exists=True)
@@ -0,0 +1,34 @@
+"""profile skills
+
+Association between profiles and the skills extracted from them, backing the
+top-skills aggregation. Existing profiles are linked on application startup
+(app.core.skills.backfill_profile_skills).
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'profile_skills',
+        sa.Column('profile_id', sa.Integer(), nullable=False),
+        sa.Column('skill_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('profile_id', 'skill_id')
+    )
+    op.create_index('ix_profile_skills_skill_id', 'profile_skills', ['skill_id', 'profile_id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_profile_skills_skill_id', table_name='profile_skills')
+    op.drop_table('profile_skills')
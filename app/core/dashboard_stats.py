@@ -0,0 +1,195 @@
+"""
+Dashboard statistics read from the dashboard_stats rollup.
+
+The rollup holds a match count and score sum per (day, job, status). On
+SQLite, triggers on matches keep it current (see app.models.database), so the
+dashboard endpoints read a few rows per day instead of scanning matches. A
+background reconciler recomputes the rollup from matches to repair any
+drift. It also backfills existing databases and is the only maintenance on
+databases without the triggers.
+"""
+
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import String, cast, func
+from sqlalchemy.orm import Session
+
+from app.models.database import DashboardStat, Match
+
+logger = logging.getLogger(__name__)
+
+# Score sums are floats; differences below this are rounding, not drift
+SCORE_TOLERANCE = 1e-6
+
+
+def totals(db: Session) -> Dict[str, Any]:
+    """Total match count and average score."""
+    count, score_sum = db.query(
+        func.coalesce(func.sum(DashboardStat.match_count), 0),
+        func.coalesce(func.sum(DashboardStat.score_sum), 0.0)
+    ).one()
+    return {"total_matches": int(count), "average_score": float(score_sum) / count if count else 0.0}
+
+
+def status_totals(db: Session) -> Dict[str, Tuple[int, float]]:
+    """Match count and score sum per status."""
+    rows = db.query(
+        DashboardStat.status,
+        func.sum(DashboardStat.match_count),
+        func.sum(DashboardStat.score_sum)
+    ).group_by(DashboardStat.status).all()
+    return {status: (int(count), float(score_sum)) for status, count, score_sum in rows if count}
+
+
+def daily_counts(db: Session, since: date) -> List[Tuple[str, int]]:
+    """Matches created per day from since (inclusive), oldest first, skipping empty days."""
+    rows = db.query(DashboardStat.day, func.sum(DashboardStat.match_count)).filter(
+        DashboardStat.day >= since.isoformat()
+    ).group_by(DashboardStat.day).order_by(DashboardStat.day).all()
+    return [(day, int(count)) for day, count in rows if count]
+
+
+def _match_day():
+    """SQL expression for the rollup day of a match, as in the triggers."""
+    return func.coalesce(cast(func.date(Match.created_at), String), "1970-01-01")
+
+
+def _lock_for_write(db: Session) -> None:
+    """
+    On SQLite, take the database write lock before reading.
+
+    The triggers update the rollup on every match write; holding the lock
+    from the first read to the commit keeps them from landing between the
+    reads and the fix-up, where the absolute values written here would
+    overwrite them. Other databases have no triggers, so the reconciler is
+    the only writer of the rollup there.
+    """
+    connection = db.connection()
+    if connection.dialect.name == "sqlite" and not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def reconcile(db: Session, since: Optional[date] = None) -> int:
+    """
+    Recompute the rollup from matches and fix the rows that differ.
+
+    Both reads and the fix-up run in one write transaction.
+
+    Args:
+        db: Database session (committed on success)
+        since: Only reconcile days from this date (all days if None)
+
+    Returns:
+        Number of rollup rows inserted, corrected or deleted
+    """
+    _lock_for_write(db)
+    key = (_match_day(), func.coalesce(Match.job_id, 0), func.coalesce(Match.status, ""))
+    truth_query = db.query(*key, func.count(Match.id), func.coalesce(func.sum(Match.score), 0.0))
+    rollup_query = db.query(DashboardStat)
+    if since is not None:
+        truth_query = truth_query.filter(Match.created_at >= datetime.combine(since, datetime.min.time()))
+        rollup_query = rollup_query.filter(DashboardStat.day >= since.isoformat())
+
+    truth = {
+        (str(row_day)[:10], job_id, status): (count, float(score_sum))
+        for row_day, job_id, status, count, score_sum in truth_query.group_by(*key)
+    }
+    fixed = 0
+    for row in rollup_query.all():
+        count, score_sum = truth.pop((row.day, row.job_id, row.status), (0, 0.0))
+        if count == 0:
+            db.delete(row)
+            fixed += 1
+        elif row.match_count != count or abs(row.score_sum - score_sum) > SCORE_TOLERANCE:
+            row.match_count, row.score_sum = count, score_sum
+            fixed += 1
+    for (row_day, job_id, status), (count, score_sum) in truth.items():
+        db.add(DashboardStat(day=row_day, job_id=job_id, status=status, match_count=count, score_sum=score_sum))
+        fixed += 1
+    db.commit()
+    return fixed
+
+
+class DashboardStatsReconciler:
+    """Periodically reconciles the dashboard rollup, starting with a full pass."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval: float = 3600.0,
+        window_days: Optional[int] = None
+    ):
+        """
+        Initialize the reconciler.
+
+        Args:
+            session_factory: Creates database sessions
+            interval: Seconds between reconciliations
+            window_days: Days reconciled after the first full pass (all if None)
+        """
+        self.session_factory = session_factory
+        self.interval = interval
+        self.window_days = window_days
+        self.runs = 0
+        self.fixed = 0
+        self.last_run: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = asyncio.Event()
+
+    def run_once(self) -> int:
+        """Reconcile once; the first run always covers every day."""
+        since = None
+        if self.runs and self.window_days is not None:
+            since = date.today() - timedelta(days=self.window_days)
+        session = self.session_factory()
+        try:
+            fixed = reconcile(session, since)
+            if fixed:
+                logger.warning(f"Dashboard stats reconciler fixed {fixed} rollup rows")
+            self.runs += 1
+            self.fixed += fixed
+            self.last_run = datetime.utcnow()
+            return fixed
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error reconciling dashboard stats: {str(e)}")
+            raise
+        finally:
+            session.close()
+
+    async def run(self) -> None:
+        """Reconcile every interval seconds until stop() is called."""
+        while not self._stop.is_set():
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception:
+                pass
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> asyncio.Task:
+        """Start the reconciler loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._stop.clear()
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop the reconciler loop."""
+        self._stop.set()
+        if self._task is not None:
+            await self._task
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters for monitoring."""
+        return {
+            "runs": self.runs,
+            "fixed": self.fixed,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "running": self._task is not None and not self._task.done()
+        }
@@ -0,0 +1,85 @@
+"""
+Bulk writes for stored matches.
+
+A (profile, job) pair has at most one Match row (unique index
+uq_matches_profile_job), so computed scores are written with
+INSERT ... ON CONFLICT DO UPDATE instead of a check-then-insert.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.database import Match
+
+logger = logging.getLogger(__name__)
+
+# Columns a re-score overwrites; status and created_at of an existing match are kept
+UPSERT_FIELDS = ("score", "analysis", "updated_at")
+
+
+def _dialect_insert(session: Session):
+    """Return the insert() construct supporting on_conflict_do_update for the bound dialect, if any."""
+    name = session.get_bind().dialect.name
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    return None
+
+
+def upsert_matches(session: Session, rows: Sequence[Dict[str, Any]]) -> None:
+    """
+    Insert matches, or update score and analysis of the ones that already exist.
+
+    Args:
+        session: Database session (the caller commits)
+        rows: Match column values; each needs profile_id, job_id and score
+    """
+    if not rows:
+        return
+
+    now = datetime.utcnow()
+    rows = [
+        {"status": "pending", "created_at": now, "updated_at": now, **row}
+        for row in rows
+    ]
+    insert = _dialect_insert(session)
+    if insert is not None:
+        statement = insert(Match)
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[Match.profile_id, Match.job_id],
+                set_={field: getattr(statement.excluded, field) for field in UPSERT_FIELDS}
+            ),
+            rows
+        )
+        return
+
+    # Other databases: one lookup for the whole batch, then bulk update and insert
+    existing = {
+        (profile_id, job_id): match_id
+        for match_id, profile_id, job_id in session.execute(
+            select(Match.id, Match.profile_id, Match.job_id).where(
+                Match.profile_id.in_({row["profile_id"] for row in rows}),
+                Match.job_id.in_({row["job_id"] for row in rows})
+            )
+        )
+    }
+    updates: List[Dict[str, Any]] = []
+    inserts: List[Dict[str, Any]] = []
+    for row in rows:
+        match_id = existing.get((row["profile_id"], row["job_id"]))
+        if match_id is None:
+            inserts.append(row)
+        else:
+            updates.append({"id": match_id, **{field: row[field] for field in UPSERT_FIELDS if field in row}})
+    if updates:
+        session.execute(update(Match), updates)
+    if inserts:
+        session.execute(Match.__table__.insert(), inserts)
@@ -1,25 +1,35 @@
-from typing import Tuple, Dict, Any
+from typing import TYPE_CHECKING, Tuple, Dict, Any, List, Optional
 from fastapi import UploadFile
 import PyPDF2
 import docx
-import spacy
-from transformers import AutoTokenizer, AutoModel
-import torch
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+import asyncio
 import logging
-import json
+from src.embedding_store import get_embedding_store
+from src.embedding_service import EmbeddingService, get_embedding_service
+from src.skill_matcher import get_skill_matcher
+from src.model_registry import get_spacy_model
+from src.embedding_backend import (
+    EmbeddingBackend, backend_options, backend_settings, config_section, load_embedding_backend, store_version
+)
+from src.document_embedding import ChunkedEmbedder, chunking_options, max_sim, pooled_similarity, pooled_store_version
+
+if TYPE_CHECKING:
+    import spacy
 
 logger = logging.getLogger(__name__)
 
-# Load models
-try:
-    nlp = spacy.load("en_core_web_sm")
-    tokenizer = AutoTokenizer.from_pretrained("sentence-transformers/all-MiniLM-L6-v2")
-    model = AutoModel.from_pretrained("sentence-transformers/all-MiniLM-L6-v2")
-except Exception as e:
-    logger.error(f"Error loading models: {str(e)}")
-    raise
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Models come from the shared registry and are loaded on first use
+def get_nlp():
+    """Get the spaCy pipeline."""
+    return get_spacy_model("en_core_web_sm")
+
+def get_backend() -> EmbeddingBackend:
+    """Get the embedding backend (fp32, int8 or ONNX as set in config.yaml)."""
+    options = backend_options(backend_settings())
+    return load_embedding_backend(EMBEDDING_MODEL, device="cpu", max_length=512, normalize=False, **options)
 
 async def extract_text_from_pdf(file: UploadFile) -> str:
     """Extract text from PDF file."""
@@ -70,7 +80,7 @@ async def process_document(file: UploadFile) -> Tuple[str, Dict[str, Any]]:
             raise ValueError("Unsupported file type")
         
         # Process text with spaCy
-        doc = nlp(text)
+        doc = get_nlp()(text)
         
         # Extract metadata
         metadata = {
@@ -89,24 +99,24 @@ async def process_document(file: UploadFile) -> Tuple[str, Dict[str, Any]]:
         logger.error(f"Error processing document: {str(e)}")
         raise
 
-def extract_skills(doc: spacy.tokens.Doc) -> list:
+def extract_skills(doc: "spacy.tokens.Doc") -> list:
     """Extract skills from document."""
-    # Load skills from skills.yaml
-    with open("skills.yaml", "r") as f:
-        skills_data = json.load(f)
-    
-    # Extract skills using spaCy
+    matcher = get_skill_matcher()
     skills = []
-    for skill in skills_data["skills"]:
-        if skill["name"].lower() in doc.text.lower():
-            skills.append({
-                "name": skill["name"],
-                "category": skill["category"],
-                "level": skill["level"]
-            })
+    for name in matcher.extract(doc.text):
+        skill = matcher.registry.get_skill(name)
+        skills.append({
+            "name": skill.name,
+            "category": skill.category.value,
+            "level": skill.level.value
+        })
     return skills
 
-def extract_education(doc: spacy.tokens.Doc) -> list:
+def extract_skill_names(text: str) -> set:
+    """Lower-cased names of the skills mentioned in a text."""
+    return {name.lower() for name in get_skill_matcher().extract(text)}
+
+def extract_education(doc: "spacy.tokens.Doc") -> list:
     """Extract education information from document."""
     education = []
     for ent in doc.ents:
@@ -118,55 +128,115 @@ def extract_education(doc: spacy.tokens.Doc) -> list:
             })
     return education
 
-def extract_experience(doc: spacy.tokens.Doc) -> list:
+def extract_experience(doc: "spacy.tokens.Doc") -> list:
     """Extract work experience from document."""
     experience = []
     # TODO: Implement experience extraction using NLP
     return experience
 
-def generate_summary(doc: spacy.tokens.Doc) -> str:
+def generate_summary(doc: "spacy.tokens.Doc") -> str:
     """Generate a summary of the document."""
     # TODO: Implement summary generation using NLP
     return doc.text[:200] + "..."
 
-def get_embedding(text: str) -> np.ndarray:
-    """Get embedding for text using sentence transformer."""
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    """Mean-pooled sentence embeddings for a batch of texts."""
+    return get_backend().encode(texts)
+
+def get_embedding_batcher() -> EmbeddingService:
+    """Get the micro-batching service that runs every embedding through the model."""
+    return get_embedding_service(get_backend(), _encode_batch, name=EMBEDDING_MODEL)
+
+def _store_version() -> str:
+    return store_version("mean-pooling-512", get_backend().name)
+
+def _get_store():
+    """Get the embedding store for the mean-pooled transformer embeddings."""
+    return get_embedding_store(EMBEDDING_MODEL, model_version=_store_version())
+
+def get_document_embedder() -> Optional[ChunkedEmbedder]:
+    """Get the chunked document embedder, or None when embedding_chunking is disabled in config.yaml."""
+    settings = config_section("embedding_chunking")
+    if not settings.get("enabled", False):
+        return None
+    options = chunking_options(settings)
+    pooled_store = get_embedding_store(EMBEDDING_MODEL, model_version=pooled_store_version(_store_version(), options))
+    return ChunkedEmbedder(get_embeddings, pooled_store, **options)
+
+def get_embeddings(texts: List[str]) -> np.ndarray:
+    """Get embeddings for texts, encoding only those not already stored."""
     try:
-        # Tokenize and get model output
-        inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=512)
-        with torch.no_grad():
-            outputs = model(**inputs)
-        
-        # Mean pooling
-        token_embeddings = outputs.last_hidden_state
-        mask = inputs["attention_mask"].unsqueeze(-1).expand(token_embeddings.size()).float()
-        sum_embeddings = torch.sum(token_embeddings * mask, 1)
-        sum_mask = torch.sum(mask, 1)
-        mean_embeddings = sum_embeddings / sum_mask
-        
-        return mean_embeddings.numpy()
+        return _get_store().get_or_compute(texts, get_embedding_batcher().encode)
+    except Exception as e:
+        logger.error(f"Error getting embeddings: {str(e)}")
+        raise
+
+async def get_embeddings_async(texts: List[str]) -> np.ndarray:
+    """Get embeddings without blocking the event loop while the model runs."""
+    try:
+        # Opening the store loads the backend on first use
+        store = await asyncio.to_thread(_get_store)
+        found = store.get_many(texts)
+        missing = list(dict.fromkeys(text for text, embedding in zip(texts, found) if embedding is None))
+        if missing:
+            encoded = await get_embedding_batcher().encode_async(missing)
+            store.put_many(missing, encoded)
+            computed = dict(zip(missing, encoded))
+            found = [embedding if embedding is not None else computed[text] for text, embedding in zip(texts, found)]
+        return np.stack(found).astype(np.float32, copy=False)
     except Exception as e:
-        logger.error(f"Error getting embedding: {str(e)}")
+        logger.error(f"Error getting embeddings: {str(e)}")
         raise
 
+def get_embedding(text: str) -> np.ndarray:
+    """Get the whole-document embedding for text (pooled over chunks when chunking is enabled)."""
+    embedder = get_document_embedder()
+    if embedder is not None:
+        return embedder.pooled([text]).reshape(1, -1)
+    return get_embeddings([text]).reshape(1, -1)
+
+def analyze_texts(profile_text: str, job_text: str) -> Dict[str, Any]:
+    """Summaries and matching/missing skills of a profile and a job description."""
+    # Extract skills once for both skill lists
+    profile_skills = extract_skill_names(profile_text)
+    job_skills = extract_skill_names(job_text)
+    return {
+        "profile_summary": generate_summary(get_nlp()(profile_text)),
+        "job_summary": generate_summary(get_nlp()(job_text)),
+        "matching_skills": list(profile_skills & job_skills),
+        "missing_skills": list(job_skills - profile_skills)
+    }
+
 async def match_documents(profile_text: str, job_text: str) -> Tuple[float, Dict[str, Any]]:
     """Match profile against job description."""
     try:
-        # Get embeddings
-        profile_embedding = get_embedding(profile_text)
-        job_embedding = get_embedding(job_text)
-        
-        # Calculate similarity
-        similarity = cosine_similarity(profile_embedding, job_embedding)[0][0]
+        chunk_details: Dict[str, Any] = {}
+        embedder = get_document_embedder()
+        if embedder is not None:
+            # Embed every chunk of both documents in one request and score each
+            # job chunk against its best-matching profile chunk
+            profile_document, job_document = await embedder.embed_async(
+                [profile_text, job_text], get_embeddings_async
+            )
+            similarity = max_sim(job_document, profile_document)
+            chunk_details = {
+                "pooled_similarity": pooled_similarity(profile_document, job_document),
+                "profile_chunks": len(profile_document.chunks),
+                "job_chunks": len(job_document.chunks)
+            }
+        else:
+            # Get both embeddings in one request, batched with concurrent matches
+            embeddings = await get_embeddings_async([profile_text, job_text])
+            profile_embedding, job_embedding = embeddings
+            
+            # Calculate cosine similarity
+            similarity = np.dot(profile_embedding, job_embedding) / (
+                np.linalg.norm(profile_embedding) * np.linalg.norm(job_embedding)
+            )
         
-        # Generate analysis
-        analysis = {
-            "similarity_score": float(similarity),
-            "profile_summary": generate_summary(nlp(profile_text)),
-            "job_summary": generate_summary(nlp(job_text)),
-            "matching_skills": extract_matching_skills(profile_text, job_text),
-            "missing_skills": extract_missing_skills(profile_text, job_text)
-        }
+        # spaCy and skill extraction are CPU-bound; keep them off the event loop
+        text_analysis = await asyncio.to_thread(analyze_texts, profile_text, job_text)
+        analysis = {"similarity_score": float(similarity), **text_analysis, **chunk_details}
         
         return similarity, analysis
     except Exception as e:
@@ -175,20 +245,8 @@ async def match_documents(profile_text: str, job_text: str) -> Tuple[float, Dict
 
 def extract_matching_skills(profile_text: str, job_text: str) -> list:
     """Extract skills that match between profile and job."""
-    profile_doc = nlp(profile_text)
-    job_doc = nlp(job_text)
-    
-    profile_skills = set(skill["name"].lower() for skill in extract_skills(profile_doc))
-    job_skills = set(skill["name"].lower() for skill in extract_skills(job_doc))
-    
-    return list(profile_skills.intersection(job_skills))
+    return list(extract_skill_names(profile_text) & extract_skill_names(job_text))
 
 def extract_missing_skills(profile_text: str, job_text: str) -> list:
     """Extract skills required by job but missing in profile."""
-    profile_doc = nlp(profile_text)
-    job_doc = nlp(job_text)
-    
-    profile_skills = set(skill["name"].lower() for skill in extract_skills(profile_doc))
-    job_skills = set(skill["name"].lower() for skill in extract_skills(job_doc))
-    
-    return list(job_skills - profile_skills) 
\ No newline at end of file
+    return list(extract_skill_names(job_text) - extract_skill_names(profile_text)) 
\ No newline at end of file
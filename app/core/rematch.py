@@ -0,0 +1,340 @@
+"""
+Incremental re-matching for stored matches.
+
+Edits to a profile's content or a job's description, requirements or skills
+mark every stored match of that profile or job as dirty (a row in
+match_dirty). A background worker recomputes only the dirty pairs and writes
+their scores back in bulk. Embeddings come from the content-addressed
+embedding store, so only the edited text (with chunking, only the edited
+chunks) is encoded again.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, inspect, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.matches import _dialect_insert, upsert_matches
+from app.models.database import JobDescription, Match, MatchDirty, Profile
+
+logger = logging.getLogger(__name__)
+
+# Attributes whose changes invalidate stored matches
+TRACKED_FIELDS = {
+    Profile: ("content", "profile_metadata"),
+    JobDescription: ("description", "requirements", "skills")
+}
+
+MatchFunction = Callable[[str, str], Awaitable[Tuple[float, Dict[str, Any]]]]
+
+
+def _has_tracked_changes(instance: Any) -> bool:
+    """True if a tracked attribute of a loaded profile or job was modified."""
+    fields = TRACKED_FIELDS.get(type(instance), ())
+    state = inspect(instance)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+def _restamp_queued(statement: Any, reason: str, now: datetime) -> Any:
+    """Make an upsert-capable insert into match_dirty re-stamp pairs that are already queued."""
+    return statement.on_conflict_do_update(
+        index_elements=[MatchDirty.profile_id, MatchDirty.job_id],
+        set_={"marked_at": now, "reason": reason, "attempts": 0}
+    )
+
+
+def enqueue_pairs(session: Session, pairs: Iterable[Tuple[int, int]], reason: str = "changed") -> int:
+    """
+    Mark (profile_id, job_id) pairs for recomputation.
+
+    Pairs already queued are re-stamped instead of duplicated, so an edit made
+    while the worker is scoring a pair queues it again.
+
+    Args:
+        session: Database session (the caller commits)
+        pairs: (profile_id, job_id) pairs
+        reason: Why the pairs are dirty, for diagnostics
+
+    Returns:
+        Number of pairs queued
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return 0
+
+    now = datetime.utcnow()
+    rows = [
+        {"profile_id": profile_id, "job_id": job_id, "reason": reason, "attempts": 0, "marked_at": now}
+        for profile_id, job_id in pairs
+    ]
+    insert = _dialect_insert(session)
+    with session.no_autoflush:
+        if insert is not None:
+            session.execute(_restamp_queued(insert(MatchDirty), reason, now), rows)
+            return len(pairs)
+
+        queued = session.query(MatchDirty).filter(
+            MatchDirty.profile_id.in_({profile_id for profile_id, _ in pairs}),
+            MatchDirty.job_id.in_({job_id for _, job_id in pairs})
+        ).all()
+    new_pairs = set(pairs)
+    for row in queued:
+        if (row.profile_id, row.job_id) in pairs:
+            new_pairs.discard((row.profile_id, row.job_id))
+            row.marked_at = now
+            row.reason = reason
+            row.attempts = 0
+    session.add_all(MatchDirty(**row) for row in rows if (row["profile_id"], row["job_id"]) in new_pairs)
+    return len(pairs)
+
+
+def mark_dirty(
+    session: Session,
+    profile_ids: Iterable[int] = (),
+    job_ids: Iterable[int] = (),
+    reason: str = "changed"
+) -> int:
+    """
+    Queue every stored match of the given profiles and jobs.
+
+    With SQLite and PostgreSQL this is a single INSERT ... SELECT from
+    matches, so only the profile and job ids are bound, however many
+    matches they have.
+
+    Args:
+        session: Database session (the caller commits)
+        profile_ids: Profiles whose matches are stale
+        job_ids: Jobs whose matches are stale
+        reason: Why the matches are stale
+
+    Returns:
+        Number of pairs queued
+    """
+    profile_ids, job_ids = set(profile_ids), set(job_ids)
+    conditions = []
+    if profile_ids:
+        conditions.append(Match.profile_id.in_(profile_ids))
+    if job_ids:
+        conditions.append(Match.job_id.in_(job_ids))
+    if not conditions:
+        return 0
+    stale = or_(*conditions)
+
+    insert = _dialect_insert(session)
+    if insert is None:
+        with session.no_autoflush:
+            pairs = set(session.query(Match.profile_id, Match.job_id).filter(stale))
+        return enqueue_pairs(session, pairs, reason)
+
+    now = datetime.utcnow()
+    statement = insert(MatchDirty).from_select(
+        ["profile_id", "job_id", "reason", "attempts", "marked_at"],
+        select(Match.profile_id, Match.job_id, literal(reason), literal(0), literal(now)).where(stale)
+    )
+    with session.no_autoflush:
+        result = session.execute(_restamp_queued(statement, reason, now))
+    return max(result.rowcount, 0)
+
+
+def _track_changes(session: Session, flush_context: Any, instances: Any) -> None:
+    """before_flush hook queueing the matches of edited profiles and jobs."""
+    profile_ids, job_ids = set(), set()
+    for instance in session.dirty:
+        if isinstance(instance, (Profile, JobDescription)) and instance.id is not None and _has_tracked_changes(instance):
+            (profile_ids if isinstance(instance, Profile) else job_ids).add(instance.id)
+    if profile_ids or job_ids:
+        mark_dirty(session, profile_ids, job_ids)
+
+
+def enable_change_tracking(session_class: Any = Session) -> None:
+    """Queue re-matching automatically whenever a tracked field is flushed (idempotent)."""
+    if not event.contains(session_class, "before_flush", _track_changes):
+        event.listen(session_class, "before_flush", _track_changes)
+
+
+class RematchWorker:
+    """
+    Recomputes dirty matches in batches.
+
+    Each batch loads its profiles and jobs with one query per table, scores
+    every pair concurrently (so the embedding service can coalesce them into
+    few model calls), then upserts all matches with one bulk statement.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        match_fn: Optional[MatchFunction] = None,
+        batch_size: int = 200,
+        poll_interval: float = 5.0,
+        max_attempts: int = 3
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            session_factory: Creates database sessions
+            match_fn: async (profile_text, job_text) -> (score, analysis);
+                defaults to app.core.matching.match_documents
+            batch_size: Dirty pairs recomputed per batch
+            poll_interval: Seconds to sleep when the queue is empty
+            max_attempts: Failures after which a pair is left in the queue untouched
+        """
+        if match_fn is None:
+            from app.core.matching import match_documents
+            match_fn = match_documents
+        self.session_factory = session_factory
+        self.match_fn = match_fn
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.processed = 0
+        self.failed = 0
+        self._task: Optional[asyncio.Task] = None
+        self._stop = asyncio.Event()
+
+    def _claim_batch(self) -> Tuple[datetime, List[Dict[str, Any]], List[int]]:
+        """
+        Load the next batch of dirty pairs with their texts (runs in a worker thread).
+
+        Returns:
+            (claim time, pairs to score, ids of queue entries whose profile or
+            job was deleted or deactivated)
+        """
+        session = self.session_factory()
+        try:
+            claimed_at = datetime.utcnow()
+            dirty = session.query(MatchDirty).filter(
+                MatchDirty.attempts < self.max_attempts
+            ).order_by(MatchDirty.marked_at).limit(self.batch_size).all()
+            if not dirty:
+                return claimed_at, [], []
+
+            profile_ids = {row.profile_id for row in dirty}
+            job_ids = {row.job_id for row in dirty}
+            profiles = dict(session.query(Profile.id, Profile.content).filter(
+                Profile.id.in_(profile_ids), Profile.is_active == True
+            ))
+            jobs = {
+                job_id: (description, user_id)
+                for job_id, description, user_id in session.query(
+                    JobDescription.id, JobDescription.description, JobDescription.user_id
+                ).filter(JobDescription.id.in_(job_ids), JobDescription.is_active == True)
+            }
+
+            pairs = [
+                {
+                    "id": row.id,
+                    "profile_id": row.profile_id,
+                    "job_id": row.job_id,
+                    "profile_text": str(profiles[row.profile_id]),
+                    "job_text": str(jobs[row.job_id][0]),
+                    "user_id": jobs[row.job_id][1]
+                }
+                for row in dirty if row.profile_id in profiles and row.job_id in jobs
+            ]
+            orphaned = [row.id for row in dirty if row.profile_id not in profiles or row.job_id not in jobs]
+            return claimed_at, pairs, orphaned
+        finally:
+            session.close()
+
+    def _save_batch(self, claimed_at: datetime, rows: List[Dict[str, Any]], done: List[int], failed: List[int]) -> None:
+        """Upsert scored matches and update the queue in one transaction (runs in a worker thread)."""
+        session = self.session_factory()
+        try:
+            upsert_matches(session, rows)
+            if failed:
+                session.query(MatchDirty).filter(MatchDirty.id.in_(failed)).update(
+                    {MatchDirty.attempts: func.coalesce(MatchDirty.attempts, 0) + 1}, synchronize_session=False
+                )
+            if done:
+                # Pairs re-marked while they were being scored stay queued
+                session.query(MatchDirty).filter(
+                    MatchDirty.id.in_(done),
+                    MatchDirty.marked_at <= claimed_at
+                ).delete(synchronize_session=False)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    async def run_once(self) -> int:
+        """
+        Recompute one batch of dirty pairs.
+
+        Database work runs in worker threads so API requests on the event loop
+        are not blocked while a batch is loaded or saved.
+
+        Returns:
+            Number of queue entries handled (0 when the queue is empty)
+        """
+        try:
+            claimed_at, pairs, orphaned = await asyncio.to_thread(self._claim_batch)
+            if not pairs and not orphaned:
+                return 0
+
+            outcomes = await asyncio.gather(
+                *(self.match_fn(pair["profile_text"], pair["job_text"]) for pair in pairs),
+                return_exceptions=True
+            )
+
+            rows: List[Dict[str, Any]] = []
+            done, failed = list(orphaned), []
+            for pair, outcome in zip(pairs, outcomes):
+                if isinstance(outcome, BaseException):
+                    logger.error(f"Error re-matching profile {pair['profile_id']} with job {pair['job_id']}: {str(outcome)}")
+                    failed.append(pair["id"])
+                    continue
+                score, analysis = outcome
+                rows.append({
+                    "user_id": pair["user_id"],
+                    "profile_id": pair["profile_id"],
+                    "job_id": pair["job_id"],
+                    "score": float(score),
+                    "analysis": analysis
+                })
+                done.append(pair["id"])
+
+            await asyncio.to_thread(self._save_batch, claimed_at, rows, done, failed)
+            self.processed += len(rows)
+            self.failed += len(failed)
+            return len(pairs) + len(orphaned)
+
+        except Exception as e:
+            logger.error(f"Error re-matching dirty pairs: {str(e)}")
+            raise
+
+    async def run(self) -> None:
+        """Process the queue until stop() is called, sleeping while it is empty."""
+        while not self._stop.is_set():
+            try:
+                handled = await self.run_once()
+            except Exception:
+                handled = 0
+            if not handled:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self) -> asyncio.Task:
+        """Start the worker loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._stop.clear()
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop the worker loop and wait for the current batch to finish."""
+        self._stop.set()
+        if self._task is not None:
+            await self._task
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters for monitoring."""
+        return {"processed": self.processed, "failed": self.failed, "running": self._task is not None and not self._task.done()}
@@ -0,0 +1,128 @@
+"""
+Profile skills and the top-skills aggregation.
+
+Skills extracted from a profile at ingestion time are normalized into the
+skills table and linked to the profile through profile_skills, so the
+dashboard's top skills are a GROUP BY over that association (O(distinct
+skills)) instead of a pass over every profile or metadata file. Results are
+cached for a few seconds; ingestion in this process clears the cache, other
+processes see new profiles once it expires.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.database import Profile, Skill, profile_skills
+from src.skill_store import TOP_SKILLS_TTL, skill_entries
+
+logger = logging.getLogger(__name__)
+
+_top_skills_cache: Dict[int, Tuple[float, List[Dict[str, Any]]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _get_or_create_skills(db: Session, entries: List[Dict[str, Any]]) -> List[Skill]:
+    """Load the skills named in entries, creating the missing ones."""
+    if not entries:
+        return []
+    keys = [entry["name"].lower() for entry in entries]
+    existing = {
+        skill.name.lower(): skill
+        for skill in db.query(Skill).filter(func.lower(Skill.name).in_(keys))
+    }
+    skills = []
+    for key, entry in zip(keys, entries):
+        skill = existing.get(key)
+        if skill is None:
+            skill = Skill(name=entry["name"], category=entry.get("category"), level=entry.get("level"))
+            try:
+                with db.begin_nested():
+                    db.add(skill)
+            except IntegrityError:
+                # Created concurrently by another ingestion
+                skill = db.query(Skill).filter(func.lower(Skill.name) == key).one()
+        skills.append(skill)
+    return skills
+
+
+def set_profile_skills(db: Session, profile: Profile, skills: Optional[Iterable[Any]]) -> List[Skill]:
+    """
+    Replace a profile's skills with the extracted ones.
+
+    Args:
+        db: Database session (flushed, not committed)
+        profile: Profile being ingested or re-processed
+        skills: Extracted skills, see skill_entries
+
+    Returns:
+        The profile's skills
+    """
+    profile.skills = _get_or_create_skills(db, skill_entries(skills))
+    db.flush()
+    invalidate_top_skills()
+    return profile.skills
+
+
+def top_skills(db: Session, limit: int = 10, ttl: float = TOP_SKILLS_TTL) -> List[Dict[str, Any]]:
+    """
+    Most common skills across active profiles.
+
+    Args:
+        db: Database session
+        limit: Number of skills to return
+        ttl: Seconds a cached result stays valid
+
+    Returns:
+        [{"name", "count"}] by descending count, then name
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _top_skills_cache.get(limit)
+    if cached is not None and now - cached[0] < ttl:
+        return cached[1]
+
+    count = func.count(profile_skills.c.profile_id)
+    rows = db.query(Skill.name, count).join(
+        profile_skills, profile_skills.c.skill_id == Skill.id
+    ).join(
+        Profile, Profile.id == profile_skills.c.profile_id
+    ).filter(Profile.is_active == True).group_by(Skill.id, Skill.name).order_by(count.desc(), Skill.name).limit(limit).all()
+    skills = [{"name": name, "count": skill_count} for name, skill_count in rows]
+    with _cache_lock:
+        _top_skills_cache[limit] = (now, skills)
+    return skills
+
+
+def invalidate_top_skills() -> None:
+    """Drop cached top-skills results."""
+    with _cache_lock:
+        _top_skills_cache.clear()
+
+
+def backfill_profile_skills(db: Session) -> int:
+    """
+    Link skills for profiles ingested before profile_skills existed.
+
+    Args:
+        db: Database session (committed if anything was linked)
+
+    Returns:
+        Number of profiles whose skills were linked
+    """
+    linked = profile_skills.select().where(profile_skills.c.profile_id == Profile.id).exists()
+    profiles = db.query(Profile).filter(Profile.profile_metadata.isnot(None), ~linked).all()
+    count = 0
+    for profile in profiles:
+        if skill_entries((profile.profile_metadata or {}).get("skills")):
+            set_profile_skills(db, profile, profile.profile_metadata["skills"])
+            count += 1
+    if count:
+        db.commit()
+    return count
+
@@ -3,11 +3,17 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from pathlib import Path
-import uvicorn
+from typing import Optional
 from app.api import feedback
 from app.routes import web, auth
-from app.database import engine, Base, init_db
+from app.database import engine, Base, init_db, SessionLocal
 from fastapi.middleware.cors import CORSMiddleware
+from src.embedding_service import embedding_service_metrics
+from src.model_registry import get_model_registry
+from src.embedding_backend import config_section
+from app.core.rematch import RematchWorker, enable_change_tracking
+from app.core.dashboard_stats import DashboardStatsReconciler
+from app.core.skills import backfill_profile_skills
 import logging
 
 # Configure logging
@@ -53,21 +59,83 @@ MATCHES_DIR = UPLOAD_DIR / "matches"
 for directory in [UPLOAD_DIR, RESUMES_DIR, JOBS_DIR, MATCHES_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
 
+rematch_worker: Optional[RematchWorker] = None
+stats_reconciler: Optional[DashboardStatsReconciler] = None
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup."""
+    global rematch_worker, stats_reconciler
     try:
         init_db()
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
         raise
+    
+    # Link skills of profiles ingested before profile_skills existed
+    try:
+        with SessionLocal() as db:
+            backfilled = backfill_profile_skills(db)
+        if backfilled:
+            logger.info(f"Linked skills for {backfilled} profiles")
+    except Exception as e:
+        logger.error(f"Error backfilling profile skills: {e}")
+    
+    # Re-score stored matches incrementally when profiles or jobs are edited
+    enable_change_tracking()
+    settings = config_section("rematch")
+    if settings.get("enabled", True):
+        rematch_worker = RematchWorker(
+            SessionLocal,
+            batch_size=settings.get("batch_size", 200),
+            poll_interval=settings.get("poll_interval", 5.0),
+            max_attempts=settings.get("max_attempts", 3)
+        )
+        rematch_worker.start()
+    
+    # Backfill the dashboard rollup, then repair drift periodically
+    settings = config_section("dashboard_stats")
+    stats_reconciler = DashboardStatsReconciler(
+        SessionLocal,
+        interval=settings.get("reconcile_interval", 3600.0),
+        window_days=settings.get("window_days")
+    )
+    stats_reconciler.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers."""
+    if rematch_worker is not None:
+        await rematch_worker.stop()
+    if stats_reconciler is not None:
+        await stats_reconciler.stop()
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "message": "RME Server is running"}
 
+@app.get("/metrics/embeddings")
+async def embedding_metrics():
+    """Batch size and queue wait metrics for the in-process embedding services."""
+    return {"services": embedding_service_metrics()}
+
+@app.get("/metrics/models")
+async def model_metrics():
+    """Load time and resident memory of each model loaded in this process."""
+    return get_model_registry().stats()
+
+@app.get("/metrics/rematch")
+async def rematch_metrics():
+    """Progress of the incremental re-matching worker."""
+    return rematch_worker.stats() if rematch_worker is not None else {"running": False}
+
+@app.get("/metrics/dashboard-stats")
+async def dashboard_stats_metrics():
+    """Runs and repairs of the dashboard rollup reconciler."""
+    return stats_reconciler.stats() if stats_reconciler is not None else {"running": False}
+
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc: HTTPException):
     return templates.TemplateResponse("404.html", {"request": request}, status_code=404)
@@ -77,4 +145,5 @@ async def server_error_handler(request: Request, exc: HTTPException):
     return templates.TemplateResponse("500.html", {"request": request}, status_code=500)
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8001, reload=True) 
\ No newline at end of file
@@ -1,3 +1,3 @@
-from .database import User, Match, JobDescription as Job, Profile, Skill
+from .database import User, Match, MatchDirty, JobDescription as Job, Profile, Skill
 
-__all__ = ['User', 'Match', 'Job', 'Profile', 'Skill'] 
\ No newline at end of file
+__all__ = ['User', 'Match', 'MatchDirty', 'Job', 'Profile', 'Skill'] 
\ No newline at end of file
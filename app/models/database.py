@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON, Boolean, Index, UniqueConstraint, DDL, Table, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -6,6 +6,16 @@ import json
 
 Base = declarative_base()
 
+# Skills extracted from each profile, one row per (profile, skill); the
+# skill_id index serves the top-skills GROUP BY
+profile_skills = Table(
+    "profile_skills",
+    Base.metadata,
+    Column("profile_id", Integer, ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True),
+    Column("skill_id", Integer, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_profile_skills_skill_id", "skill_id", "profile_id")
+)
+
 class User(Base):
     __tablename__ = "users"
     
@@ -64,6 +74,7 @@ class Profile(Base):
     # Relationships
     user = relationship("User", back_populates="profiles")
     matches = relationship("Match", back_populates="profile")
+    skills = relationship("Skill", secondary=profile_skills)
     
     def to_dict(self):
         return {
@@ -122,15 +133,25 @@ class JobDescription(Base):
 
 class Match(Base):
     __tablename__ = "matches"
+    __table_args__ = (
+        # One match per (profile, job); also serves lookups by profile
+        Index("uq_matches_profile_job", "profile_id", "job_id", unique=True),
+        # Keyset orderings of the match listing, alone and under its filters
+        Index("ix_matches_score_id", "score", "id"),
+        Index("ix_matches_created_at_id", "created_at", "id"),
+        Index("ix_matches_job_id_score", "job_id", "score", "id"),
+        Index("ix_matches_status_score", "status", "score", "id"),
+        Index("ix_matches_user_id_created_at", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     profile_id = Column(Integer, ForeignKey("profiles.id"))
     job_id = Column(Integer, ForeignKey("job_descriptions.id"))
-    score = Column(Float, index=True)
+    score = Column(Float, nullable=False)
     analysis = Column(JSON)
     status = Column(String, default="pending")  # pending, accepted, rejected
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
@@ -151,6 +172,85 @@ class Match(Base):
             "updated_at": self.updated_at.isoformat()
         }
 
+class DashboardStat(Base):
+    """Match count and score sum per (day, job, status), maintained by triggers on matches."""
+    __tablename__ = "dashboard_stats"
+    __table_args__ = (UniqueConstraint("day", "job_id", "status", name="uq_dashboard_stats_key"),)
+    
+    id = Column(Integer, primary_key=True)
+    day = Column(String(10), nullable=False)  # YYYY-MM-DD of Match.created_at
+    job_id = Column(Integer, nullable=False, default=0)  # 0 for matches without a job
+    status = Column(String, nullable=False, default="")
+    match_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    
+    def to_dict(self):
+        return {
+            "day": self.day,
+            "job_id": self.job_id,
+            "status": self.status,
+            "match_count": self.match_count,
+            "score_sum": self.score_sum
+        }
+
+# Rollup key of a matches row (NEW or OLD inside a trigger)
+def _rollup_key(row):
+    return (
+        f"COALESCE(date({row}.created_at), '1970-01-01')",
+        f"COALESCE({row}.job_id, 0)",
+        f"COALESCE({row}.status, '')"
+    )
+
+def _rollup_add(row):
+    day, job_id, status = _rollup_key(row)
+    return (
+        f"INSERT INTO dashboard_stats (day, job_id, status, match_count, score_sum) "
+        f"VALUES ({day}, {job_id}, {status}, 1, COALESCE({row}.score, 0)) "
+        f"ON CONFLICT (day, job_id, status) DO UPDATE SET "
+        f"match_count = match_count + 1, score_sum = score_sum + excluded.score_sum;"
+    )
+
+def _rollup_remove(row):
+    day, job_id, status = _rollup_key(row)
+    return (
+        f"UPDATE dashboard_stats SET match_count = match_count - 1, score_sum = score_sum - COALESCE({row}.score, 0) "
+        f"WHERE day = {day} AND job_id = {job_id} AND status = {status};"
+    )
+
+# SQLite triggers keeping dashboard_stats in step with every write to matches,
+# including bulk upserts and core UPDATE statements that bypass ORM events
+DASHBOARD_STATS_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS trg_matches_stats_insert AFTER INSERT ON matches "
+    f"BEGIN {_rollup_add('NEW')} END",
+    f"CREATE TRIGGER IF NOT EXISTS trg_matches_stats_update "
+    f"AFTER UPDATE OF score, status, created_at, job_id ON matches "
+    f"BEGIN {_rollup_remove('OLD')} {_rollup_add('NEW')} END",
+    f"CREATE TRIGGER IF NOT EXISTS trg_matches_stats_delete AFTER DELETE ON matches "
+    f"BEGIN {_rollup_remove('OLD')} END",
+]
+
+class MatchDirty(Base):
+    """A (profile, job) pair whose match must be recomputed by the rematch worker."""
+    __tablename__ = "match_dirty"
+    __table_args__ = (UniqueConstraint("profile_id", "job_id", name="uq_match_dirty_pair"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    profile_id = Column(Integer, ForeignKey("profiles.id"), nullable=False)
+    job_id = Column(Integer, ForeignKey("job_descriptions.id"), nullable=False)
+    reason = Column(String)
+    attempts = Column(Integer, default=0)
+    marked_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "profile_id": self.profile_id,
+            "job_id": self.job_id,
+            "reason": self.reason,
+            "attempts": self.attempts,
+            "marked_at": self.marked_at.isoformat()
+        }
+
 class Skill(Base):
     __tablename__ = "skills"
     
@@ -173,4 +273,11 @@ class Skill(Base):
             "metadata": self.skill_metadata,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
-        } 
\ No newline at end of file
+        }
+
+# Install the rollup triggers whenever create_all builds the rollup table (the
+# reconciler in app.core.dashboard_stats backfills it and keeps other
+# databases up to date)
+DashboardStat.__table__.add_is_dependent_on(Match.__table__)
+for _trigger in DASHBOARD_STATS_TRIGGERS:
+    event.listen(DashboardStat.__table__, "after_create", DDL(_trigger).execute_if(dialect="sqlite"))
@@ -6,6 +6,8 @@ from app.database import get_db
 from app.auth import get_current_user
 from app.models import User, Profile, JobDescription as Job, Match
 from app.core.matching import process_document, match_documents
+from app.core.matches import upsert_matches
+from app.core.skills import set_profile_skills
 from pydantic import BaseModel
 import logging
 
@@ -72,6 +74,7 @@ async def upload_document(
             is_active=True
         )
         db.add(profile)
+        set_profile_skills(db, profile, metadata.get("skills"))
         db.commit()
         db.refresh(profile)
         
@@ -151,7 +154,7 @@ async def create_match(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> Any:
-    """Create a match between a profile and a job."""
+    """Create a match between a profile and a job, or refresh its score if it exists."""
     try:
         # Get profile and job
         profile = db.query(Profile).filter(
@@ -174,34 +177,25 @@ async def create_match(
                 detail="Job not found"
             )
         
-        # Check if match already exists
-        existing_match = db.query(Match).filter(
-            Match.profile_id == profile_id,
-            Match.job_id == job_id
-        ).first()
-        if existing_match:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Match already exists"
-            )
-        
-        # Create match
+        # Create the match, or re-score it if the pair was matched before
         score, analysis = await match_documents(
             str(profile.content),
             str(job.description)
         )
-        match = Match(
-            user_id=current_user.id,
-            profile_id=profile_id,
-            job_id=job_id,
-            score=score,
-            analysis=analysis,
-            status="pending"
-        )
-        db.add(match)
+        upsert_matches(db, [{
+            "user_id": current_user.id,
+            "profile_id": profile_id,
+            "job_id": job_id,
+            "score": float(score),
+            "analysis": analysis
+        }])
         db.commit()
-        db.refresh(match)
-        return match
+        return db.query(Match).filter(
+            Match.profile_id == profile_id,
+            Match.job_id == job_id
+        ).one()
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating match: {str(e)}")
         raise HTTPException(
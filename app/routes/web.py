@@ -1,17 +1,18 @@
 from fastapi import APIRouter, Response, HTTPException, Form, UploadFile, File, Query, Request, Depends
 from fastapi.responses import JSONResponse, FileResponse, HTMLResponse, RedirectResponse
 from pathlib import Path
+import base64
 import json
 import csv
 import io
 import time
 import logging
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import os
 import shutil
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc, or_, func, and_
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from sqlalchemy import desc, asc, or_, and_
 from fastapi.templating import Jinja2Templates
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 import jwt
@@ -19,6 +20,8 @@ import jwt
 from app.auth import get_current_user, get_optional_user, authenticate_user, create_access_token, SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, get_current_user_from_request
 from app.models import User, Match, Job, Profile
 from app.database import get_db, SessionLocal
+from app.core import dashboard_stats
+from app.core.skills import top_skills
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -180,10 +183,60 @@ async def upload_files(
         logger.error(f"Error uploading files: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error (upload): {e}")
 
+# Keyset pagination: each sort orders by (column, id) and pages continue after
+# the last row of the previous page, so deep pages cost the same as the first
+MATCH_SORT_KEYS = {
+    "score_desc": (Match.score, True),
+    "score_asc": (Match.score, False),
+    "date_desc": (Match.created_at, True),
+    "date_asc": (Match.created_at, False)
+}
+
+def encode_match_cursor(sort_by: str, match: Match) -> str:
+    """Encode the position after match in the given sort order as an opaque cursor."""
+    value = match.created_at.isoformat() if sort_by.startswith("date") else match.score
+    payload = json.dumps({"sort": sort_by, "value": value, "id": match.id})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_match_cursor(sort_by: str, cursor: str) -> Tuple[Any, int]:
+    """Decode a cursor produced by encode_match_cursor for the same sort order."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if payload["sort"] != sort_by:
+            raise ValueError("cursor belongs to a different sort order")
+        value = datetime.fromisoformat(payload["value"]) if sort_by.startswith("date") else payload["value"]
+        return value, int(payload["id"])
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+def seek_matches(query, sort_by: str, cursor: Optional[str]):
+    """Order a Match query for sort_by and continue after cursor, if any."""
+    column, descending = MATCH_SORT_KEYS[sort_by]
+    if cursor:
+        value, match_id = decode_match_cursor(sort_by, cursor)
+        if descending:
+            query = query.filter(or_(column < value, and_(column == value, Match.id < match_id)))
+        else:
+            query = query.filter(or_(column > value, and_(column == value, Match.id > match_id)))
+    if descending:
+        return query.order_by(desc(column), desc(Match.id))
+    return query.order_by(asc(column), asc(Match.id))
+
+def match_stats(db: Session) -> dict:
+    """Total, average score and per-status counts of all matches, from the dashboard rollup."""
+    by_status = dashboard_stats.status_totals(db)
+    total = sum(count for count, _ in by_status.values())
+    score_sum = sum(score_sum for _, score_sum in by_status.values())
+    return {
+        "total_matches": total,
+        "average_score": score_sum / total if total else 0,
+        "status_counts": {status: by_status.get(status, (0, 0.0))[0] for status in ("pending", "reviewed", "rejected")}
+    }
+
 @router.get("/api/matches")
 async def list_matches(
     request: Request,
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = None,
     per_page: int = Query(10, ge=1, le=100),
     search: Optional[str] = None,
     job_id: Optional[int] = None,
@@ -192,97 +245,95 @@ async def list_matches(
     sort_by: Optional[str] = Query("score_desc", regex="^(score_desc|score_asc|date_desc|date_asc)$"),
     db: Session = Depends(get_db)
 ):
-    """List matches with pagination and filtering."""
+    """
+    List matches with keyset pagination and filtering.
+    
+    Pass the returned next_cursor to fetch the following page; it is null on
+    the last page. The filtered total is only counted for the first page.
+    """
     try:
         # Temporarily disable authentication
-        # Base query
-        query = db.query(Match)
+        # Profiles and jobs come from the same query as their matches
+        query = db.query(Match).join(Match.profile).join(Match.job).options(
+            contains_eager(Match.profile),
+            contains_eager(Match.job)
+        )
+        filtered = False
         
         # Apply filters
         if search:
             search_term = f"%{search}%"
-            query = query.join(Profile).join(Job).filter(
+            query = query.filter(
                 or_(
                     Job.title.ilike(search_term),
                     Profile.filename.ilike(search_term),
                     Match.status.ilike(search_term)
                 )
             )
+            filtered = True
         
         if job_id:
             query = query.filter(Match.job_id == job_id)
+            filtered = True
             
         if status:
             query = query.filter(Match.status == status)
+            filtered = True
             
         if score_range:
             try:
                 min_score, max_score = map(float, score_range.split('-'))
                 query = query.filter(Match.score >= min_score, Match.score <= max_score)
+                filtered = True
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid score range format")
         
-        # Apply sorting
-        if sort_by == "score_desc":
-            query = query.order_by(desc(Match.score))
-        elif sort_by == "score_asc":
-            query = query.order_by(asc(Match.score))
-        elif sort_by == "date_desc":
-            query = query.order_by(desc(Match.created_at))
-        elif sort_by == "date_asc":
-            query = query.order_by(asc(Match.created_at))
+        # Calculate stats
+        stats = match_stats(db)
         
-        # Get total count
-        total = query.count()
+        # Count the filtered rows once, on the first page
+        total = None
+        if not cursor:
+            total = query.count() if filtered else stats["total_matches"]
         
-        # Apply pagination
-        matches = query.offset((page - 1) * per_page).limit(per_page).all()
-        
-        # Calculate stats
-        stats = {
-            "total_matches": total,
-            "average_score": db.query(func.avg(Match.score)).scalar() or 0,
-            "status_counts": {
-                "pending": db.query(Match).filter(Match.status == "pending").count(),
-                "reviewed": db.query(Match).filter(Match.status == "reviewed").count(),
-                "rejected": db.query(Match).filter(Match.status == "rejected").count()
-            }
-        }
+        # Fetch one extra row to know whether another page follows
+        rows = seek_matches(query, sort_by, cursor).limit(per_page + 1).all()
+        matches = rows[:per_page]
+        next_cursor = encode_match_cursor(sort_by, matches[-1]) if len(rows) > per_page else None
         
         # Format response
         matches_data = []
         for match in matches:
-            profile = db.query(Profile).filter(Profile.id == match.profile_id).first()
-            job = db.query(Job).filter(Job.id == match.job_id).first()
-            
-            if profile and job:
-                matches_data.append({
-                    "id": match.id,
-                    "profile": {
-                        "id": profile.id,
-                        "filename": profile.filename,
-                        "upload_date": profile.processed_at.isoformat() if profile.processed_at else None
-                    },
-                    "job": {
-                        "id": job.id,
-                        "title": job.title,
-                        "department": job.department,
-                        "location": job.location
-                    },
-                    "score": match.score,
-                    "status": match.status,
-                    "created_at": match.created_at.isoformat() if match.created_at else None,
-                    "updated_at": match.updated_at.isoformat() if match.updated_at else None
-                })
+            profile, job = match.profile, match.job
+            matches_data.append({
+                "id": match.id,
+                "profile": {
+                    "id": profile.id,
+                    "filename": profile.filename,
+                    "upload_date": profile.processed_at.isoformat() if profile.processed_at else None
+                },
+                "job": {
+                    "id": job.id,
+                    "title": job.title,
+                    "department": job.department,
+                    "location": job.location
+                },
+                "score": match.score,
+                "status": match.status,
+                "created_at": match.created_at.isoformat() if match.created_at else None,
+                "updated_at": match.updated_at.isoformat() if match.updated_at else None
+            })
         
         return {
             "matches": matches_data,
             "total": total,
-            "page": page,
             "per_page": per_page,
+            "next_cursor": next_cursor,
             "stats": stats
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing matches: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -601,14 +652,13 @@ async def get_dashboard_stats(
         # Get basic stats
         total_jobs = db.query(Job).filter(Job.is_active == True).count()
         total_profiles = db.query(Profile).filter(Profile.is_active == True).count()
-        total_matches = db.query(Match).count()
-        avg_score = db.query(func.avg(Match.score)).scalar() or 0
+        match_totals = dashboard_stats.totals(db)
         
         return {
             "totalJobs": total_jobs,
             "totalProfiles": total_profiles,
-            "totalMatches": total_matches,
-            "averageScore": round(float(avg_score), 2)
+            "totalMatches": match_totals["total_matches"],
+            "averageScore": round(match_totals["average_score"], 2)
         }
     except Exception as e:
         logger.error(f"Error getting dashboard stats: {e}")
@@ -620,23 +670,13 @@ async def get_dashboard_activity(
 ):
     """Get matching activity data for charts."""
     try:
-        # Get matches from last 7 days
-        from datetime import datetime, timedelta
-        week_ago = datetime.now() - timedelta(days=7)
-        
-        matches = db.query(Match).filter(Match.created_at >= week_ago).all()
-        
-        # Group by date
-        activity_data = {}
-        for match in matches:
-            date_str = match.created_at.strftime('%Y-%m-%d')
-            if date_str not in activity_data:
-                activity_data[date_str] = 0
-            activity_data[date_str] += 1
+        # Matches per day over the last 7 days, from the daily rollup
+        week_ago = (datetime.now() - timedelta(days=7)).date()
+        activity = dashboard_stats.daily_counts(db, week_ago)
         
         return {
-            "labels": list(activity_data.keys()),
-            "data": list(activity_data.values())
+            "labels": [day for day, _ in activity],
+            "data": [count for _, count in activity]
         }
     except Exception as e:
         logger.error(f"Error getting dashboard activity: {e}")
@@ -648,22 +688,22 @@ async def get_recent_matches(
 ):
     """Get recent matches for dashboard."""
     try:
-        matches = db.query(Match).order_by(desc(Match.created_at)).limit(10).all()
+        matches = db.query(Match).options(
+            joinedload(Match.profile, innerjoin=True),
+            joinedload(Match.job, innerjoin=True)
+        ).order_by(desc(Match.created_at), desc(Match.id)).limit(10).all()
         
-        matches_data = []
-        for match in matches:
-            profile = db.query(Profile).filter(Profile.id == match.profile_id).first()
-            job = db.query(Job).filter(Job.id == match.job_id).first()
-            
-            if profile and job:
-                matches_data.append({
-                    "id": match.id,
-                    "profileName": profile.filename,
-                    "jobTitle": job.title,
-                    "score": match.score,
-                    "status": match.status,
-                    "date": match.created_at.isoformat() if match.created_at else None
-                })
+        matches_data = [
+            {
+                "id": match.id,
+                "profileName": match.profile.filename,
+                "jobTitle": match.job.title,
+                "score": match.score,
+                "status": match.status,
+                "date": match.created_at.isoformat() if match.created_at else None
+            }
+            for match in matches
+        ]
         
         return {"matches": matches_data}
     except Exception as e:
@@ -676,16 +716,7 @@ async def get_top_skills(
 ):
     """Get top skills for dashboard."""
     try:
-        # Mock data for now - in a real app, this would query actual skills
-        skills = [
-            {"name": "Python", "count": 15},
-            {"name": "JavaScript", "count": 12},
-            {"name": "SQL", "count": 10},
-            {"name": "React", "count": 8},
-            {"name": "Machine Learning", "count": 6}
-        ]
-        
-        return {"skills": skills}
+        return {"skills": top_skills(db, limit=5)}
     except Exception as e:
         logger.error(f"Error getting top skills: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -24,9 +24,11 @@ if src_path not in sys.path:
 
 try:
     print("Attempting to import required modules...")
-    from src.document_processor import DocumentProcessor
+    from src.document_processor import DocumentProcessor, PARSER_VERSION
     from src.matching_engine import MatchingEngine
     from src.enhanced_document_processor import EnhancedDocumentProcessor
+    from src.candidate_index import CandidateIndex
+    from src.parse_cache import DEFAULT_MEMORY_BYTES, get_parse_cache
     print("Successfully imported all required modules")
 except ImportError as e:
     print(f"Error importing required modules: {e}")
@@ -96,7 +98,33 @@ def format_score(score: float) -> str:
     """Format a score as a percentage string."""
     return f"{score:.2%}"
 
-def process_files(job_file: str, resume_files: List[str], threshold: float = 0.7) -> None:
+def shortlist_resumes(
+    doc_processor: DocumentProcessor,
+    matching_engine: MatchingEngine,
+    job_content: str,
+    resume_files: List[str],
+    top_n: int,
+    resume_results: Optional[Dict[str, Any]] = None
+) -> List[str]:
+    """Return the top_n resumes closest to the job by whole-document embedding."""
+    if resume_results is None:
+        resume_results = doc_processor.process_batch(resume_files)
+    contents = {
+        resume_file: resume_results[resume_file]['content']
+        for resume_file in resume_files
+        if resume_results.get(resume_file) and 'content' in resume_results[resume_file]
+    }
+            
+    if not contents:
+        return []
+        
+    embeddings = matching_engine.embed(list(contents.values()))
+    index = CandidateIndex(embeddings.shape[1])
+    index.add(list(contents.keys()), embeddings)
+    shortlist = index.search(matching_engine.embed([job_content])[0], top_n)
+    return [resume_file for resume_file, _ in shortlist]
+
+def process_files(job_file: str, resume_files: List[str], threshold: float = 0.7, top_n: Optional[int] = None) -> None:
     """Process job description and resume files."""
     print(f"\nProcessing files:")
     print(f"Job file: {job_file}")
@@ -107,7 +135,17 @@ def process_files(job_file: str, resume_files: List[str], threshold: float = 0.7
         # Initialize components with config
         print("\nInitializing components...")
         config = load_config()
-        doc_processor = DocumentProcessor(config.get('document_processing', {}).get('max_file_size', 10 * 1024 * 1024))
+        doc_config = config.get('document_processing', {})
+        doc_processor = DocumentProcessor(
+            doc_config.get('max_file_size', 10 * 1024 * 1024),
+            max_workers=doc_config.get('max_workers', 1),
+            parse_timeout=doc_config.get('parse_timeout', 120.0),
+            parse_cache=get_parse_cache(
+                doc_config.get('parse_cache', {}).get('memory_bytes', DEFAULT_MEMORY_BYTES),
+                doc_config.get('parse_cache', {}).get('path'),
+                PARSER_VERSION
+            )
+        )
         matching_engine = MatchingEngine(config)
         print("Components initialized successfully")
         
@@ -119,14 +157,31 @@ def process_files(job_file: str, resume_files: List[str], threshold: float = 0.7
             return
         
         job_content = job_result['content']
+        
+        # Parse and embed the job once for every resume
+        try:
+            prepared_job = matching_engine.prepare_job(job_content, title=os.path.basename(job_file))
+        except ValueError as e:
+            print(f"Error: Could not prepare job description {job_file}: {e}")
+            return
         print("Job description processed successfully")
         
+        # Parse all resumes up front so multi-process ingestion can overlap them
+        resume_results = doc_processor.process_batch(resume_files)
+        
+        # Shortlist candidates before detailed section-by-section scoring
+        if top_n and len(resume_files) > top_n:
+            print(f"\nShortlisting top {top_n} of {len(resume_files)} resumes...")
+            resume_files = shortlist_resumes(
+                doc_processor, matching_engine, job_content, resume_files, top_n, resume_results
+            )
+        
         # Process and match each resume
         for resume_file in resume_files:
             print(f"\nProcessing resume: {resume_file}")
             try:
                 # Process resume
-                resume_result = doc_processor.process_document(resume_file)
+                resume_result = resume_results.get(resume_file)
                 if not resume_result or 'content' not in resume_result:
                     print(f"Error: Could not process resume file: {resume_file}")
                     continue
@@ -136,7 +191,7 @@ def process_files(job_file: str, resume_files: List[str], threshold: float = 0.7
                 
                 # Match resume against job
                 print("Matching resume against job description...")
-                result = matching_engine.match(job_content, resume_content)
+                result = matching_engine.match(prepared_job, resume_content)
                 
                 if 'error' in result:
                     print(f"\nError matching resume: {result['error']}")
@@ -213,6 +268,13 @@ def main():
         help="Matching threshold (0.0 to 1.0, default: 0.7)"
     )
     
+    parser.add_argument(
+        "--top-n",
+        type=int,
+        default=None,
+        help="Only score the N resumes closest to the job (retrieval shortlist)"
+    )
+    
     parser.add_argument(
         "--log-level",
         choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
@@ -247,7 +309,7 @@ def main():
     
     print("\nAll validations passed, starting file processing...")
     # Process files
-    process_files(args.job_file, args.resume_files, args.threshold)
+    process_files(args.job_file, args.resume_files, args.threshold, args.top_n)
     print("\nFile processing completed")
 
 if __name__ == "__main__":
@@ -1,36 +1,24 @@
 from typing import List, Dict, Any, Optional
 import os
-from pathlib import Path
 import logging
 from datetime import datetime
 import re
+import json
 import logging.config
-import pandas as pd
-import numpy as np
 from fastapi import FastAPI, File, UploadFile, HTTPException, Request, status
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from pydantic import BaseModel, field_validator
-import uvicorn
-from src.document_processor import DocumentProcessor
+from src.document_processor import DocumentProcessor, PARSER_VERSION
+from src.parse_cache import DEFAULT_MEMORY_BYTES, get_parse_cache
+from src.match_pipeline import MatchPipeline
+from src.embedding_service import embedding_service_metrics
+from src.model_registry import get_model_registry
 from src.matching_engine import MatchingEngine
-from src.skill_categories import SkillRegistry, Skill, SkillCategory, SkillLevel
+from src.startup import ModelWarmup
 import yaml
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from docx import Document
-from docx.shared import Inches, Pt
-import matplotlib.pyplot as plt
-from io import BytesIO
-import base64
-import sys
 import socket
-import aiofiles
 import asyncio
 import mimetypes
-import tempfile
-import shutil
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
@@ -117,9 +105,53 @@ app.add_middleware(
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Initialize components
-document_processor = DocumentProcessor()
+doc_config = config.get('document_processing', {})
+parse_cache_config = doc_config.get('parse_cache') or {}
+document_processor = DocumentProcessor(
+    max_workers=doc_config.get('max_workers', 1),
+    parse_timeout=doc_config.get('parse_timeout', 120.0),
+    parse_cache=get_parse_cache(
+        parse_cache_config.get('memory_bytes', DEFAULT_MEMORY_BYTES),
+        parse_cache_config.get('path'),
+        PARSER_VERSION
+    )
+)
 matching_engine = MatchingEngine(config=config)
 
+# Upload-to-match pipeline, started on first use so importing the app stays cheap
+match_pipeline: Optional[MatchPipeline] = None
+
+def get_match_pipeline() -> MatchPipeline:
+    """Return the shared match pipeline, creating its worker pool on first use."""
+    global match_pipeline
+    if match_pipeline is None:
+        pipeline_config = config.get('match_pipeline', {})
+        match_pipeline = MatchPipeline(
+            document_processor,
+            matching_engine,
+            queue_size=pipeline_config.get('queue_size', 16),
+            batch_size=pipeline_config.get('batch_size', 32),
+            batch_wait=pipeline_config.get('batch_wait', 0.01)
+        )
+    return match_pipeline
+
+# Models are loaded in the background so the app answers requests right away
+model_warmup = ModelWarmup({
+    'all-MiniLM-L6-v2': lambda: matching_engine.embedding_service.encode(["warm up"])
+})
+
+@app.on_event("startup")
+def start_model_warmup() -> None:
+    """Start loading models in the background unless disabled in config."""
+    if config.get('startup', {}).get('warm_models', True):
+        model_warmup.start()
+
+@app.on_event("shutdown")
+def close_match_pipeline() -> None:
+    """Stop the pipeline's parser processes and model thread."""
+    if match_pipeline is not None:
+        match_pipeline.close()
+
 # File validation
 async def validate_file(file: UploadFile) -> bool:
     """Validate uploaded file."""
@@ -165,12 +197,28 @@ class MatchRequest(BaseModel):
             raise ValueError('Threshold must be between 0 and 1')
         return v
 
+def format_match(filename: str, match_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the /match payload for one resume."""
+    return {
+        "filename": filename,
+        "match_score": match_result['score'],
+        "matching_skills": match_result['matching_skills'],
+        "missing_skills": match_result['missing_skills'],
+        "section_scores": match_result['section_scores']
+    }
+
 @app.post("/match")
 async def match_resumes(
     job_description: str,
-    files: List[UploadFile] = File(...)
+    files: List[UploadFile] = File(...),
+    stream: bool = False
 ) -> Dict[str, Any]:
-    """Match resumes against job description."""
+    """
+    Match resumes against job description.
+    
+    With stream=true the response is newline-delimited JSON with one match
+    per line, emitted as soon as each resume is scored.
+    """
     try:
         if not job_description.strip():
             raise HTTPException(
@@ -184,68 +232,37 @@ async def match_resumes(
                 detail="At least one resume file is required"
             )
             
-        results = []
-        temp_files = []
+        # Validate every file before any work starts
+        await asyncio.gather(*(validate_file(file) for file in files))
         
-        try:
-            for file in files:
-                # Validate file
-                await validate_file(file)
-                
-                # Save to temporary file
-                temp_file = Path(tempfile.gettempdir()) / f"rme_temp_{file.filename}"
-                temp_files.append(temp_file)
-                
-                async with aiofiles.open(temp_file, 'wb') as f:
-                    content = await file.read()
-                    await f.write(content)
-                    
-                # Process resume
-                doc_result = document_processor.process_document(str(temp_file))
-                if not doc_result or 'content' not in doc_result:
-                    logger.warning(f"Could not process file {file.filename}")
-                    continue
+        pipeline = get_match_pipeline()
+        
+        if stream:
+            async def stream_matches():
+                async for filename, match_result in pipeline.run(job_description, files):
+                    yield json.dumps(format_match(filename, match_result)) + "\n"
                     
-                # Match against job description
-                match_result = matching_engine.match(
-                    job_description,
-                    doc_result['content']
-                )
-                
-                # Add model information
-                result = {
-                    "filename": file.filename,
-                    "match_score": match_result['score'],
-                    "matching_skills": match_result['matching_skills'],
-                    "missing_skills": match_result['missing_skills'],
-                    "section_scores": match_result['section_scores']
-                }
-                
-                results.append(result)
-                
-            # Sort results by match score
-            results.sort(key=lambda x: x["match_score"], reverse=True)
+            return StreamingResponse(stream_matches(), media_type="application/x-ndjson")
             
-            return {
-                "matches": results,
-                "job_description": job_description,
-                "processed_at": datetime.now().isoformat(),
-                "model_info": {
-                    "name": "Base Matching Engine",
-                    "version": "1.0.0",
-                    "enhanced": False
-                }
+        results = [
+            format_match(filename, match_result)
+            async for filename, match_result in pipeline.run(job_description, files)
+        ]
+        
+        # Sort results by match score
+        results.sort(key=lambda x: x["match_score"], reverse=True)
+        
+        return {
+            "matches": results,
+            "job_description": job_description,
+            "processed_at": datetime.now().isoformat(),
+            "model_info": {
+                "name": "Base Matching Engine",
+                "version": "1.0.0",
+                "enhanced": False
             }
-            
-        finally:
-            # Clean up temporary files
-            for temp_file in temp_files:
-                try:
-                    if temp_file.exists():
-                        temp_file.unlink()
-                except Exception as e:
-                    logger.warning(f"Error cleaning up temporary file {temp_file}: {str(e)}")
-                    
+        }
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -256,14 +273,25 @@ async def match_resumes(
         )
 
 @app.get("/health")
-async def health_check() -> Dict[str, str]:
-    """Health check endpoint."""
+async def health_check() -> Dict[str, Any]:
+    """Health check endpoint; reports model warm-up without waiting for it."""
     return {
         "status": "healthy",
         "version": "1.0.0",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now().isoformat(),
+        "models": model_warmup.status()
     }
 
+@app.get("/metrics/embeddings")
+async def embedding_metrics() -> Dict[str, Any]:
+    """Batch size and queue wait metrics for the in-process embedding services."""
+    return {"services": embedding_service_metrics()}
+
+@app.get("/metrics/models")
+async def model_metrics() -> Dict[str, Any]:
+    """Load time and resident memory of each model loaded in this process."""
+    return get_model_registry().stats()
+
 templates = Jinja2Templates(directory="templates")
 
 @app.get("/")
@@ -300,6 +328,8 @@ async def server_error_handler(request: Request, exc):
     )
 
 if __name__ == "__main__":
+    import uvicorn
+    
     print("Starting RME Server...")
     print(f"Access the application at: http://{config['app']['host']}:{config['app']['port']}")
     print("Press Ctrl+C to stop the server")
@@ -4,15 +4,17 @@ from fastapi.templating import Jinja2Templates
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import json
+import logging
 import os
 from pathlib import Path
 import asyncio
 import aiofiles
-import tempfile
 import shutil
 from src.document_processor import DocumentProcessor
 from src.matching_engine import MatchingEngine
 from src.enhanced_document_processor import EnhancedDocumentProcessor
+from src.match_store import DEFAULT_PATH as DEFAULT_MATCH_STORE_PATH, get_match_store
+from src.skill_store import DEFAULT_PATH as DEFAULT_SKILL_STORE_PATH, get_skill_store
 import yaml
 import mimetypes
 
@@ -23,12 +25,32 @@ def load_config():
 
 config = load_config()
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
 # Initialize processors
 document_processor = EnhancedDocumentProcessor()
 matching_engine = MatchingEngine(config=config)
+match_store = get_match_store(config.get('match_store', {}).get('path') or DEFAULT_MATCH_STORE_PATH)
+skill_store = get_skill_store(config.get('skill_store', {}).get('path') or DEFAULT_SKILL_STORE_PATH)
+
+@router.on_event("startup")
+def import_legacy_matches() -> None:
+    """Import match files written before the match store existed (once)."""
+    try:
+        match_store.import_json_files("uploads/matches")
+    except Exception as e:
+        logger.error(f"Error importing match files: {str(e)}")
+
+@router.on_event("startup")
+def import_legacy_resumes() -> None:
+    """Import the skills of resumes uploaded before the skill store existed (once)."""
+    try:
+        skill_store.import_metadata_files("uploads/resumes")
+    except Exception as e:
+        logger.error(f"Error importing resume metadata: {str(e)}")
 
 # File validation
 async def validate_file(file: UploadFile) -> bool:
@@ -109,6 +131,9 @@ async def upload_resume(
         async with aiofiles.open(metadata_path, 'w') as f:
             await f.write(json.dumps(metadata, indent=2))
             
+        # Index the skills for the top-skills widget
+        await asyncio.to_thread(skill_store.set_profile_skills, file_path.stem, skills)
+            
         return {
             "message": "Resume uploaded and processed successfully",
             "filename": file.filename,
@@ -147,6 +172,13 @@ async def create_job(
             "status": "active"
         }
         
+        # Parse and embed the job once; batch matching reuses the result
+        try:
+            prepared_job = await asyncio.to_thread(matching_engine.prepare_job, description, job_title)
+            job_data["prepared_job"] = prepared_job.to_dict()
+        except ValueError as e:
+            logger.warning(f"Job {job_id} will be prepared at match time: {str(e)}")
+        
         # Save job data
         job_path = jobs_dir / f"job_{job_id}.json"
         async with aiofiles.open(job_path, 'w') as f:
@@ -155,7 +187,7 @@ async def create_job(
         return {
             "message": "Job created successfully",
             "job_id": job_id,
-            "job_data": job_data
+            "job_data": {key: value for key, value in job_data.items() if key != "prepared_job"}
         }
         
     except Exception as e:
@@ -190,15 +222,10 @@ async def dashboard_stats():
         jobs_dir = Path("uploads/jobs")
         active_jobs = len([f for f in jobs_dir.glob("*.json") if json.loads(f.read_text())["status"] == "active"])
         
-        # Count matches
-        matches_dir = Path("uploads/matches")
-        matches_dir.mkdir(exist_ok=True)
-        total_matches = len(list(matches_dir.glob("*.json")))
-        
-        # Calculate success rate
-        successful_matches = len([f for f in matches_dir.glob("*.json") 
-                                if json.loads(f.read_text())["score"] >= 0.7])
-        success_rate = (successful_matches / total_matches * 100) if total_matches > 0 else 0
+        # Count matches and calculate success rate
+        match_counts = match_store.stats(success_threshold=0.7)
+        total_matches = match_counts["total"]
+        success_rate = (match_counts["successful"] / total_matches * 100) if total_matches > 0 else 0
         
         return {
             "totalResumes": total_resumes,
@@ -213,19 +240,8 @@ async def dashboard_stats():
 @router.get("/api/matches/recent")
 async def recent_matches():
     try:
-        matches_dir = Path("uploads/matches")
-        matches_dir.mkdir(exist_ok=True)
-        
-        # Get all match files and sort by date
-        match_files = sorted(
-            matches_dir.glob("*.json"),
-            key=lambda x: json.loads(x.read_text())["date"],
-            reverse=True
-        )[:10]  # Get 10 most recent
-        
         matches = []
-        for match_file in match_files:
-            match_data = json.loads(match_file.read_text())
+        for match_data in match_store.recent(10):
             matches.append({
                 "id": match_data["id"],
                 "resumeName": match_data["resume_name"],
@@ -243,62 +259,51 @@ async def recent_matches():
 @router.get("/api/skills/top")
 async def top_skills():
     try:
-        # Get all resume metadata files
-        resume_dir = Path("uploads/resumes")
-        skill_counts = {}
-        
-        for metadata_file in resume_dir.glob("*_metadata.json"):
-            metadata = json.loads(metadata_file.read_text())
-            for skill in metadata.get("skills", []):
-                skill_counts[skill] = skill_counts.get(skill, 0) + 1
-                
-        # Sort skills by count
-        top_skills = sorted(
-            [{"name": skill, "count": count} for skill, count in skill_counts.items()],
-            key=lambda x: x["count"],
-            reverse=True
-        )[:10]  # Get top 10 skills
-        
-        return top_skills
+        return skill_store.top_skills(limit=10)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Batch Processing
-async def process_batch_file(file: UploadFile, job_id: int, matches_dir: Path):
-    """Process a single file in batch mode."""
+async def load_prepared_job(job_id: int) -> Optional[Dict[str, Any]]:
+    """Load a job and its prepared artifacts, re-preparing and saving them if stale."""
+    job_file = Path("uploads/jobs") / f"job_{job_id}.json"
+    if not job_file.exists():
+        return None
+        
+    job_data = json.loads(job_file.read_text())
+    cached = job_data.get("prepared_job")
+    prepared_job = await asyncio.to_thread(
+        matching_engine.load_prepared_job, job_data["description"], cached, job_data["title"]
+    )
+    if cached != prepared_job.to_dict():
+        job_data["prepared_job"] = prepared_job.to_dict()
+        async with aiofiles.open(job_file, 'w') as f:
+            await f.write(json.dumps(job_data, indent=2))
+    job_data["prepared"] = prepared_job
+    return job_data
+
+async def process_batch_file(file: UploadFile, job_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Match a single file in batch mode against a job loaded by load_prepared_job; the caller stores the result."""
     try:
-        # Validate and save file
+        # Validate file
         await validate_file(file)
-        temp_file = Path(tempfile.gettempdir()) / f"rme_temp_{file.filename}"
         
-        async with aiofiles.open(temp_file, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
-            
-        # Process resume
-        doc_result = document_processor.process_document(str(temp_file))
+        # Process resume straight from the upload stream
+        doc_result = document_processor.process_bytes(file.file, file.filename)
         if not doc_result:
             return None
             
-        # Get job description
-        job_file = Path("uploads/jobs") / f"job_{job_id}.json"
-        if not job_file.exists():
-            return None
-            
-        job_data = json.loads(job_file.read_text())
-        
-        # Match resume against job
-        match_result = matching_engine.match(
-            job_data["description"],
+        # Match off the event loop so concurrent files share embedding batches
+        match_result = await asyncio.to_thread(
+            matching_engine.match,
+            job_data["prepared"],
             doc_result['content']
         )
         
-        # Create match record
-        match_id = int(datetime.now().timestamp())
+        # Create match record (the store assigns its id)
         match_data = {
-            "id": match_id,
-            "job_id": job_id,
+            "job_id": job_data["id"],
             "resume_name": file.filename,
             "job_title": job_data["title"],
             "score": match_result["score"],
@@ -308,20 +313,11 @@ async def process_batch_file(file: UploadFile, job_id: int, matches_dir: Path):
             "status": "Matched" if match_result["score"] >= 0.7 else "Pending"
         }
         
-        # Save match data
-        match_file = matches_dir / f"match_{match_id}.json"
-        async with aiofiles.open(match_file, 'w') as f:
-            await f.write(json.dumps(match_data, indent=2))
-            
         return match_data
         
     except Exception as e:
-        print(f"Error processing {file.filename}: {str(e)}")
+        logger.error(f"Error processing {file.filename}: {str(e)}")
         return None
-        
-    finally:
-        if temp_file.exists():
-            temp_file.unlink()
 
 @router.post("/api/batch/process")
 async def batch_process(
@@ -330,20 +326,16 @@ async def batch_process(
     job_id: int = Form(...)
 ):
     try:
-        # Create matches directory
-        matches_dir = Path("uploads/matches")
-        matches_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Verify job exists
-        job_file = Path("uploads/jobs") / f"job_{job_id}.json"
-        if not job_file.exists():
+        # Verify job exists and prepare it once for the whole batch
+        job_data = await load_prepared_job(job_id)
+        if job_data is None:
             raise HTTPException(status_code=404, detail="Job not found")
             
         # Process files in background
         async def process_files():
-            tasks = [process_batch_file(file, job_id, matches_dir) for file in files]
+            tasks = [process_batch_file(file, job_data) for file in files]
             results = await asyncio.gather(*tasks)
-            return [r for r in results if r is not None]
+            return await asyncio.to_thread(match_store.add_many, [r for r in results if r is not None])
             
         background_tasks.add_task(process_files)
         
@@ -39,6 +39,9 @@ def main():
     with open(job_file, 'r', encoding='utf-8') as f:
         job_description = f.read()
     
+    # Parse and embed the job once for every resume
+    prepared_job = matching_engine.prepare_job(job_description)
+    
     # Process and match resumes
     resume_dir = "test_docs/profiles"
     for resume_file in os.listdir(resume_dir):
@@ -54,7 +57,7 @@ def main():
                     continue
                 
                 # Match against job description
-                match_result = matching_engine.match(job_description, doc_result['content'])
+                match_result = matching_engine.match(prepared_job, doc_result['content'])
                 
                 # Print results
                 print("\n" + "="*50)
@@ -1,16 +1,20 @@
 import os
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
 from typing import Dict, List, Any, Optional
 import logging
 from pathlib import Path
 import json
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import faiss
+from .embedding_store import get_embedding_store, model_directory_version
+from .embedding_service import get_embedding_service
+from .model_registry import get_hf_model, get_hf_tokenizer, get_sentence_transformer
 
 logger = logging.getLogger(__name__)
 
+# Small causal LM that can run locally
+LLM_MODEL_NAME = "facebook/opt-125m"
+
 class AIEnhancedMatching:
     """
     AI-enhanced matching capabilities using local models.
@@ -42,16 +46,16 @@ class AIEnhancedMatching:
     def _initialize_models(self):
         """Initialize all required models."""
         try:
-            # Initialize sentence transformer for semantic matching
-            self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
-            self.sentence_model.to(self.device)
-            
-            # Initialize local LLM for advanced analysis
-            # Using a smaller model that can run locally
-            model_name = "facebook/opt-125m"  # Small model that can run locally
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.llm_model = AutoModelForCausalLM.from_pretrained(model_name)
-            self.llm_model.to(self.device)
+            # Sentence transformer and LLM come from the shared model registry
+            # and are loaded on first use
+            self._sentence_model = None
+            self._sentence_model_name = 'all-MiniLM-L6-v2'
+            self._llm_model = None
+            self._tokenizer = None
+            self.embedding_store = get_embedding_store(
+                self._sentence_model_name,
+                directory=str(self.model_path / 'embeddings')
+            )
             
             # Initialize FAISS index for similarity search
             self.skill_index = faiss.IndexFlatL2(384)  # 384 is the dimension of all-MiniLM-L6-v2
@@ -63,6 +67,32 @@ class AIEnhancedMatching:
             logger.error(f"Error initializing models: {str(e)}")
             raise
             
+    @property
+    def sentence_model(self) -> Any:
+        """Sentence transformer for semantic matching (shared, loaded on first use)."""
+        if self._sentence_model is None:
+            self._sentence_model = get_sentence_transformer(self._sentence_model_name, device=self.device)
+        return self._sentence_model
+        
+    @property
+    def llm_model(self) -> Any:
+        """Local LLM for advanced analysis (shared, loaded on first use)."""
+        if self._llm_model is None:
+            self._llm_model = get_hf_model(LLM_MODEL_NAME, device=self.device, auto_class='AutoModelForCausalLM')
+        return self._llm_model
+        
+    @property
+    def tokenizer(self) -> Any:
+        """Tokenizer for the local LLM (shared, loaded on first use)."""
+        if self._tokenizer is None:
+            self._tokenizer = get_hf_tokenizer(LLM_MODEL_NAME)
+        return self._tokenizer
+        
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts through the shared persistent embedding store and batching service."""
+        service = get_embedding_service(self.sentence_model, name=self._sentence_model_name)
+        return self.embedding_store.get_or_compute(texts, service.encode)
+            
     def analyze_skill_similarity(self, skill1: str, skill2: str) -> float:
         """
         Analyze semantic similarity between two skills.
@@ -76,7 +106,7 @@ class AIEnhancedMatching:
         """
         try:
             # Get embeddings for both skills
-            embeddings = self.sentence_model.encode([skill1, skill2])
+            embeddings = self._encode([skill1, skill2])
             
             # Calculate cosine similarity
             similarity = np.dot(embeddings[0], embeddings[1]) / (
@@ -175,7 +205,7 @@ class AIEnhancedMatching:
         """
         try:
             # Get embedding for the input skill
-            skill_embedding = self.sentence_model.encode([skill])[0]
+            skill_embedding = self._encode([skill])[0]
             
             # Search in FAISS index
             D, I = self.skill_index.search(
@@ -300,7 +330,7 @@ class AIEnhancedMatching:
         """
         try:
             # Get embeddings for all skills
-            embeddings = self.sentence_model.encode(skills)
+            embeddings = self._encode(skills)
             
             # Add to FAISS index
             self.skill_index.add(embeddings.astype('float32'))
@@ -352,14 +382,23 @@ class AIEnhancedMatching:
         try:
             load_path = Path(path) if path else self.model_path
             
-            # Load sentence transformer
-            self.sentence_model = SentenceTransformer(str(load_path / "sentence_transformer"))
-            self.sentence_model.to(self.device)
+            # Load sentence transformer; its vectors get a store of their own
+            sentence_path = load_path / "sentence_transformer"
+            self._sentence_model = get_sentence_transformer(str(sentence_path), device=self.device)
+            self._sentence_model_name = str(sentence_path)
+            self.embedding_store = get_embedding_store(
+                sentence_path.name,
+                model_version=model_directory_version(str(sentence_path)),
+                directory=str(self.model_path / 'embeddings')
+            )
             
             # Load LLM model and tokenizer
-            self.llm_model = AutoModelForCausalLM.from_pretrained(str(load_path / "llm_model"))
-            self.tokenizer = AutoTokenizer.from_pretrained(str(load_path / "llm_model"))
-            self.llm_model.to(self.device)
+            self._llm_model = get_hf_model(
+                str(load_path / "llm_model"),
+                device=self.device,
+                auto_class='AutoModelForCausalLM'
+            )
+            self._tokenizer = get_hf_tokenizer(str(load_path / "llm_model"))
             
             # Load FAISS index
             self.skill_index = faiss.read_index(str(load_path / "skill_index.faiss"))
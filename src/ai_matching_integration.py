@@ -6,14 +6,14 @@ from pathlib import Path
 import json
 import yaml
 import torch
-from transformers import AutoTokenizer, AutoModel, pipeline
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 import aiofiles
 import warnings
 import re
 from .matching_engine import MatchingEngine
-from .enhanced_document_processor import EnhancedDocumentProcessor
+from .model_registry import get_hf_model, get_hf_pipeline, get_hf_tokenizer
+from .embedding_backend import encode_bucketed, torch_forward
 
 logger = logging.getLogger(__name__)
 
@@ -48,47 +48,42 @@ class AIMatchingIntegration:
             cache_size=cache_size
         )
         
-        self.doc_processor = EnhancedDocumentProcessor(
-            model_path=str(self.model_path),
-            device=self.device,
-            max_workers=max_workers
-        )
+        # Reuse the engine's processor rather than building a second one
+        self.doc_processor = self.matching_engine.doc_processor
         
-        # Initialize AI models
+        # AI models are loaded lazily from the shared model registry
         self._load_models()
         
     def _load_models(self) -> None:
-        """Load required AI models with error handling."""
-        try:
-            # Load BERT model for detailed analysis
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                'bert-base-uncased',
-                cache_dir=str(self.model_path)
-            )
-            self.bert_model = AutoModel.from_pretrained(
-                'bert-base-uncased',
-                cache_dir=str(self.model_path)
-            ).to(self.device)
-            
-            # Load sentiment analysis pipeline
-            self.sentiment_analyzer = pipeline(
-                'sentiment-analysis',
-                model='distilbert-base-uncased-finetuned-sst-2-english',
-                device=0 if self.device == 'cuda' else -1
-            )
-            
-            # Load NER pipeline
-            self.ner_analyzer = pipeline(
-                'ner',
-                model='dbmdz/bert-large-cased-finetuned-conll03-english',
-                device=0 if self.device == 'cuda' else -1
-            )
-            
-            logger.info("Successfully loaded all AI models")
-            
-        except Exception as e:
-            logger.error(f"Error loading AI models: {str(e)}")
-            raise
+        """Defer model loading; models come from the shared registry on first use."""
+        
+    @property
+    def tokenizer(self) -> Any:
+        """BERT tokenizer for detailed analysis (shared, loaded on first use)."""
+        return get_hf_tokenizer('bert-base-uncased', cache_dir=str(self.model_path))
+        
+    @property
+    def bert_model(self) -> Any:
+        """BERT model for detailed analysis (shared, loaded on first use)."""
+        return get_hf_model('bert-base-uncased', device=self.device, cache_dir=str(self.model_path))
+        
+    @property
+    def sentiment_analyzer(self) -> Any:
+        """Sentiment analysis pipeline (shared, loaded on first use)."""
+        return get_hf_pipeline(
+            'sentiment-analysis',
+            'distilbert-base-uncased-finetuned-sst-2-english',
+            device=self.device
+        )
+        
+    @property
+    def ner_analyzer(self) -> Any:
+        """NER pipeline (shared, loaded on first use)."""
+        return get_hf_pipeline(
+            'ner',
+            'dbmdz/bert-large-cased-finetuned-conll03-english',
+            device=self.device
+        )
             
     async def analyze_content(self, content: str) -> Dict[str, Any]:
         """Perform comprehensive AI analysis of content."""
@@ -356,48 +351,21 @@ class AIMatchingIntegration:
     async def _extract_key_phrases(self, text: str) -> List[str]:
         """Extract key phrases from text."""
         try:
-            # Tokenize text
-            tokens = self.tokenizer(
-                text,
-                return_tensors='pt',
-                truncation=True,
-                max_length=512
-            ).to(self.device)
-            
-            # Get BERT embeddings
-            with torch.no_grad():
-                outputs = self.bert_model(**tokens)
-                embeddings = outputs.last_hidden_state.mean(dim=1)
-                
-            # Convert to numpy
-            embeddings = embeddings.cpu().numpy()
-            
-            # Use embeddings to identify important phrases
-            # This is a simplified version - you might want to use a more sophisticated approach
-            sentences = text.split('.')
-            sentence_embeddings = []
-            
-            for sentence in sentences:
-                if sentence.strip():
-                    sentence_tokens = self.tokenizer(
-                        sentence,
-                        return_tensors='pt',
-                        truncation=True,
-                        max_length=128
-                    ).to(self.device)
-                    
-                    with torch.no_grad():
-                        sentence_outputs = self.bert_model(**sentence_tokens)
-                        sentence_embedding = sentence_outputs.last_hidden_state.mean(dim=1)
-                        sentence_embeddings.append(sentence_embedding.cpu().numpy())
-                        
+            # Embed the whole text, then every sentence in length-sorted batches
+            forward = torch_forward(self.bert_model, self.device)
+            embeddings = encode_bucketed([text], self.tokenizer, forward, max_length=512)
+            
+            sentences = [sentence for sentence in text.split('.') if sentence.strip()]
+            if not sentences:
+                return []
+            sentence_embeddings = encode_bucketed(
+                sentences, self.tokenizer, forward, max_length=128, batch_size=64
+            )
+            
             # Compute similarities
-            similarities = []
-            for sentence_embedding in sentence_embeddings:
-                similarity = np.dot(embeddings, sentence_embedding.T) / (
-                    np.linalg.norm(embeddings) * np.linalg.norm(sentence_embedding)
-                )
-                similarities.append(float(similarity[0][0]))
+            similarities = (sentence_embeddings @ embeddings[0]) / (
+                np.linalg.norm(sentence_embeddings, axis=1) * np.linalg.norm(embeddings[0])
+            )
                 
             # Get top phrases
             top_indices = np.argsort(similarities)[-5:]  # Get top 5 phrases
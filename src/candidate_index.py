@@ -0,0 +1,176 @@
+"""
+Candidate Retrieval Index for RME
+Approximate-nearest-neighbour shortlist of whole-profile embeddings, used before
+the expensive section-by-section scoring.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:  # faiss is optional; fall back to exact NumPy search
+    faiss = None
+
+logger = logging.getLogger(__name__)
+
+# Fraction of tombstoned HNSW entries that triggers a rebuild of the graph
+COMPACT_FRACTION = 0.25
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so inner product equals cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms)
+
+
+class CandidateIndex:
+    """
+    Cosine-similarity index over candidate embeddings keyed by external ids.
+
+    Uses FAISS when installed ("flat" = exact IndexFlatIP, "hnsw" = IndexHNSWFlat)
+    and an exact NumPy matrix search otherwise. Candidates can be added,
+    replaced and removed incrementally; HNSW does not support deletion, so
+    removed candidates are tombstoned and filtered from results, and the
+    graph is rebuilt from the live vectors once tombstones pass
+    COMPACT_FRACTION of its entries.
+    """
+
+    INDEX_TYPES = ("flat", "hnsw")
+
+    def __init__(self, dim: int, index_type: str = "flat", hnsw_m: int = 32, use_faiss: Optional[bool] = None):
+        """
+        Initialize an empty candidate index.
+
+        Args:
+            dim: Embedding dimension
+            index_type: "flat" (exact) or "hnsw" (approximate, FAISS only)
+            hnsw_m: Neighbours per node for HNSW graphs
+            use_faiss: Force the FAISS (True) or NumPy (False) backend; auto if None
+        """
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(f"Unsupported index type: {index_type}")
+
+        self.dim = dim
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.use_faiss = faiss is not None if use_faiss is None else (use_faiss and faiss is not None)
+        if use_faiss and faiss is None:
+            logger.warning("faiss is not installed, using NumPy candidate index")
+
+        self._labels: Dict[str, int] = {}
+        self._ids: Dict[int, str] = {}
+        self._next_label = 0
+        self._deleted: Set[int] = set()
+
+        if self.use_faiss:
+            self._index = self._new_faiss_index()
+        else:
+            self._vectors = np.zeros((0, dim), dtype=np.float32)
+            self._vector_labels = np.zeros(0, dtype=np.int64)
+
+    def _new_faiss_index(self):
+        """Create the FAISS index for the configured index type."""
+        if self.index_type == "hnsw":
+            base = faiss.IndexHNSWFlat(self.dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        else:
+            base = faiss.IndexFlatIP(self.dim)
+        return faiss.IndexIDMap2(base)
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, candidate_id: str) -> bool:
+        return str(candidate_id) in self._labels
+
+    def ids(self) -> Set[str]:
+        """Return the ids of all indexed candidates."""
+        return set(self._labels)
+
+    def add(self, ids: Sequence[str], embeddings: np.ndarray) -> None:
+        """Add candidates, replacing any that are already indexed."""
+        if not len(ids):
+            return
+        vectors = _normalize(embeddings)
+        if vectors.shape != (len(ids), self.dim):
+            raise ValueError(f"Expected embeddings of shape ({len(ids)}, {self.dim}), got {vectors.shape}")
+
+        ids = [str(candidate_id) for candidate_id in ids]
+        self.remove([candidate_id for candidate_id in ids if candidate_id in self._labels])
+
+        labels = np.arange(self._next_label, self._next_label + len(ids), dtype=np.int64)
+        self._next_label += len(ids)
+        for candidate_id, label in zip(ids, labels):
+            self._labels[candidate_id] = int(label)
+            self._ids[int(label)] = candidate_id
+
+        if self.use_faiss:
+            self._index.add_with_ids(vectors, labels)
+        else:
+            self._vectors = np.vstack([self._vectors, vectors])
+            self._vector_labels = np.concatenate([self._vector_labels, labels])
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """Remove candidates (e.g. deactivated profiles) from the index."""
+        labels = []
+        for candidate_id in ids:
+            label = self._labels.pop(str(candidate_id), None)
+            if label is not None:
+                del self._ids[label]
+                labels.append(label)
+        if not labels:
+            return
+
+        if not self.use_faiss:
+            keep = ~np.isin(self._vector_labels, labels)
+            self._vectors = self._vectors[keep]
+            self._vector_labels = self._vector_labels[keep]
+        elif self.index_type == "hnsw":
+            self._deleted.update(labels)
+            if len(self._deleted) > COMPACT_FRACTION * self._index.ntotal:
+                self._compact()
+        else:
+            self._index.remove_ids(np.asarray(labels, dtype=np.int64))
+
+    def _compact(self) -> None:
+        """Rebuild the FAISS index from its live vectors, dropping tombstones."""
+        labels = np.asarray(sorted(self._ids), dtype=np.int64)
+        index = self._new_faiss_index()
+        if len(labels):
+            vectors = np.vstack([self._index.reconstruct(int(label)) for label in labels])
+            index.add_with_ids(vectors, labels)
+        self._index = index
+        self._deleted.clear()
+
+    def search(self, query: np.ndarray, top_n: int) -> List[Tuple[str, float]]:
+        """
+        Return the top_n most similar candidates for a query embedding.
+
+        Returns:
+            List of (candidate id, cosine similarity), best first
+        """
+        if top_n <= 0 or not self._labels:
+            return []
+        query = _normalize(query)
+
+        if self.use_faiss:
+            k = min(top_n + len(self._deleted), self._index.ntotal)
+            scores, labels = self._index.search(query, k)
+            results = [
+                (self._ids[int(label)], float(score))
+                for score, label in zip(scores[0], labels[0])
+                if label >= 0 and int(label) not in self._deleted
+            ]
+            return results[:top_n]
+
+        scores = self._vectors @ query[0]
+        k = min(top_n, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._ids[int(self._vector_labels[i])], float(scores[i])) for i in top]
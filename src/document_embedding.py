@@ -0,0 +1,202 @@
+"""
+Chunked Document Embeddings for RME
+Embeds long resumes and job descriptions as overlapping paragraph windows
+instead of one truncated input, keeping a pooled vector for retrieval and the
+per-chunk matrix for max-sim scoring.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .embedding_store import EmbeddingStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_WORDS = 180
+DEFAULT_OVERLAP_WORDS = 30
+DEFAULT_MAX_CHUNKS = 64
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def split_chunks(
+    text: str,
+    chunk_words: int = DEFAULT_CHUNK_WORDS,
+    overlap_words: int = DEFAULT_OVERLAP_WORDS,
+    max_chunks: int = DEFAULT_MAX_CHUNKS
+) -> List[str]:
+    """
+    Split a document into overlapping windows along paragraph boundaries.
+
+    Paragraphs (blank-line separated) are packed into windows of at most
+    chunk_words words; a new window starts with the last overlap_words words
+    of the previous one. Paragraphs longer than a window are cut into
+    overlapping windows of their own.
+
+    Args:
+        text: Document text
+        chunk_words: Words per window; keep it well under the model's token limit
+        overlap_words: Words shared by consecutive windows
+        max_chunks: Windows kept per document (the rest are dropped)
+
+    Returns:
+        Chunk texts in document order (empty for blank text)
+    """
+    overlap_words = min(overlap_words, chunk_words - 1)
+    step = chunk_words - overlap_words
+
+    units: List[List[str]] = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        words = paragraph.split()
+        for start in range(0, max(len(words) - overlap_words, 1), step):
+            if words[start:start + chunk_words]:
+                units.append(words[start:start + chunk_words])
+
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    for unit in units:
+        if current and len(current) + len(unit) > chunk_words:
+            chunks.append(current)
+            carry = current[-overlap_words:] if overlap_words else []
+            current = carry if len(carry) + len(unit) <= chunk_words else []
+        current = current + unit
+    if current:
+        chunks.append(current)
+
+    if len(chunks) > max_chunks:
+        logger.debug(f"Document split into {len(chunks)} chunks, keeping the first {max_chunks}")
+        chunks = chunks[:max_chunks]
+    return [" ".join(words) for words in chunks]
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+@dataclass
+class DocumentEmbedding:
+    """Pooled (dim,) vector and per-chunk (chunks, dim) matrix of one document; rows are L2-normalized."""
+    pooled: np.ndarray
+    chunks: np.ndarray
+
+
+def max_sim(query: DocumentEmbedding, document: DocumentEmbedding) -> float:
+    """
+    Late-interaction similarity: each query chunk is matched with its most
+    similar document chunk, and the similarities are averaged.
+
+    With a job description as the query this measures how much of the job is
+    covered somewhere in the resume, however long the resume is.
+    """
+    if not len(query.chunks) or not len(document.chunks):
+        return 0.0
+    return float((query.chunks @ document.chunks.T).max(axis=1).mean())
+
+
+def pooled_similarity(first: DocumentEmbedding, second: DocumentEmbedding) -> float:
+    """Cosine similarity of two pooled document vectors."""
+    return float(np.dot(first.pooled, second.pooled))
+
+
+class ChunkedEmbedder:
+    """
+    Embeds documents chunk by chunk.
+
+    Chunks of every document in a call are embedded in one batch through
+    embed_texts (typically backed by the embedding store, so chunks shared
+    between documents or seen before are not re-encoded). The pooled vector
+    is the normalized mean of the chunk vectors and is kept in pooled_store,
+    so retrieval can read it without touching the chunks.
+    """
+
+    def __init__(
+        self,
+        embed_texts: Callable[[List[str]], np.ndarray],
+        pooled_store: Optional[EmbeddingStore] = None,
+        chunk_words: int = DEFAULT_CHUNK_WORDS,
+        overlap_words: int = DEFAULT_OVERLAP_WORDS,
+        max_chunks: int = DEFAULT_MAX_CHUNKS
+    ):
+        """
+        Initialize the embedder.
+
+        Args:
+            embed_texts: Maps a list of chunk texts to a 2-D embedding array
+            pooled_store: Store for pooled document vectors (not persisted if None)
+            chunk_words: Words per chunk window
+            overlap_words: Words shared by consecutive chunks
+            max_chunks: Chunks kept per document
+        """
+        self.embed_texts = embed_texts
+        self.pooled_store = pooled_store
+        self.chunk_words = chunk_words
+        self.overlap_words = overlap_words
+        self.max_chunks = max_chunks
+
+    def chunk(self, text: str) -> List[str]:
+        """Split a document into chunk texts."""
+        return split_chunks(text, self.chunk_words, self.overlap_words, self.max_chunks) or [text]
+
+    def _assemble(self, texts: Sequence[str], chunk_lists: List[List[str]], vectors: np.ndarray) -> List[DocumentEmbedding]:
+        vectors = _normalize_rows(np.asarray(vectors, dtype=np.float32))
+        documents = []
+        start = 0
+        for chunks in chunk_lists:
+            matrix = vectors[start:start + len(chunks)]
+            start += len(chunks)
+            documents.append(DocumentEmbedding(_normalize_rows(matrix.mean(axis=0)), matrix))
+        if self.pooled_store is not None:
+            self.pooled_store.put_many(list(texts), np.stack([document.pooled for document in documents]))
+        return documents
+
+    def embed(self, texts: Sequence[str]) -> List[DocumentEmbedding]:
+        """Embed documents, encoding all their chunks in one batch."""
+        chunk_lists = [self.chunk(text) for text in texts]
+        if not chunk_lists:
+            return []
+        vectors = self.embed_texts([chunk for chunks in chunk_lists for chunk in chunks])
+        return self._assemble(texts, chunk_lists, vectors)
+
+    async def embed_async(
+        self,
+        texts: Sequence[str],
+        embed_texts_async: Callable[[List[str]], Awaitable[np.ndarray]]
+    ) -> List[DocumentEmbedding]:
+        """Embed documents without blocking the event loop while the model runs."""
+        chunk_lists = [self.chunk(text) for text in texts]
+        if not chunk_lists:
+            return []
+        vectors = await embed_texts_async([chunk for chunks in chunk_lists for chunk in chunks])
+        return self._assemble(texts, chunk_lists, vectors)
+
+    def pooled(self, texts: Sequence[str]) -> np.ndarray:
+        """Return pooled vectors, reading stored ones and embedding only the rest."""
+        if self.pooled_store is None:
+            return np.stack([document.pooled for document in self.embed(texts)])
+        found = self.pooled_store.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, found) if vector is None))
+        if missing:
+            computed = {text: document.pooled for text, document in zip(missing, self.embed(missing))}
+            found = [vector if vector is not None else computed[text] for text, vector in zip(texts, found)]
+        return np.stack(found).astype(np.float32, copy=False)
+
+
+def chunking_options(settings: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Map the embedding_chunking section of config.yaml to ChunkedEmbedder keyword arguments."""
+    settings = settings or {}
+    return {
+        "chunk_words": int(settings.get("chunk_words", DEFAULT_CHUNK_WORDS)),
+        "overlap_words": int(settings.get("overlap_words", DEFAULT_OVERLAP_WORDS)),
+        "max_chunks": int(settings.get("max_chunks", DEFAULT_MAX_CHUNKS))
+    }
+
+
+def pooled_store_version(base: str, options: Dict[str, Any]) -> str:
+    """Store version for pooled vectors, which depend on how documents were chunked."""
+    return f"{base}+pooled-{options['chunk_words']}-{options['overlap_words']}-{options['max_chunks']}"
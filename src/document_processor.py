@@ -1,4 +1,5 @@
-from typing import List, Dict, Any, Optional
+from typing import BinaryIO, Iterator, List, Dict, Any, Optional, Tuple, Union
+import io
 import os
 from pathlib import Path
 from docx import Document as DocxDocument
@@ -8,8 +9,14 @@ from datetime import datetime, timezone
 import re
 from functools import lru_cache
 import logging.config
-import shutil
-import tempfile
+import time
+import multiprocessing
+from collections import deque
+from itertools import count
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import yaml
+from .parse_cache import ParseCache, get_parse_cache
 
 # Configure logging
 logging_config = {
@@ -41,17 +48,237 @@ logging_config = {
 logging.config.dictConfig(logging_config)
 logger = logging.getLogger(__name__)
 
+CONFIG_PATH = Path(__file__).parent.parent / "config.yaml"
+
+# Header alternatives per section (longest first); overridden by
+# document_processing.section_patterns in config.yaml
+DEFAULT_SECTION_PATTERNS = {
+    'skills': r'technical skills|skills|expertise',
+    'experience': r'work experience|experience|employment',
+    'education': r'education|academic|qualification',
+    'certifications': r'certifications|certificates|accreditations',
+    'summary': r'summary|profile|about'
+}
+
+class SectionSegmenter:
+    """
+    Single-pass section segmenter.
+
+    All section headers are found by one scan with a precompiled alternation.
+    Patterns match case-insensitively: lower-case patterns (the defaults) are
+    matched case-sensitively against the lower-cased text, which is faster,
+    and any other pattern set is compiled with IGNORECASE. A header is a
+    section keyword followed by ':' or a keyword alone on its own line. A section runs from the end of its first header to the next header
+    line or blank line, whichever comes first.
+    """
+    _BLANK_LINE = re.compile(r'\n\s*\n')
+
+    def __init__(self, patterns: Dict[str, str]):
+        """
+        Compile the header alternation.
+
+        Args:
+            patterns: Mapping of section name to header regex
+        """
+        self.names = list(patterns)
+        # One flat, ungrouped alternation keeps the regex engine's fast paths;
+        # hits are mapped back to their section afterwards
+        alternation = '|'.join(patterns.values())
+        header = rf"(?:{alternation})[ \t]*(?::|\r?$)"
+        # Upper-case letters in a pattern would never match the lowered text
+        flags = re.MULTILINE if header == header.lower() else re.MULTILINE | re.IGNORECASE
+        self._headers = re.compile(header, flags)
+        self._headers_ignorecase = re.compile(header, re.MULTILINE | re.IGNORECASE)
+        self._sections = [(name, re.compile(pattern, re.IGNORECASE)) for name, pattern in patterns.items()]
+        self._keyword_sections: Dict[str, Optional[str]] = {}
+
+    def _section_for(self, keyword: str) -> Optional[str]:
+        keyword = keyword.lower()
+        if keyword not in self._keyword_sections:
+            self._keyword_sections[keyword] = next(
+                (name for name, pattern in self._sections if pattern.fullmatch(keyword)), None
+            )
+        return self._keyword_sections[keyword]
+
+    def _find_headers(self, text: str) -> List[Tuple[int, int, str]]:
+        """Return (start, end, section) for every header in the text."""
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            matches = self._headers.finditer(lowered)
+        else:  # lower() changed offsets (rare non-ASCII); match case-insensitively instead
+            lowered = text
+            matches = self._headers_ignorecase.finditer(text)
+
+        headers = []
+        for match in matches:
+            # Headers without a colon must stand alone on their line
+            if not match.group().endswith(':'):
+                line_start = lowered.rfind('\n', 0, match.start()) + 1
+                if lowered[line_start:match.start()].strip():
+                    continue
+            section = self._section_for(match.group().rstrip(': \t\r'))
+            if section:
+                headers.append((match.start(), match.end(), section))
+        return headers
+
+    def spans(self, text: str) -> Dict[str, Tuple[int, int]]:
+        """Return (start, end) offsets of each section body found in the text."""
+        headers = self._find_headers(text)
+        spans = {}
+        for i, (_, start, name) in enumerate(headers):
+            if name in spans:
+                continue
+            limit = len(text)
+            if i + 1 < len(headers):
+                # End at the start of the next header's line ("Required Skills:")
+                next_header = headers[i + 1][0]
+                line_break = text.rfind('\n', start, next_header)
+                limit = line_break if line_break >= 0 else next_header
+            blank_line = self._BLANK_LINE.search(text, start, limit)
+            end = blank_line.start() if blank_line else limit
+            
+            # Trim surrounding whitespace without copying the body
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            spans[name] = (start, end)
+        return spans
+
+def load_section_patterns(config_path: Path = CONFIG_PATH) -> Dict[str, str]:
+    """Load document_processing.section_patterns from config.yaml, falling back to defaults."""
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+        patterns = config.get('document_processing', {}).get('section_patterns')
+        if patterns:
+            return dict(patterns)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.error(f"Error loading section patterns from {config_path}: {str(e)}")
+    return dict(DEFAULT_SECTION_PATTERNS)
+
+@lru_cache(maxsize=16)
+def _compile_segmenter(patterns: Tuple[Tuple[str, str], ...]) -> SectionSegmenter:
+    return SectionSegmenter(dict(patterns))
+
+def get_section_segmenter(patterns: Optional[Dict[str, str]] = None) -> SectionSegmenter:
+    """Return a compiled segmenter for the given (or configured) section patterns."""
+    if patterns is None:
+        patterns = load_section_patterns()
+    return _compile_segmenter(tuple(patterns.items()))
+
+# In-memory document input: any buffer (bytes, bytearray, memoryview, mmap) or a binary stream
+DocumentSource = Union[bytes, bytearray, memoryview, BinaryIO]
+
+class _BufferReader(io.RawIOBase):
+    """Seekable read-only stream over a buffer, so parsers can read it without a copy."""
+    
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._pos = 0
+        
+    def readable(self) -> bool:
+        return True
+        
+    def seekable(self) -> bool:
+        return True
+        
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+        
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+        
+    def tell(self) -> int:
+        return self._pos
+        
+    def close(self) -> None:
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+def _as_stream(source: DocumentSource) -> BinaryIO:
+    """Return a seekable binary stream over a buffer or stream, without copying the data."""
+    try:
+        return _BufferReader(source)
+    except TypeError:  # not a buffer, already a stream
+        return source
+
+# Bump when text extraction changes so cached parses are not reused
+PARSER_VERSION = "1"
+
+# Per-process processor used by ingestion pool workers, and the queue on
+# which they report when they start a task
+_worker_processor = None
+_worker_started = None
+
+def _init_worker(max_file_size: int, section_patterns: Dict[str, str],
+                 cache_bytes: int, cache_path: Optional[str], started=None) -> None:
+    global _worker_processor, _worker_started
+    _worker_processor = DocumentProcessor(
+        max_file_size,
+        section_patterns=section_patterns,
+        parse_cache=get_parse_cache(cache_bytes, cache_path, PARSER_VERSION)
+    )
+    _worker_started = started
+
+def _process_in_worker(file_path: str, task_id: int = 0) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Process a file, returning the result and its parse-cache key so the parent can cache it."""
+    if _worker_started is not None:
+        # SimpleQueue.put writes to the pipe before returning, so the parent
+        # sees the start even if the parser then hangs
+        _worker_started.put((task_id, time.time()))
+    result = _worker_processor.process_document(file_path)
+    if result is None:
+        return None, None
+    path = Path(file_path)
+    return result, _worker_processor.parse_cache.key(path.read_bytes(), path.suffix.lower())
+
+def process_bytes_in_worker(data: bytes, filename: str) -> Optional[Dict[str, Any]]:
+    """Run process_bytes in a pool created by DocumentProcessor.create_worker_pool."""
+    return _worker_processor.process_bytes(data, filename)
+
 class DocumentProcessor:
     """Class for processing different types of documents."""
     
-    def __init__(self, max_file_size: int = 10 * 1024 * 1024):  # 10MB default
-        """Initialize the document processor."""
+    def __init__(self, max_file_size: int = 10 * 1024 * 1024,  # 10MB default
+                 section_patterns: Optional[Dict[str, str]] = None,
+                 max_workers: int = 1,
+                 parse_timeout: float = 120.0,
+                 parse_cache: Optional[ParseCache] = None):
+        """
+        Initialize the document processor.
+        
+        Args:
+            max_file_size: Largest file accepted, in bytes
+            section_patterns: Section header patterns (config.yaml when None)
+            max_workers: Worker processes for batch ingestion (1 = serial, 0 = one per core)
+            parse_timeout: Seconds a worker may spend on one file before it is killed
+            parse_cache: Cache of extracted text (shared in-memory cache when None)
+        """
         self.logger = logging.getLogger(__name__)
+        self.section_patterns = dict(section_patterns or load_section_patterns())
+        self.section_segmenter = get_section_segmenter(self.section_patterns)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parse_timeout = parse_timeout
+        self.parse_cache = parse_cache if parse_cache is not None else get_parse_cache(version=PARSER_VERSION)
         self.supported_formats = {
             '.txt': self._process_txt,
             '.docx': self._process_docx,
             '.pdf': self._process_pdf
         }
+        self.stream_readers = {
+            '.txt': self._read_txt,
+            '.docx': self._read_docx,
+            '.pdf': self._read_pdf
+        }
         self.max_file_size = max_file_size
         self.encodings = ['utf-8', 'latin-1', 'cp1252']
         
@@ -72,16 +299,14 @@ class DocumentProcessor:
         """Process all documents in a directory."""
         results = {}
         try:
-            for filename in os.listdir(directory):
-                filepath = os.path.join(directory, filename)
-                suffix = Path(filename).suffix.lower()
-                if suffix in self.supported_formats:
-                    try:
-                        doc_result = self.process_document(filepath)
-                        if doc_result and isinstance(doc_result, dict) and 'content' in doc_result:
-                            results[filename] = doc_result['content']
-                    except Exception as e:
-                        self.logger.error(f"Error processing file {filepath}: {str(e)}")
+            filepaths = [
+                os.path.join(directory, filename)
+                for filename in os.listdir(directory)
+                if Path(filename).suffix.lower() in self.supported_formats
+            ]
+            for filepath, doc_result in self.process_batch(filepaths).items():
+                if isinstance(doc_result, dict) and 'content' in doc_result:
+                    results[os.path.basename(filepath)] = doc_result['content']
             return results
         except Exception as e:
             self.logger.error(f"Error processing directory {directory}: {str(e)}")
@@ -98,106 +323,160 @@ class DocumentProcessor:
         self.logger.error(f"Failed to decode file {file_path} with any supported encoding")
         return None
         
-    def _create_temp_copy(self, file_path: Path) -> Path:
-        """Create a temporary copy of the file for processing."""
-        try:
-            temp_dir = Path(tempfile.gettempdir())
-            temp_file = temp_dir / f"rme_temp_{file_path.name}"
-            shutil.copy2(file_path, temp_file)
-            return temp_file
-        except Exception as e:
-            self.logger.error(f"Error creating temporary copy: {str(e)}")
-            raise
-            
     def _process_docx(self, file_path: str) -> Optional[str]:
         """Process a Word document with improved error handling."""
-        temp_file = None
         try:
-            # Create a temporary copy to avoid file locking issues
-            temp_file = self._create_temp_copy(Path(file_path))
-            
-            # Try to open the document
-            doc = DocxDocument(temp_file)
-            
-            # Extract text from paragraphs
-            text_parts = []
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_parts.append(paragraph.text)
-                    
-            # Also try to extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            text_parts.append(cell.text)
-                            
-            return '\n'.join(text_parts)
-            
+            with open(file_path, 'rb') as f:
+                return self._read_docx(f, file_path)
         except Exception as e:
             self.logger.error(f"Error reading Word document {file_path}: {str(e)}")
             return None
             
-        finally:
-            # Clean up temporary file
-            if temp_file and temp_file.exists():
-                try:
-                    temp_file.unlink()
-                except Exception as e:
-                    self.logger.warning(f"Error cleaning up temporary file: {str(e)}")
-                    
     def _process_pdf(self, file_path: str) -> Optional[str]:
         """Process a PDF file with improved error handling."""
-        temp_file = None
         try:
-            # Create a temporary copy to avoid file locking issues
-            temp_file = self._create_temp_copy(Path(file_path))
-            
-            # Try to open the PDF
-            reader = PdfReader(temp_file)
+            with open(file_path, 'rb') as f:
+                return self._read_pdf(f, file_path)
+        except Exception as e:
+            self.logger.error(f"Error reading PDF file {file_path}: {str(e)}")
+            return None
             
-            # Verify PDF is not encrypted
-            if reader.is_encrypted:
-                self.logger.error(f"PDF file is encrypted: {file_path}")
-                return None
+    def _read_txt(self, stream: BinaryIO, name: str) -> Optional[str]:
+        """Decode a text document with multiple encoding attempts."""
+        data = stream.read()
+        for encoding in self.encodings:
+            try:
+                # Universal newlines, as when reading the file in text mode
+                return str(data, encoding).replace('\r\n', '\n').replace('\r', '\n')
+            except UnicodeDecodeError:
+                continue
+        self.logger.error(f"Failed to decode file {name} with any supported encoding")
+        return None
+        
+    def _read_docx(self, stream: BinaryIO, name: str) -> Optional[str]:
+        """Extract paragraph and table text from a Word document stream."""
+        doc = DocxDocument(stream)
+        
+        # Extract text from paragraphs
+        text_parts = []
+        for paragraph in doc.paragraphs:
+            if paragraph.text.strip():
+                text_parts.append(paragraph.text)
                 
-            # Extract text from each page
-            text_parts = []
-            for page in reader.pages:
-                try:
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        text_parts.append(page_text)
-                except Exception as e:
-                    self.logger.warning(f"Error extracting text from page: {str(e)}")
-                    continue
-                    
-            if not text_parts:
-                self.logger.warning(f"No text content found in PDF: {file_path}")
-                return None
+        # Also try to extract text from tables
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    if cell.text.strip():
+                        text_parts.append(cell.text)
+                        
+        return '\n'.join(text_parts)
+        
+    def _read_pdf(self, stream: BinaryIO, name: str) -> Optional[str]:
+        """Extract page text from a PDF stream."""
+        reader = PdfReader(stream)
+        
+        # Verify PDF is not encrypted
+        if reader.is_encrypted:
+            self.logger.error(f"PDF file is encrypted: {name}")
+            return None
+            
+        # Extract text from each page
+        text_parts = []
+        for page in reader.pages:
+            try:
+                page_text = page.extract_text()
+                if page_text.strip():
+                    text_parts.append(page_text)
+            except Exception as e:
+                self.logger.warning(f"Error extracting text from page: {str(e)}")
+                continue
                 
-            return '\n'.join(text_parts)
+        if not text_parts:
+            self.logger.warning(f"No text content found in PDF: {name}")
+            return None
+            
+        return '\n'.join(text_parts)
+        
+    def extract_text(self, source: DocumentSource, filename: str) -> Optional[str]:
+        """
+        Extract text from an in-memory document without writing it to disk.
+        
+        Args:
+            source: Document bytes as a buffer (bytes, bytearray, memoryview,
+                mmap) or a seekable binary stream such as UploadFile.file
+            filename: Original file name; its extension selects the parser
+            
+        Returns:
+            Extracted text, or None if the document could not be read
+        """
+        suffix = Path(filename).suffix.lower()
+        reader = self.stream_readers.get(suffix)
+        if reader is None:
+            raise ValueError(f"Unsupported file format: {suffix}")
             
+        stream = _as_stream(source)
+        try:
+            return reader(stream, filename)
         except Exception as e:
-            self.logger.error(f"Error reading PDF file {file_path}: {str(e)}")
+            self.logger.error(f"Error reading document {filename}: {str(e)}")
             return None
-            
         finally:
-            # Clean up temporary file
-            if temp_file and temp_file.exists():
-                try:
-                    temp_file.unlink()
-                except Exception as e:
-                    self.logger.warning(f"Error cleaning up temporary file: {str(e)}")
+            if stream is not source:
+                stream.close()
+                
+    def process_bytes(self, source: DocumentSource, filename: str) -> Optional[Dict[str, Any]]:
+        """
+        Process an in-memory document and return its content and metadata.
+        
+        Args:
+            source: Document bytes as a buffer or a seekable binary stream
+                (streams are read into memory once to compute the cache key)
+            filename: Original file name, used for the format and metadata
+            
+        Returns:
+            Same structure as process_document, or None on failure
+        """
+        try:
+            suffix = Path(filename).suffix.lower()
+            if suffix not in self.supported_formats:
+                raise ValueError(f"Unsupported file format: {suffix}")
+                
+            try:
+                with memoryview(source) as view:
+                    file_size = view.nbytes
+            except TypeError:  # a stream rather than a buffer
+                source.seek(0)
+                source = source.read()
+                file_size = len(source)
+            if file_size > self.max_file_size:
+                raise ValueError(f"File too large: {filename}")
+                
+            content = self._extract_cached(source, filename)
+            if content is None:
+                return None
+                
+            return {
+                'content': content,
+                'sections': self.extract_sections(content),
+                'metadata': {
+                    'filename': Path(filename).name,
+                    'file_size': file_size,
+                    'file_type': suffix,
+                    'processed_at': datetime.now(timezone.utc).isoformat()
+                }
+            }
+        except Exception as e:
+            self.logger.error(f"Error processing document {filename}: {str(e)}")
+            return None
             
-    @lru_cache(maxsize=100)
     def process_document(self, file_path: str) -> Dict[str, Any]:
         """Process a document and return its content and metadata."""
         try:
             file_path = Path(file_path)
             self._validate_file(file_path)
             
-            content = self._process_file(file_path)
+            content = self._extract_cached(file_path.read_bytes(), str(file_path))
             if content is None:
                 return None
                 
@@ -216,6 +495,16 @@ class DocumentProcessor:
             self.logger.error(f"Error processing document {file_path}: {str(e)}")
             return None
             
+    def _extract_cached(self, data, filename: str) -> Optional[str]:
+        """Extract text from raw document bytes, reusing a previous parse of identical content."""
+        key = self.parse_cache.key(data, Path(filename).suffix.lower())
+        content = self.parse_cache.get(key)
+        if content is None:
+            content = self.extract_text(data, filename)
+            if content is not None:
+                self.parse_cache.put(key, content)
+        return content
+        
     def _process_file(self, file_path: Path) -> Optional[str]:
         """Dispatch to the correct file processor based on file extension."""
         suffix = file_path.suffix.lower()
@@ -224,31 +513,15 @@ class DocumentProcessor:
             return processor(str(file_path))
         raise ValueError(f"Unsupported file format: {suffix}")
         
+    def section_spans(self, text: str) -> Dict[str, Tuple[int, int]]:
+        """Return (start, end) offsets of each section found in document text."""
+        return self.section_segmenter.spans(text)
+        
     def extract_sections(self, text: str) -> Dict[str, str]:
         """Extract sections from document text."""
-        sections = {
-            'skills': '',
-            'experience': '',
-            'education': '',
-            'certifications': '',
-            'summary': ''
-        }
-        
-        # Common section headers
-        section_patterns = {
-            'skills': r'(?i)(?:skills|technical skills|expertise)(?::|$)(.*?)(?=\n\s*\n|\Z)',
-            'experience': r'(?i)(?:experience|work experience|employment)(?::|$)(.*?)(?=\n\s*\n|\Z)',
-            'education': r'(?i)(?:education|academic|qualification)(?::|$)(.*?)(?=\n\s*\n|\Z)',
-            'certifications': r'(?i)(?:certifications|certificates|accreditations)(?::|$)(.*?)(?=\n\s*\n|\Z)',
-            'summary': r'(?i)(?:summary|profile|about)(?::|$)(.*?)(?=\n\s*\n|\Z)'
-        }
-        
-        # Extract sections
-        for section, pattern in section_patterns.items():
-            match = re.search(pattern, text, re.DOTALL)
-            if match:
-                sections[section] = match.group(1).strip()
-                
+        sections = {name: '' for name in self.section_segmenter.names}
+        for name, (start, end) in self.section_spans(text).items():
+            sections[name] = text[start:end]
         return sections
         
     def clean_text(self, text: str) -> str:
@@ -274,8 +547,24 @@ class DocumentProcessor:
             'file_type': file_path.suffix.lower()
         }
         
-    def process_batch(self, file_paths: List[str], batch_size: int = 10) -> Dict[str, Any]:
-        """Process multiple files in batches."""
+    def process_batch(self, file_paths: List[str], batch_size: int = 10,
+                      max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Process multiple files in batches.
+        
+        Args:
+            file_paths: Files to process
+            batch_size: Number of files submitted to the worker pool at a time
+            max_workers: Worker processes (defaults to the processor's max_workers)
+            
+        Returns:
+            Mapping of file path to processed document, in input order
+        """
+        workers = max_workers or self.max_workers
+        if workers > 1 and len(file_paths) > 1:
+            completed = dict(self.iter_process_batch(file_paths, batch_size, workers))
+            return {path: completed[path] for path in file_paths if completed.get(path)}
+        
         results = {}
         for i in range(0, len(file_paths), batch_size):
             batch = file_paths[i:i + batch_size]
@@ -286,4 +575,127 @@ class DocumentProcessor:
                         results[file_path] = result
                 except Exception as e:
                     self.logger.error(f"Error processing {file_path}: {str(e)}")
-        return results 
\ No newline at end of file
+        return results
+        
+    def create_worker_pool(self, workers: Optional[int] = None, started=None) -> ProcessPoolExecutor:
+        """
+        Create a process pool whose workers parse with this processor's settings.
+
+        Args:
+            workers: Worker processes (defaults to the processor's max_workers)
+            started: Optional spawn-context SimpleQueue on which workers report
+                (task_id, time.time()) when they start a batch task
+        """
+        return ProcessPoolExecutor(
+            max_workers=workers or self.max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(
+                self.max_file_size,
+                self.section_patterns,
+                self.parse_cache.max_bytes,
+                str(self.parse_cache.path) if self.parse_cache.path else None,
+                started
+            )
+        )
+        
+    @staticmethod
+    def shutdown_worker_pool(pool: ProcessPoolExecutor) -> None:
+        """Shut a pool down without waiting, terminating workers stuck in a parser."""
+        processes = list((getattr(pool, '_processes', None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+                
+    def iter_process_batch(self, file_paths: List[str], batch_size: int = 10,
+                           max_workers: Optional[int] = None) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Parse files in a process pool and yield (file_path, result) as each completes.
+        
+        At most batch_size files are in flight at once. Files that fail, crash
+        their worker or exceed parse_timeout yield None instead of stopping the
+        batch. When a worker crash breaks the pool, the files that were in
+        flight are retried one at a time so only the culprit is dropped. The
+        timeout runs from the moment a worker starts on a file, not from when
+        the file was queued for the pool. Parsed text is added to this
+        processor's parse cache, which the workers' own caches do not warm.
+        
+        Args:
+            file_paths: Files to process
+            batch_size: Maximum number of files in flight
+            max_workers: Worker processes (defaults to the processor's max_workers)
+        """
+        workers = max_workers or self.max_workers
+        batch_size = max(batch_size, workers)
+        queue = deque(file_paths)
+        suspects = deque()
+        in_flight: Dict[Future, Dict[str, Any]] = {}
+        task_ids = count()
+        started = multiprocessing.get_context('spawn').SimpleQueue()
+        pool = self.create_worker_pool(workers, started)
+        
+        def submit(file_path: str, suspect: bool = False) -> None:
+            task_id = next(task_ids)
+            future = pool.submit(_process_in_worker, file_path, task_id)
+            in_flight[future] = {'id': task_id, 'path': file_path, 'suspect': suspect, 'started': None}
+            
+        try:
+            while queue or suspects or in_flight:
+                if suspects:
+                    if not in_flight:
+                        submit(suspects.popleft(), suspect=True)
+                else:
+                    while queue and len(in_flight) < batch_size:
+                        submit(queue.popleft())
+                        
+                done, _ = wait(in_flight, timeout=1.0, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    task = in_flight.pop(future)
+                    try:
+                        result, cache_key = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        if task['suspect']:
+                            self.logger.error(f"Worker crashed while processing {task['path']}")
+                            yield task['path'], None
+                        else:
+                            suspects.append(task['path'])
+                    except Exception as e:
+                        self.logger.error(f"Error processing {task['path']}: {str(e)}")
+                        yield task['path'], None
+                    else:
+                        if cache_key is not None and self.parse_cache.path is None:
+                            # A disk tier is shared with the workers; the memory tier is not
+                            self.parse_cache.put(cache_key, result['content'])
+                        yield task['path'], result
+                        
+                # Kill workers stuck in a parser; other in-flight files are resubmitted
+                by_id = {task['id']: task for task in in_flight.values()}
+                while not started.empty():
+                    task_id, started_at = started.get()
+                    if task_id in by_id:
+                        by_id[task_id]['started'] = started_at
+                now = time.time()
+                hung = [
+                    future for future, task in in_flight.items()
+                    if task['started'] is not None and now - task['started'] > self.parse_timeout
+                ]
+                for future in hung:
+                    task = in_flight.pop(future)
+                    self.logger.error(f"Timed out after {self.parse_timeout}s processing {task['path']}")
+                    yield task['path'], None
+                    
+                if broken or hung:
+                    for task in in_flight.values():
+                        if broken:
+                            suspects.append(task['path'])
+                        else:
+                            queue.appendleft(task['path'])
+                    in_flight.clear()
+                    self.shutdown_worker_pool(pool)
+                    pool = self.create_worker_pool(workers, started)
+        finally:
+            self.shutdown_worker_pool(pool)
+            started.close()
@@ -0,0 +1,555 @@
+"""
+Embedding Backends for RME
+Interchangeable CPU inference backends for sentence embeddings: the fp32
+PyTorch model, a dynamically int8-quantized copy, and an ONNX Runtime export.
+Exported models are cached under models/ and only used once their outputs
+have passed a parity check against the fp32 model.
+"""
+
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import yaml
+
+from .model_registry import default_device, get_hf_model, get_hf_tokenizer, get_model_registry, get_sentence_transformer
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "torch-int8", "onnx")
+DEFAULT_CACHE_DIR = "models/backends"
+DEFAULT_PARITY_THRESHOLD = 0.99
+
+# Resume/job style sentences used to compare a backend against the fp32 model
+PARITY_TEXTS = [
+    "Senior Python developer with 7 years of experience building REST APIs in FastAPI and Django.",
+    "Looking for a data engineer familiar with Spark, Airflow and AWS.",
+    "Skills: Java, Spring Boot, Kubernetes, Docker, PostgreSQL",
+    "Bachelor of Science in Computer Science, University of Toronto",
+    "Led a team of five engineers delivering a real-time fraud detection pipeline.",
+    "Machine learning engineer: PyTorch, scikit-learn, NLP, model deployment and monitoring.",
+    "Project manager, PMP certified, agile and scrum, stakeholder communication.",
+    "React",
+]
+
+
+def mean_pool(token_embeddings: np.ndarray, attention_mask: np.ndarray, normalize: bool = True) -> np.ndarray:
+    """Average token embeddings over non-padding tokens, optionally L2-normalizing each row."""
+    mask = attention_mask[..., None].astype(np.float32)
+    pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    if normalize:
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+    return pooled.astype(np.float32, copy=False)
+
+
+def bucket_batches(lengths: Sequence[int], batch_size: int = 32, max_tokens: Optional[int] = None) -> List[List[int]]:
+    """
+    Group input indices into batches of similar token length.
+
+    Indices are sorted longest first and cut into batches of at most
+    batch_size inputs and, if max_tokens is set, at most max_tokens padded
+    tokens, so each batch pads only to the length of its own longest input.
+    """
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    for index in sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True):
+        if batch:
+            width = lengths[batch[0]]
+            if len(batch) >= batch_size or (max_tokens and width * (len(batch) + 1) > max_tokens):
+                batches.append(batch)
+                batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def pad_batch(features: Dict[str, List[List[int]]], indices: Sequence[int], pad_token_id: int = 0) -> Dict[str, np.ndarray]:
+    """Right-pad the tokenized inputs at indices into int64 arrays of the batch's longest length."""
+    width = max(len(features["input_ids"][i]) for i in indices)
+    batch = {}
+    for name, rows in features.items():
+        array = np.full((len(indices), width), pad_token_id if name == "input_ids" else 0, dtype=np.int64)
+        for row, index in enumerate(indices):
+            array[row, :len(rows[index])] = rows[index]
+        batch[name] = array
+    return batch
+
+
+def encode_bucketed(
+    texts: Sequence[str],
+    tokenizer: Any,
+    forward: Callable[[Dict[str, np.ndarray]], np.ndarray],
+    max_length: int = 512,
+    batch_size: int = 32,
+    max_tokens: Optional[int] = None,
+    normalize: bool = False
+) -> np.ndarray:
+    """
+    Mean-pooled embeddings for texts, encoded in length-sorted buckets.
+
+    Every text is tokenized once, batches are formed by bucket_batches and
+    each runs as one forward pass; rows are returned in the order of texts.
+
+    Args:
+        texts: Texts to encode
+        tokenizer: Hugging Face tokenizer
+        forward: Maps a padded numpy batch (input_ids, attention_mask, ...) to
+            token embeddings of shape (batch, sequence, hidden)
+        max_length: Tokens per text before truncation
+        batch_size: Maximum texts per forward pass
+        max_tokens: Maximum padded tokens per forward pass (no limit if None)
+        normalize: L2-normalize the pooled embeddings
+    """
+    encodings = tokenizer(list(texts), truncation=True, max_length=max_length)
+    features = {
+        name: encodings[name]
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in encodings
+    }
+    lengths = [len(ids) for ids in features["input_ids"]]
+    pad_token_id = tokenizer.pad_token_id or 0
+
+    embeddings: Optional[np.ndarray] = None
+    for indices in bucket_batches(lengths, batch_size, max_tokens):
+        inputs = pad_batch(features, indices, pad_token_id)
+        pooled = mean_pool(np.asarray(forward(inputs)), inputs["attention_mask"], normalize)
+        if embeddings is None:
+            embeddings = np.empty((len(lengths), pooled.shape[1]), dtype=np.float32)
+        embeddings[indices] = pooled
+    return embeddings
+
+
+def torch_forward(model: Any, device: str = "cpu") -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+    """Wrap a Hugging Face PyTorch encoder as a numpy batch -> token embeddings function."""
+    def forward(inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        import torch
+
+        tensors = {name: torch.from_numpy(value).to(device) for name, value in inputs.items()}
+        with torch.inference_mode():
+            return model(**tensors).last_hidden_state.float().cpu().numpy()
+
+    return forward
+
+
+class EmbeddingBackend:
+    """
+    Sentence embedding backend.
+
+    encode() follows SentenceTransformer.encode, so a backend can stand in
+    wherever a SentenceTransformer is used: a list of texts gives a 2-D
+    array and a single string gives a 1-D array.
+    """
+
+    name = "base"
+
+    def __init__(
+        self,
+        tokenizer: Any,
+        dimension: int,
+        max_length: int = 256,
+        normalize: bool = True,
+        max_tokens: Optional[int] = None
+    ):
+        self.tokenizer = tokenizer
+        self.dimension = dimension
+        self.max_length = max_length
+        self.normalize = normalize
+        self.max_tokens = max_tokens
+
+    def _forward(self, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        """Return token embeddings (batch, sequence, hidden) for one padded batch."""
+        raise NotImplementedError
+
+    def encode(
+        self,
+        sentences: Union[str, Sequence[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        **kwargs: Any
+    ) -> np.ndarray:
+        """
+        Encode texts into pooled sentence embeddings.
+
+        Args:
+            sentences: A text or list of texts
+            batch_size: Maximum texts per forward pass; texts are batched by token length
+            convert_to_numpy: Accepted for SentenceTransformer compatibility; output is always numpy
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        embeddings = encode_bucketed(
+            texts, self.tokenizer, self._forward, self.max_length, batch_size, self.max_tokens, self.normalize
+        )
+        return embeddings[0] if single else embeddings
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+
+class TorchBackend(EmbeddingBackend):
+    """Hugging Face encoder run with PyTorch (fp32, or int8 once quantized)."""
+
+    name = "torch"
+
+    def __init__(self, tokenizer: Any, model: Any, max_length: int = 256, normalize: bool = True, device: str = "cpu"):
+        super().__init__(tokenizer, model.config.hidden_size, max_length, normalize)
+        self.model = model.eval()
+        self.device = device
+        self._forward = torch_forward(self.model, device)
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """Encoder with its Linear layers dynamically quantized to int8 (CPU only)."""
+
+    name = "torch-int8"
+    WEIGHTS_FILE = "model-int8.pt"
+
+    @staticmethod
+    def quantize(model: Any) -> Any:
+        """Return a copy of model with int8 dynamically quantized Linear layers."""
+        import copy
+        import torch
+
+        return torch.ao.quantization.quantize_dynamic(
+            copy.deepcopy(model).cpu().eval(), {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    @staticmethod
+    def _quantized_linears(model: Any) -> Dict[str, Any]:
+        from torch.ao.nn.quantized.dynamic import Linear
+
+        return {name: module for name, module in model.named_modules() if isinstance(module, Linear)}
+
+    def save(self, directory: Path) -> None:
+        """
+        Save the quantized weights with the config and tokenizer needed to rebuild it.
+
+        Quantized Linear layers are stored as plain int8 weights with their
+        scale and zero point, so the file holds only ordinary tensors.
+        """
+        import torch
+
+        linears = self._quantized_linears(self.model)
+        prefixes = tuple(f"{name}." for name in linears)
+        state = {
+            "linear": {
+                name: {
+                    "weight": module.weight().int_repr(),
+                    "scale": module.weight().q_scale(),
+                    "zero_point": module.weight().q_zero_point(),
+                    "bias": module.bias()
+                }
+                for name, module in linears.items()
+            },
+            "other": {key: value for key, value in self.model.state_dict().items() if not key.startswith(prefixes)}
+        }
+        directory.mkdir(parents=True, exist_ok=True)
+        self.model.config.save_pretrained(str(directory))
+        self.tokenizer.save_pretrained(str(directory))
+        torch.save(state, str(directory / self.WEIGHTS_FILE))
+
+    @classmethod
+    def load(cls, directory: Path, max_length: int = 256, normalize: bool = True) -> "QuantizedTorchBackend":
+        """Rebuild a saved quantized model without loading the fp32 weights."""
+        import torch
+        from transformers import AutoConfig, AutoModel, AutoTokenizer
+
+        state = torch.load(str(directory / cls.WEIGHTS_FILE), weights_only=True)
+        model = AutoModel.from_config(AutoConfig.from_pretrained(str(directory)))
+        # Non-Linear weights (embeddings, layer norms) load into the fp32 skeleton
+        # before it is quantized; the Linear layers get their int8 weights after
+        model.load_state_dict(state["other"], strict=False)
+        model = cls.quantize(model)
+        for name, module in cls._quantized_linears(model).items():
+            saved = state["linear"][name]
+            weight = torch._make_per_tensor_quantized_tensor(saved["weight"], saved["scale"], saved["zero_point"])
+            module.set_weight_bias(weight, saved["bias"])
+        tokenizer = AutoTokenizer.from_pretrained(str(directory))
+        return cls(tokenizer, model, max_length, normalize)
+
+
+class OnnxBackend(EmbeddingBackend):
+    """Encoder exported to ONNX and run with ONNX Runtime on CPU (needs onnxruntime)."""
+
+    name = "onnx"
+    MODEL_FILE = "model.onnx"
+
+    def __init__(self, tokenizer: Any, session: Any, dimension: int, max_length: int = 256, normalize: bool = True):
+        super().__init__(tokenizer, dimension, max_length, normalize)
+        self.session = session
+        self.input_names = {model_input.name for model_input in session.get_inputs()}
+
+    def _forward(self, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        feed = {name: inputs.get(name, np.zeros_like(inputs["input_ids"])) for name in self.input_names}
+        return self.session.run(["last_hidden_state"], feed)[0]
+
+    @classmethod
+    def export(cls, tokenizer: Any, model: Any, directory: Path) -> None:
+        """Export an encoder's last hidden state to ONNX with dynamic batch and sequence axes."""
+        import torch
+
+        class LastHiddenState(torch.nn.Module):
+            def __init__(self, encoder):
+                super().__init__()
+                self.encoder = encoder
+
+            def forward(self, input_ids, attention_mask, token_type_ids):
+                return self.encoder(
+                    input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+                ).last_hidden_state
+
+        directory.mkdir(parents=True, exist_ok=True)
+        sample = tokenizer(PARITY_TEXTS[:2], padding=True, return_tensors="pt")
+        names = ["input_ids", "attention_mask", "token_type_ids"]
+        axes = {0: "batch", 1: "sequence"}
+        torch.onnx.export(
+            LastHiddenState(model.cpu().eval()),
+            tuple(sample.get(name, torch.zeros_like(sample["input_ids"])) for name in names),
+            str(directory / cls.MODEL_FILE),
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: axes for name in names + ["last_hidden_state"]},
+            opset_version=14,
+            dynamo=False
+        )
+        model.config.save_pretrained(str(directory))
+        tokenizer.save_pretrained(str(directory))
+
+    @classmethod
+    def load(cls, directory: Path, max_length: int = 256, normalize: bool = True) -> "OnnxBackend":
+        """Open a saved export in an ONNX Runtime CPU session."""
+        import onnxruntime
+        from transformers import AutoConfig, AutoTokenizer
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = onnxruntime.InferenceSession(
+            str(directory / cls.MODEL_FILE), options, providers=["CPUExecutionProvider"]
+        )
+        tokenizer = AutoTokenizer.from_pretrained(str(directory))
+        dimension = AutoConfig.from_pretrained(str(directory)).hidden_size
+        return cls(tokenizer, session, dimension, max_length, normalize)
+
+
+def check_parity(
+    candidate: EmbeddingBackend,
+    reference: EmbeddingBackend,
+    texts: Sequence[str] = PARITY_TEXTS,
+    threshold: float = DEFAULT_PARITY_THRESHOLD
+) -> Dict[str, Any]:
+    """
+    Compare a backend's embeddings with the reference (fp32) backend.
+
+    Returns:
+        Per-text cosine similarity statistics, the largest absolute
+        difference, and whether the minimum cosine reached threshold
+    """
+    expected = np.asarray(reference.encode(list(texts)), dtype=np.float32)
+    actual = np.asarray(candidate.encode(list(texts)), dtype=np.float32)
+    cosines = np.sum(expected * actual, axis=1) / (
+        np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1) + 1e-12
+    )
+    return {
+        "texts": len(texts),
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean()),
+        "max_abs_diff": float(np.abs(expected - actual).max()),
+        "threshold": threshold,
+        "passed": bool(cosines.min() >= threshold)
+    }
+
+
+def _artifact_dir(cache_dir: str, model_name: str, backend: str, max_length: int, normalize: bool) -> Path:
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "--", model_name)
+    return Path(cache_dir) / slug / f"{backend}-{max_length}{'-norm' if normalize else ''}"
+
+
+def _load_exported(
+    backend: str,
+    model_name: str,
+    device: str,
+    cache_dir: str,
+    model_cache_dir: Optional[str],
+    max_length: int,
+    normalize: bool,
+    parity_threshold: float
+) -> EmbeddingBackend:
+    """
+    Load a quantized/ONNX backend, exporting and parity-checking it on first use.
+
+    A cached parity failure for the same threshold goes straight to fp32
+    instead of exporting and checking again on every start.
+    """
+    backend_class = QuantizedTorchBackend if backend == "torch-int8" else OnnxBackend
+    directory = _artifact_dir(cache_dir, model_name, backend, max_length, normalize)
+    parity_file = directory / "parity.json"
+
+    def fp32() -> TorchBackend:
+        return TorchBackend(
+            get_hf_tokenizer(model_name, cache_dir=model_cache_dir),
+            get_hf_model(model_name, device=device, cache_dir=model_cache_dir),
+            max_length, normalize, device
+        )
+
+    if parity_file.exists():
+        try:
+            with open(parity_file, "r") as f:
+                parity = json.load(f)
+            if parity.get("passed") and parity.get("min_cosine", 0.0) >= parity_threshold:
+                return backend_class.load(directory, max_length, normalize)
+            if not parity.get("passed") and parity.get("threshold") == parity_threshold:
+                logger.info(
+                    f"{backend} backend for {model_name} failed parity on {parity.get('checked_at')}, using fp32"
+                )
+                return fp32()
+        except Exception as e:
+            logger.warning(f"Cached {backend} model in {directory} unusable, re-exporting: {str(e)}")
+
+    reference = fp32()
+    try:
+        if backend == "torch-int8":
+            candidate = QuantizedTorchBackend(reference.tokenizer, QuantizedTorchBackend.quantize(reference.model), max_length, normalize)
+            candidate.save(directory)
+        else:
+            OnnxBackend.export(reference.tokenizer, reference.model, directory)
+            candidate = OnnxBackend.load(directory, max_length, normalize)
+        parity = check_parity(candidate, reference, threshold=parity_threshold)
+    except Exception as e:
+        logger.error(f"Error building {backend} backend for {model_name}, using fp32: {str(e)}")
+        return reference
+
+    parity["checked_at"] = datetime.now(timezone.utc).isoformat()
+    with open(parity_file, "w") as f:
+        json.dump(parity, f, indent=2)
+
+    if not parity["passed"]:
+        logger.warning(
+            f"{backend} backend for {model_name} failed parity (min cosine {parity['min_cosine']:.4f} "
+            f"< {parity_threshold}), using fp32"
+        )
+        return reference
+    logger.info(f"Using {backend} backend for {model_name} (min cosine {parity['min_cosine']:.4f})")
+    return candidate
+
+
+def load_embedding_backend(
+    model_name: str,
+    backend: str = "torch",
+    device: Optional[str] = None,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    model_cache_dir: Optional[str] = None,
+    max_length: int = 256,
+    normalize: bool = True,
+    parity_threshold: float = DEFAULT_PARITY_THRESHOLD
+) -> EmbeddingBackend:
+    """
+    Return the shared embedding backend for a Hugging Face encoder.
+
+    Args:
+        model_name: Hugging Face model id, e.g. "sentence-transformers/all-MiniLM-L6-v2"
+        backend: "torch" (fp32), "torch-int8" or "onnx"; the last two are CPU only
+        device: Device for the fp32 model (defaults to CUDA when available)
+        cache_dir: Directory for quantized and exported models
+        model_cache_dir: Hugging Face cache directory for the fp32 model
+        max_length: Tokens per text before truncation
+        normalize: L2-normalize the pooled embeddings
+        parity_threshold: Minimum cosine similarity to the fp32 outputs for a
+            quantized/exported model to be used instead of the fp32 one
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}, expected one of {BACKENDS}")
+    device = device or default_device()
+    if backend != "torch" and device != "cpu":
+        logger.info(f"{backend} backend runs on CPU only; using fp32 torch on {device}")
+        backend = "torch"
+
+    def load() -> EmbeddingBackend:
+        if backend == "torch":
+            return TorchBackend(
+                get_hf_tokenizer(model_name, cache_dir=model_cache_dir),
+                get_hf_model(model_name, device=device, cache_dir=model_cache_dir),
+                max_length, normalize, device
+            )
+        return _load_exported(
+            backend, model_name, device, cache_dir, model_cache_dir, max_length, normalize, parity_threshold
+        )
+
+    key = f"embedding-backend:{backend}:{model_name}:{max_length}:{int(normalize)}@{device}"
+    return get_model_registry().get(key, load)
+
+
+def get_sentence_encoder(
+    name: str = "all-MiniLM-L6-v2",
+    backend: str = "torch",
+    device: Optional[str] = None,
+    cache_folder: Optional[str] = None,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    parity_threshold: float = DEFAULT_PARITY_THRESHOLD
+) -> Any:
+    """
+    Return the shared sentence encoder for a sentence-transformers model.
+
+    "torch" gives the SentenceTransformer itself; other backends give an
+    equivalent EmbeddingBackend (mean pooling, normalized, 256 tokens, as
+    configured for all-MiniLM-L6-v2).
+    """
+    if backend == "torch":
+        return get_sentence_transformer(name, device=device, cache_folder=cache_folder)
+    model_name = name if "/" in name else f"sentence-transformers/{name}"
+    return load_embedding_backend(
+        model_name, backend, device, cache_dir, cache_folder,
+        max_length=256, normalize=True, parity_threshold=parity_threshold
+    )
+
+
+def backend_options(settings: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Map the embedding_backend section of config.yaml to backend keyword arguments."""
+    settings = settings or {}
+    return {
+        "backend": settings.get("type", "torch"),
+        "cache_dir": settings.get("cache_dir", DEFAULT_CACHE_DIR),
+        "parity_threshold": float(settings.get("parity_threshold", DEFAULT_PARITY_THRESHOLD))
+    }
+
+
+@lru_cache(maxsize=None)
+def _read_config_section(path: str, section: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r") as f:
+            return (yaml.safe_load(f) or {}).get(section) or {}
+    except FileNotFoundError:
+        return {}
+
+
+def config_section(section: str, path: str = "config.yaml") -> Dict[str, Any]:
+    """Return one section of config.yaml, for modules without a config object."""
+    try:
+        return dict(_read_config_section(path, section))
+    except Exception as e:
+        logger.error(f"Error loading {section} settings: {str(e)}")
+        return {}
+
+
+def backend_settings(path: str = "config.yaml") -> Dict[str, Any]:
+    """Return the embedding_backend section of config.yaml."""
+    return config_section("embedding_backend", path)
+
+
+def store_version(base: str, backend: str) -> str:
+    """
+    Embedding store version for a backend, so stored fp32 and quantized vectors never mix.
+
+    Pass the name of the backend that was loaded (EmbeddingBackend.name), not
+    the configured one: quantized and ONNX backends fall back to fp32 torch on
+    GPUs and when export or the parity check fails.
+    """
+    return base if backend == "torch" else f"{base}+{backend}"
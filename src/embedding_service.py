@@ -0,0 +1,269 @@
+"""
+Embedding Service for RME
+In-process micro-batching front end for embedding models: concurrent callers
+enqueue texts, a single worker thread coalesces them into one encode call and
+resolves each caller's future with its rows.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+class _Request:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    return float(np.percentile(values, q)) if len(values) else 0.0
+
+
+class EmbeddingService:
+    """
+    Micro-batching embedding service around one model.
+
+    A batch is closed when it holds max_batch_size texts or when its oldest
+    request has waited max_wait_ms, whichever comes first. The wait only
+    applies under load (requests already queued, or the previous batch
+    coalesced several requests); an idle service encodes a lone request
+    immediately, so single callers pay no extra latency. Identical texts in
+    a batch are encoded once. Requests are never split, so a single large
+    request is encoded on its own (the model batches it internally).
+    All model calls happen on the service thread, so the model is never used
+    concurrently.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        name: str = "embeddings",
+        window: int = 1024,
+        model: Any = None
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            encode: Callable mapping a list of texts to a 2-D embedding array
+            max_batch_size: Texts per encode call before a batch is closed early
+            max_wait_ms: Longest time a request waits for other requests to join its batch
+            name: Label used in logs and metrics
+            window: Number of recent batches/requests kept for percentile metrics
+            model: Model behind encode, if any (kept for lookups by model)
+        """
+        self.encode_fn = encode
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._texts = 0
+        self._batches = 0
+        self._histogram: Dict[int, int] = {}
+        self._batch_sizes: deque = deque(maxlen=window)
+        self._waits: deque = deque(maxlen=window)
+        self._encode_times: deque = deque(maxlen=window)
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name=f"embedding-service-{self.name}", daemon=True
+                    )
+                    self._thread.start()
+
+    def submit(self, texts: Sequence[str]) -> Future:
+        """Queue texts for encoding; the future resolves to an array of shape (len(texts), dim)."""
+        request = _Request(list(texts))
+        if not request.texts:
+            request.future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return request.future
+        self._ensure_started()
+        self._queue.put(request)
+        return request.future
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode texts, blocking until their batch has run."""
+        if threading.current_thread() is self._thread:
+            # Called from inside an encode on the service thread; queueing would deadlock
+            return np.asarray(self.encode_fn(list(texts)))
+        return self.submit(texts).result()
+
+    async def encode_async(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode texts without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def close(self) -> None:
+        """Stop the service thread after the queued requests have run."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Service thread: collect requests into batches and encode them."""
+        stopping = False
+        under_load = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            size = len(first.texts)
+            under_load = under_load or not self._queue.empty()
+            deadline = first.enqueued_at + (self.max_wait if under_load else 0.0)
+            while size < self.max_batch_size:
+                try:
+                    timeout = deadline - time.monotonic()
+                    request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+                size += len(request.texts)
+            under_load = len(batch) > 1
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch: List[_Request]) -> None:
+        started = time.monotonic()
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if batch:
+            self._encode_requests(batch, started)
+
+    def _encode_requests(self, batch: List[_Request], started: float) -> None:
+        """Encode running requests in one call and resolve their futures."""
+        rows: Dict[str, int] = {}
+        for request in batch:
+            for text in request.texts:
+                rows.setdefault(text, len(rows))
+
+        try:
+            embeddings = np.asarray(self.encode_fn(list(rows)))
+        except Exception as e:
+            if len(batch) > 1:
+                # Re-encode each request on its own so only the offending one fails
+                logger.warning(
+                    f"Error encoding batch of {len(rows)} texts in {self.name}, "
+                    f"retrying its {len(batch)} requests separately: {str(e)}"
+                )
+                for request in batch:
+                    self._encode_requests([request], time.monotonic())
+                return
+            logger.error(f"Error encoding batch of {len(rows)} texts in {self.name}: {str(e)}")
+            batch[0].future.set_exception(e)
+            return
+
+        finished = time.monotonic()
+        for request in batch:
+            request.future.set_result(embeddings[[rows[text] for text in request.texts]])
+
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._texts += len(rows)
+            bucket = 1 << (len(rows) - 1).bit_length()
+            self._histogram[bucket] = self._histogram.get(bucket, 0) + 1
+            self._batch_sizes.append(len(rows))
+            self._encode_times.append(finished - started)
+            self._waits.extend(started - request.enqueued_at for request in batch)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return batching metrics.
+
+        Returns:
+            Totals since start, plus batch size, queue wait and encode time
+            statistics over the most recent batches/requests
+        """
+        with self._stats_lock:
+            sizes = list(self._batch_sizes)
+            waits = [wait * 1000 for wait in self._waits]
+            encode_times = [duration * 1000 for duration in self._encode_times]
+            return {
+                "name": self.name,
+                "requests": self._requests,
+                "texts": self._texts,
+                "batches": self._batches,
+                "queue_depth": self._queue.qsize(),
+                "batch_size": {
+                    "mean": float(np.mean(sizes)) if sizes else 0.0,
+                    "p50": _percentile(sizes, 50),
+                    "p95": _percentile(sizes, 95),
+                    "max": max(sizes, default=0),
+                    "histogram": {f"<={bucket}": count for bucket, count in sorted(self._histogram.items())}
+                },
+                "queue_wait_ms": {
+                    "mean": float(np.mean(waits)) if waits else 0.0,
+                    "p50": _percentile(waits, 50),
+                    "p95": _percentile(waits, 95),
+                    "max": max(waits, default=0.0)
+                },
+                "encode_ms": {
+                    "mean": float(np.mean(encode_times)) if encode_times else 0.0,
+                    "p95": _percentile(encode_times, 95)
+                }
+            }
+
+
+_services: Dict[int, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(
+    model: Any,
+    encode: Optional[Callable[[List[str]], np.ndarray]] = None,
+    name: Optional[str] = None,
+    **options: Any
+) -> EmbeddingService:
+    """
+    Return the process-wide embedding service for a model, creating it on first use.
+
+    Args:
+        model: Model object the service is keyed on
+        encode: Batch encode callable (defaults to model.encode(texts, convert_to_numpy=True))
+        name: Label for logs and metrics (defaults to the model class name)
+        **options: max_batch_size / max_wait_ms, used when the service is created
+    """
+    with _services_lock:
+        service = _services.get(id(model))
+        if service is None or service.model is not model:
+            if encode is None:
+                encode = lambda texts: model.encode(texts, convert_to_numpy=True)
+            service = EmbeddingService(encode, name=name or type(model).__name__, model=model, **options)
+            _services[id(model)] = service
+        return service
+
+
+def embedding_service_metrics() -> List[Dict[str, Any]]:
+    """Return metrics for every embedding service in the process."""
+    with _services_lock:
+        services = list(_services.values())
+    return [service.metrics() for service in services]
@@ -0,0 +1,313 @@
+"""
+Persistent Embedding Store for RME
+Durable, content-addressed storage for text embeddings shared by all matching engines.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = "models/embeddings"
+
+
+class EmbeddingStore:
+    """
+    On-disk embedding store keyed by a stable content digest.
+
+    Embeddings live in a memory-mapped float32 matrix (``<name>.f32``) and the
+    row for each text is recorded in an append-only index file (``<name>.idx``,
+    one SHA-256 digest per line, line number == matrix row). Vectors are written
+    and flushed before their digests are appended, so a crash never leaves an
+    index entry pointing at an unwritten row.
+
+    The store is safe to share between threads and processes: writers hold an
+    exclusive lock on ``<name>.lock`` while they append, and pick up the rows
+    other processes appended before choosing where their own rows go.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_STORE_DIR,
+        model_name: str = "all-MiniLM-L6-v2",
+        model_version: str = "1",
+        dim: Optional[int] = None,
+        initial_capacity: int = 1024
+    ):
+        """
+        Initialize (or reopen) an embedding store.
+
+        Args:
+            directory: Directory holding the matrix and index files
+            model_name: Name of the model producing the embeddings
+            model_version: Model/pooling version; part of every key
+            dim: Embedding dimension (inferred from the first insert if None)
+            initial_capacity: Number of rows to allocate on first growth
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self.model_version = model_version
+        self.dim = dim
+        self.initial_capacity = initial_capacity
+
+        stem = re.sub(r'[^A-Za-z0-9_.-]+', '_', f"{model_name}-{model_version}")
+        self.matrix_path = self.directory / f"{stem}.f32"
+        self.index_path = self.directory / f"{stem}.idx"
+        self.meta_path = self.directory / f"{stem}.json"
+        self.lock_path = self.directory / f"{stem}.lock"
+
+        self._lock = threading.RLock()
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional[np.memmap] = None
+        self._capacity = 0
+        # Rows and bytes of the index file read so far
+        self._index_rows = 0
+        self._index_offset = 0
+
+        self._load()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize text before hashing (trim and collapse whitespace)."""
+        return ' '.join(text.split())
+
+    def key(self, text: str) -> str:
+        """Return the stable digest for a text under this store's model."""
+        payload = f"{self.model_name}\0{self.model_version}\0{self.normalize_text(text)}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _load(self) -> None:
+        """Reopen existing matrix and index files."""
+        self._sync()
+        if self._rows:
+            logger.info(f"Loaded {len(self._rows)} embeddings from {self.matrix_path}")
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold the store's exclusive inter-process write lock."""
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _sync(self) -> None:
+        """Pick up the dimension, matrix growth and index rows written by other processes."""
+        if self.dim is None or self._capacity == 0:
+            if self.meta_path.exists():
+                with open(self.meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                if self.dim is not None and meta['dim'] != self.dim:
+                    raise ValueError(
+                        f"Embedding store {self.meta_path} has dim {meta['dim']}, expected {self.dim}"
+                    )
+                self.dim = meta['dim']
+
+        if self.dim is None or not self.matrix_path.exists():
+            return
+
+        capacity = self.matrix_path.stat().st_size // (self.dim * 4)
+        if capacity > self._capacity:
+            if self._matrix is not None:
+                self._matrix.flush()
+            self._capacity = capacity
+            self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode='r+',
+                                     shape=(self._capacity, self.dim))
+
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, 'rb') as f:
+            f.seek(self._index_offset)
+            tail = f.read()
+        for line in tail.splitlines(keepends=True):
+            digest = line.strip().decode('ascii', errors='replace')
+            if not line.endswith(b"\n") or self._index_rows >= self._capacity or len(digest) != 64:
+                logger.warning(f"Ignoring truncated embedding index tail in {self.index_path}")
+                break
+            self._rows.setdefault(digest, self._index_rows)
+            self._index_rows += 1
+            self._index_offset += len(line)
+
+    def _init_dim(self, dim: int) -> None:
+        """Fix the embedding dimension on first insert."""
+        self.dim = dim
+        tmp_path = self.meta_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'model_name': self.model_name,
+                'model_version': self.model_version,
+                'dim': dim,
+                'dtype': 'float32'
+            }, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _ensure_capacity(self, rows: int) -> None:
+        """Grow the memory-mapped matrix so it holds at least ``rows`` rows."""
+        if rows <= self._capacity:
+            return
+
+        new_capacity = max(rows, self._capacity * 2, self.initial_capacity)
+        if self._matrix is not None:
+            self._matrix.flush()
+            self._matrix = None
+
+        mode = 'r+b' if self.matrix_path.exists() else 'w+b'
+        with open(self.matrix_path, mode) as f:
+            f.truncate(new_capacity * self.dim * 4)
+
+        self._capacity = new_capacity
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode='r+',
+                                 shape=(self._capacity, self.dim))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, text: str) -> bool:
+        return self.key(text) in self._rows
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Return the stored embedding for a text, or None."""
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Return stored embeddings for texts (None where missing)."""
+        with self._lock:
+            digests = [self.key(text) for text in texts]
+            if any(digest not in self._rows for digest in digests):
+                # Another process may have stored them since the last read
+                self._sync()
+            results = []
+            for digest in digests:
+                row = self._rows.get(digest)
+                results.append(None if row is None else np.array(self._matrix[row]))
+            return results
+
+    def put(self, text: str, embedding: np.ndarray) -> None:
+        """Store the embedding for a single text."""
+        self.put_many([text], np.asarray(embedding).reshape(1, -1))
+
+    def put_many(self, texts: Sequence[str], embeddings: np.ndarray) -> None:
+        """Store embeddings for many texts with one matrix write and one index append."""
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
+
+        with self._lock, self._file_lock():
+            self._sync()
+            if self.dim is None:
+                self._init_dim(embeddings.shape[1])
+            if embeddings.shape[1] != self.dim:
+                raise ValueError(f"Expected embeddings of dim {self.dim}, got {embeddings.shape[1]}")
+
+            new_digests: List[str] = []
+            new_vectors: List[np.ndarray] = []
+            pending = set()
+            for text, embedding in zip(texts, embeddings):
+                digest = self.key(text)
+                if digest in self._rows or digest in pending:
+                    continue
+                pending.add(digest)
+                new_digests.append(digest)
+                new_vectors.append(embedding)
+
+            if not new_digests:
+                return
+
+            start = self._index_rows
+            self._ensure_capacity(start + len(new_digests))
+            self._matrix[start:start + len(new_digests)] = np.stack(new_vectors)
+            self._matrix.flush()
+
+            lines = ''.join(f"{digest}\n" for digest in new_digests).encode('ascii')
+            with open(self.index_path, 'ab') as f:
+                f.write(lines)
+
+            for offset, digest in enumerate(new_digests):
+                self._rows[digest] = start + offset
+            self._index_rows += len(new_digests)
+            self._index_offset += len(lines)
+
+    def get_or_compute(
+        self,
+        texts: Sequence[str],
+        encode: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Return embeddings for texts, encoding only the ones not yet stored.
+
+        Args:
+            texts: Texts to embed
+            encode: Callable mapping a list of texts to a 2-D embedding array
+
+        Returns:
+            Array of shape (len(texts), dim), in input order
+        """
+        if not texts:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+
+        found = self.get_many(texts)
+        missing: Dict[str, str] = {}
+        for text, embedding in zip(texts, found):
+            if embedding is None:
+                missing.setdefault(self.key(text), text)
+
+        if missing:
+            missing_texts = list(missing.values())
+            encoded = np.asarray(encode(missing_texts), dtype=np.float32).reshape(len(missing_texts), -1)
+            self.put_many(missing_texts, encoded)
+            computed = dict(zip(missing.keys(), encoded))
+            found = [
+                embedding if embedding is not None else computed[self.key(text)]
+                for text, embedding in zip(texts, found)
+            ]
+
+        return np.stack(found).astype(np.float32, copy=False)
+
+    def flush(self) -> None:
+        """Flush pending matrix writes to disk."""
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+
+
+def model_directory_version(path: str) -> str:
+    """
+    Store version for a model loaded from a local directory.
+
+    Digest of the relative path, size and modification time of every file in
+    the directory, so vectors of a retrained or replaced model never mix with
+    those of the model it replaced.
+    """
+    digest = hashlib.sha256()
+    root = Path(path)
+    for file_path in sorted(p for p in root.rglob('*') if p.is_file()):
+        stat = file_path.stat()
+        digest.update(f"{file_path.relative_to(root)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8'))
+    return f"local-{digest.hexdigest()[:16]}"
+
+
+_stores: Dict[Tuple[str, str, str], EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(
+    model_name: str,
+    model_version: str = "1",
+    directory: str = DEFAULT_STORE_DIR
+) -> EmbeddingStore:
+    """Return the process-wide embedding store for a model, opening it on first use."""
+    key = (str(Path(directory).absolute()), model_name, model_version)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = EmbeddingStore(directory, model_name, model_version)
+        return _stores[key]
@@ -1,24 +1,18 @@
+from typing import Dict, Optional
 from .document_processor import DocumentProcessor
+from .skill_matcher import get_skill_matcher
 import re
 
 class EnhancedDocumentProcessor(DocumentProcessor):
     """Enhanced document processor with additional capabilities."""
     
-    def __init__(self):
+    def __init__(self, section_patterns: Optional[Dict[str, str]] = None):
         """Initialize the enhanced document processor."""
-        super().__init__()
+        super().__init__(section_patterns=section_patterns)
         
     def extract_skills(self, text):
-        """Extract skills from text using a simple keyword match."""
-        skill_keywords = [
-            'python', 'java', 'sql', 'excel', 'communication', 'leadership',
-            'project management', 'machine learning', 'data analysis', 'c++', 'cloud', 'aws', 'azure', 'linux'
-        ]
-        found = set()
-        for kw in skill_keywords:
-            if re.search(rf'\\b{re.escape(kw)}\\b', text, re.IGNORECASE):
-                found.add(kw)
-        return list(found)
+        """Extract registry skills (names and aliases) mentioned in the text."""
+        return get_skill_matcher().extract(text)
         
     def extract_experience(self, text):
         """Extract years of experience from text using regex."""
@@ -10,6 +10,8 @@ import shutil
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from .match_ranking import RankedMatchingMixin
+
 class SkillLevel(Enum):
     PRIMARY = "PRIMARY"
     SECONDARY = "SECONDARY"
@@ -107,7 +109,9 @@ class ProjectRequirement:
     required_experience_level: ExperienceLevel = None
     required_certifications: List[str] = None
 
-class EnhancedMatchingEngine:
+class EnhancedMatchingEngine(RankedMatchingMixin):
+    match_rank_enum = MatchRank
+
     def __init__(self):
         self.resources: Dict[str, Resource] = {}
         self.projects: Dict[str, ProjectRequirement] = {}
@@ -314,82 +318,15 @@ class EnhancedMatchingEngine:
 
         return " | ".join(recommendation)
 
-    def find_matches(self, project_id: str, automated: bool = True, filters: Optional[Dict] = None) -> List[Dict]:
+    def find_matches(self, project_id: str, automated: bool = True, filters: Optional[Dict] = None,
+                     top_k: Optional[int] = None) -> List[Dict]:
         if project_id not in self.projects:
             return []
 
         project = self.projects[project_id]
-        matches = []
-
-        for resource in self.resources.values():
-            # Apply filters if provided
-            if filters:
-                if filters.get("location") and resource.location != filters["location"]:
-                    continue
-                if filters.get("work_type") and resource.preferred_work_type != filters["work_type"]:
-                    continue
-                if filters.get("min_experience"):
-                    min_exp = filters["min_experience"]
-                    if not any(s.years_experience >= min_exp for s in resource.primary_skills):
-                        continue
-
-            # Calculate various match scores
-            primary_match, primary_details = self._calculate_skill_match(
-                resource.primary_skills, project.required_primary_skills)
-            secondary_match, secondary_details = self._calculate_skill_match(
-                resource.secondary_skills, project.required_secondary_skills)
-            experience_match, experience_details = self._calculate_experience_match(resource, project)
-            certification_match, certification_details = self._calculate_certification_match(resource, project)
-            location_match = self._calculate_location_match(resource, project)
-            work_type_match = self._calculate_work_type_match(resource, project)
-
-            # Calculate overall match score using weights
-            match_score = (
-                primary_match * self.weights["primary_skills"] +
-                secondary_match * self.weights["secondary_skills"] +
-                experience_match * self.weights["experience"] +
-                location_match * self.weights["location"] +
-                work_type_match * self.weights["work_type"] +
-                certification_match * self.weights["certifications"]
-            )
-
-            # Ensure score doesn't exceed 100%
-            match_score = min(match_score, 100.0)
-
-            match_rank = self._determine_match_rank(primary_match, secondary_match, experience_match)
-
-            match_data = {
-                "resource_id": resource.id,
-                "resource_name": resource.name,
-                "match_rank": match_rank.name,
-                "match_score": match_score,
-                "primary_match": primary_match,
-                "secondary_match": secondary_match,
-                "experience_match": experience_match,
-                "certification_match": certification_match,
-                "location_match": location_match,
-                "work_type_match": work_type_match,
-                "skill_analysis": {
-                    "primary": primary_details,
-                    "secondary": secondary_details
-                },
-                "experience_analysis": experience_details,
-                "certification_analysis": certification_details
-            }
-
-            if not automated:
-                match_data.update({
-                    "recommendation": self._generate_recommendation(
-                        match_rank, primary_details, secondary_details, 
-                        experience_details, certification_details
-                    )
-                })
-
-            matches.append(match_data)
-
-        # Sort matches by rank and score
-        matches.sort(key=lambda x: (MatchRank[x["match_rank"]].value, -x["match_score"]))
-        return matches
+        resources = self.resources.values()
+
+        return self._rank_matches(project, resources, automated, filters, top_k)
 
     def export_matches(self, project_id: str, output_format: OutputFormat = OutputFormat.JSON) -> str:
         matches = self.find_matches(project_id, automated=False)
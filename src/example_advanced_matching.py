@@ -1,4 +1,4 @@
-from advanced_matching import (
+from src.advanced_matching import (
     AdvancedMatchingEngine, Resource, ProjectRequirement,
     Skill, SkillLevel, OutputFormat
 )
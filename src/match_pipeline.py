@@ -0,0 +1,255 @@
+"""
+Upload-to-Match Pipeline for RME
+Staged asyncio pipeline that keeps blocking parsing and model inference off the
+event loop: uploads are read concurrently, parsed in a process pool, and
+embedded and scored in micro-batches on a single model thread.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+
+from .document_processor import DocumentProcessor, process_bytes_in_worker
+from .prepared_job import PreparedJob
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class MatchPipeline:
+    """
+    read -> parse -> embed/score pipeline for uploaded resumes.
+
+    Stages are connected by bounded queues, so a slow stage applies back
+    pressure instead of buffering every upload in memory. Parsing runs in
+    worker processes (a crashed or hung parser only fails its own file: files
+    in flight when a worker crashed are re-parsed one at a time) and
+    all model work runs on one thread, where the job is prepared once and
+    parsed documents are grouped into batches for MatchingEngine.match_many.
+    """
+
+    def __init__(
+        self,
+        document_processor: DocumentProcessor,
+        matching_engine: Any,
+        parse_workers: Optional[int] = None,
+        queue_size: int = 16,
+        batch_size: int = 32,
+        batch_wait: float = 0.01,
+        parse_pool: Optional[Executor] = None
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            document_processor: Processor whose settings the parse workers use
+            matching_engine: Engine providing prepare_job(job_description) and match_many(job, profiles)
+            parse_workers: Parser processes (defaults to the processor's max_workers)
+            queue_size: Capacity of each inter-stage queue
+            batch_size: Maximum documents scored per match_many call
+            batch_wait: Seconds to wait for more parsed documents before scoring a partial batch
+            parse_pool: Executor for parsing; a process pool is created if None
+        """
+        self.document_processor = document_processor
+        self.matching_engine = matching_engine
+        self.parse_workers = parse_workers or document_processor.max_workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._owns_pool = parse_pool is None
+        self._parse_pool = parse_pool or document_processor.create_worker_pool(self.parse_workers)
+        self._model_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="match-model")
+        self._in_flight: Dict[Executor, Set[asyncio.Future]] = {}
+        self._retired_pools: Set[Executor] = set()
+        self._retiring: Set[asyncio.Task] = set()
+        # Files in flight when a pool crashed are re-parsed one at a time here
+        self._isolation_pool: Optional[Executor] = None
+        self._isolation_lock: Optional[asyncio.Lock] = None
+
+    def close(self) -> None:
+        """Release the parse pools (if owned) and the model thread."""
+        if self._owns_pool:
+            for pool in [self._parse_pool, *self._retired_pools]:
+                self.document_processor.shutdown_worker_pool(pool)
+            self._retired_pools.clear()
+        if self._isolation_pool is not None:
+            self.document_processor.shutdown_worker_pool(self._isolation_pool)
+            self._isolation_pool = None
+        self._model_thread.shutdown(wait=False)
+
+    def _reset_pool(self, pool: Executor) -> None:
+        """Replace a broken or stuck parse pool, once per failure."""
+        if pool is self._parse_pool and self._owns_pool:
+            self.document_processor.shutdown_worker_pool(pool)
+            self._parse_pool = self.document_processor.create_worker_pool(self.parse_workers)
+
+    def _retire_pool(self, pool: Executor, stuck: asyncio.Future) -> None:
+        """
+        Route new parses to a fresh pool after a parse timed out in pool.
+
+        The stuck worker can only be stopped by terminating its pool, so the
+        old pool is shut down once its other in-flight parses have finished
+        (or timed out themselves); their results are not lost.
+        """
+        if pool is not self._parse_pool or not self._owns_pool:
+            return
+        self._parse_pool = self.document_processor.create_worker_pool(self.parse_workers)
+        self._retired_pools.add(pool)
+        others = {future for future in self._in_flight.pop(pool, set()) if future is not stuck}
+
+        async def shutdown_when_drained() -> None:
+            if others:
+                await asyncio.wait(others, timeout=self.document_processor.parse_timeout)
+            if pool in self._retired_pools:
+                self._retired_pools.discard(pool)
+                self.document_processor.shutdown_worker_pool(pool)
+
+        task = asyncio.ensure_future(shutdown_when_drained())
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    async def _parse(self, data: bytes, filename: str) -> Optional[Dict[str, Any]]:
+        """Parse one upload in the pool; if the pool crashes, re-parse the file on its own."""
+        loop = asyncio.get_running_loop()
+        pool = self._parse_pool
+        future = loop.run_in_executor(pool, process_bytes_in_worker, data, filename)
+        in_flight = self._in_flight.setdefault(pool, set())
+        in_flight.add(future)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.document_processor.parse_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out after {self.document_processor.parse_timeout}s parsing {filename}")
+            self._retire_pool(pool, future)
+            return None
+        except BrokenProcessPool:
+            self._reset_pool(pool)
+        finally:
+            in_flight.discard(future)
+        return await self._parse_alone(data, filename)
+
+    async def _parse_alone(self, data: bytes, filename: str) -> Optional[Dict[str, Any]]:
+        """
+        Re-parse a file that was in flight when its pool crashed.
+
+        Suspects run one at a time in a single-worker pool, so a file is only
+        given up on when it crashes that pool by itself.
+        """
+        if self._isolation_lock is None:
+            self._isolation_lock = asyncio.Lock()
+        async with self._isolation_lock:
+            if self._isolation_pool is None:
+                self._isolation_pool = self.document_processor.create_worker_pool(1)
+            pool = self._isolation_pool
+            future = asyncio.get_running_loop().run_in_executor(pool, process_bytes_in_worker, data, filename)
+            try:
+                return await asyncio.wait_for(future, self.document_processor.parse_timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Timed out after {self.document_processor.parse_timeout}s parsing {filename}")
+            except BrokenProcessPool:
+                logger.error(f"Parser crashed while processing {filename}")
+            self.document_processor.shutdown_worker_pool(pool)
+            self._isolation_pool = None
+            return None
+
+    async def run(
+        self,
+        job_description: Union[str, PreparedJob],
+        files: List[Any]
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Match uploads against a job description.
+
+        Args:
+            job_description: Job description text or PreparedJob; text is
+                prepared once for the whole run
+            files: Upload objects with a ``filename`` and an async ``read()``
+
+        Yields:
+            (filename, match result) as each batch finishes scoring; files that
+            could not be read or parsed are logged and skipped
+        """
+        parse_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        score_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        out_queue: asyncio.Queue = asyncio.Queue()
+
+        async def read(file) -> None:
+            try:
+                data = await file.read()
+            except Exception as e:
+                logger.warning(f"Could not read upload {file.filename}: {str(e)}")
+                await out_queue.put(None)
+                return
+            await parse_queue.put((file.filename, data))
+
+        async def read_all() -> None:
+            await asyncio.gather(*(read(file) for file in files))
+            for _ in range(self.parse_workers):
+                await parse_queue.put(_DONE)
+
+        async def parse() -> None:
+            while (item := await parse_queue.get()) is not _DONE:
+                filename, data = item
+                doc_result = await self._parse(data, filename)
+                if not doc_result or 'content' not in doc_result:
+                    logger.warning(f"Could not process file {filename}")
+                    await out_queue.put(None)
+                else:
+                    await score_queue.put((filename, doc_result['content']))
+
+        async def parse_all() -> None:
+            await asyncio.gather(*(parse() for _ in range(self.parse_workers)))
+            await score_queue.put(_DONE)
+
+        async def score() -> None:
+            loop = asyncio.get_running_loop()
+            job = job_description
+            if not isinstance(job, PreparedJob):
+                # Section, skill-extract and embed the job once, not once per batch
+                job = await loop.run_in_executor(self._model_thread, self.matching_engine.prepare_job, job)
+            done = False
+            while not done:
+                item = await score_queue.get()
+                if item is _DONE:
+                    break
+                batch = [item]
+                while len(batch) < self.batch_size:
+                    try:
+                        item = await asyncio.wait_for(score_queue.get(), self.batch_wait)
+                    except asyncio.TimeoutError:
+                        break
+                    if item is _DONE:
+                        done = True
+                        break
+                    batch.append(item)
+
+                results = await loop.run_in_executor(
+                    self._model_thread,
+                    self.matching_engine.match_many,
+                    job,
+                    [content for _, content in batch]
+                )
+                for (filename, _), result in zip(batch, results):
+                    await out_queue.put((filename, result))
+
+        tasks = [asyncio.create_task(stage()) for stage in (read_all, parse_all, score)]
+        running = set(tasks)
+        try:
+            for _ in range(len(files)):
+                getter = asyncio.ensure_future(out_queue.get())
+                while not getter.done():
+                    done, _ = await asyncio.wait({getter, *running}, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done - {getter}:
+                        running.discard(task)
+                        if task.exception() is not None:
+                            getter.cancel()
+                            raise task.exception()
+                item = getter.result()
+                if item is not None:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,227 @@
+"""
+Match Ranking for RME
+Filtering, scoring and top-k ranking shared by the resource matching engines
+(AdvancedMatchingEngine, EnhancedMatchingEngine and MatchingEngineV2). The
+engines keep their own dataclasses and _calculate_* scorers; this mixin only
+relies on those methods, self.resources, self.weights and the engine's
+match_rank_enum.
+"""
+
+import heapq
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class RankedMatchingMixin:
+    """
+    Match payloads and bounded top-k selection for a matching engine.
+
+    Ranking by (rank, -score) only needs scalar scores, so _rank_key uses
+    the _*_score helpers, which compute the same values as the engine's
+    _calculate_* methods without building their detail lists; the full
+    payload is built by _build_match for the matches that are returned.
+    """
+
+    # Optional ANN shortlist (see src/candidate_index.py)
+    candidate_index = None
+    encode: Optional[Callable[[List[str]], Any]] = None
+
+    def add_resource(self, resource: Any) -> None:
+        self.resources[resource.id] = resource
+        if self.candidate_index is not None:
+            self.candidate_index.add([resource.id], self.encode([self._resource_text(resource)]))
+
+    def remove_resource(self, resource_id: str) -> None:
+        self.resources.pop(resource_id, None)
+        if self.candidate_index is not None:
+            self.candidate_index.remove([resource_id])
+
+    def use_candidate_index(self, index, encode: Callable[[List[str]], Any]) -> None:
+        """
+        Attach a candidate retrieval index used to shortlist resources.
+
+        Args:
+            index: A src.candidate_index.CandidateIndex (or compatible object)
+            encode: Callable mapping a list of texts to a 2-D embedding array
+        """
+        self.candidate_index = index
+        self.encode = encode
+        self._sync_candidate_index()
+
+    def _resource_text(self, resource: Any) -> str:
+        """Whole-profile text embedded for candidate retrieval."""
+        parts = [s.name for s in resource.primary_skills + resource.secondary_skills]
+        parts += resource.preferred_roles or []
+        parts += resource.certifications or []
+        return ", ".join(parts)
+
+    def _project_text(self, project: Any) -> str:
+        """Requirement text embedded as the retrieval query."""
+        parts = [project.title, project.description]
+        parts += project.required_primary_skills + project.required_secondary_skills
+        parts += project.preferred_skills or []
+        return ", ".join(parts)
+
+    def _sync_candidate_index(self) -> None:
+        """Index resources added directly to self.resources and drop removed ones."""
+        indexed = self.candidate_index.ids()
+        missing = [r for r in self.resources.values() if str(r.id) not in indexed]
+        if missing:
+            self.candidate_index.add(
+                [r.id for r in missing],
+                self.encode([self._resource_text(r) for r in missing])
+            )
+        stale = indexed - {str(resource_id) for resource_id in self.resources}
+        if stale:
+            self.candidate_index.remove(stale)
+
+    def _shortlist_resources(self, project: Any, limit: int) -> List[Any]:
+        """Return the resources nearest to the project in embedding space."""
+        self._sync_candidate_index()
+        query = self.encode([self._project_text(project)])[0]
+        by_id = {str(resource_id): resource for resource_id, resource in self.resources.items()}
+        return [by_id[candidate_id] for candidate_id, _ in self.candidate_index.search(query, limit)]
+
+    def _passes_filters(self, resource: Any, filters: Optional[Dict]) -> bool:
+        if filters:
+            if filters.get("location") and resource.location != filters["location"]:
+                return False
+            if filters.get("work_type") and resource.preferred_work_type != filters["work_type"]:
+                return False
+            if filters.get("min_experience"):
+                min_exp = filters["min_experience"]
+                if not any(s.years_experience >= min_exp for s in resource.primary_skills):
+                    return False
+        return True
+
+    def _weighted_score(self, primary_match, secondary_match, experience_match,
+                        location_match, work_type_match, certification_match):
+        # Calculate overall match score using weights
+        return (
+            primary_match * self.weights["primary_skills"] +
+            secondary_match * self.weights["secondary_skills"] +
+            experience_match * self.weights["experience"] +
+            location_match * self.weights["location"] +
+            work_type_match * self.weights["work_type"] +
+            certification_match * self.weights["certifications"]
+        )
+
+    def _skill_score(self, resource_skills: List[Any], required_skills: List[str]) -> float:
+        """Score of _calculate_skill_match without the match details."""
+        if not required_skills:
+            return 0.0
+        by_name: Dict[str, Any] = {}
+        for skill in resource_skills:
+            by_name.setdefault(skill.name, skill)
+        total_score = 0.0
+        for req_skill in required_skills:
+            skill_match = by_name.get(req_skill)
+            if skill_match:
+                total_score += (
+                    (skill_match.proficiency / 5.0) * 0.5 +
+                    skill_match.get_recency_score() * 0.3 +
+                    min(skill_match.years_experience / 5.0, 1.0) * 0.2
+                ) * 100
+        return total_score / len(required_skills)
+
+    def _certification_score(self, resource: Any, project: Any) -> float:
+        """Score of _calculate_certification_match without the match details."""
+        if not project.required_certifications:
+            return 100.0
+        required = set(project.required_certifications)
+        matched = sum(1 for cert in project.required_certifications if cert in resource.certifications)
+        score = (matched / len(project.required_certifications)) * 100
+        if any(cert not in required for cert in resource.certifications):
+            score = min(score + 10.0, 100.0)
+        return score
+
+    def _rank_key(self, resource: Any, project: Any) -> Tuple[int, float]:
+        """Sort key (rank, -score) computed from scalar scores only."""
+        primary_match = self._skill_score(resource.primary_skills, project.required_primary_skills)
+        secondary_match = self._skill_score(resource.secondary_skills, project.required_secondary_skills)
+        experience_match, _ = self._calculate_experience_match(resource, project)
+        match_score = min(self._weighted_score(
+            primary_match, secondary_match, experience_match,
+            self._calculate_location_match(resource, project),
+            self._calculate_work_type_match(resource, project),
+            self._certification_score(resource, project)
+        ), 100.0)
+        match_rank = self._determine_match_rank(primary_match, secondary_match, experience_match)
+        return match_rank.value, -match_score
+
+    def _build_match(self, resource: Any, project: Any, automated: bool) -> Dict:
+        """Build the full match payload (scores, analysis and recommendation) for one resource."""
+        # Calculate various match scores
+        primary_match, primary_details = self._calculate_skill_match(
+            resource.primary_skills, project.required_primary_skills)
+        secondary_match, secondary_details = self._calculate_skill_match(
+            resource.secondary_skills, project.required_secondary_skills)
+        experience_match, experience_details = self._calculate_experience_match(resource, project)
+        certification_match, certification_details = self._calculate_certification_match(resource, project)
+        location_match = self._calculate_location_match(resource, project)
+        work_type_match = self._calculate_work_type_match(resource, project)
+
+        match_score = self._weighted_score(
+            primary_match, secondary_match, experience_match,
+            location_match, work_type_match, certification_match
+        )
+
+        # Ensure score doesn't exceed 100%
+        match_score = min(match_score, 100.0)
+
+        match_rank = self._determine_match_rank(primary_match, secondary_match, experience_match)
+
+        match_data = {
+            "resource_id": resource.id,
+            "resource_name": resource.name,
+            "match_rank": match_rank.name,
+            "match_score": match_score,
+            "primary_match": primary_match,
+            "secondary_match": secondary_match,
+            "experience_match": experience_match,
+            "certification_match": certification_match,
+            "location_match": location_match,
+            "work_type_match": work_type_match,
+            "skill_analysis": {
+                "primary": primary_details,
+                "secondary": secondary_details
+            },
+            "experience_analysis": experience_details,
+            "certification_analysis": certification_details
+        }
+
+        if not automated:
+            match_data.update({
+                "recommendation": self._generate_recommendation(
+                    match_rank, primary_details, secondary_details,
+                    experience_details, certification_details
+                )
+            })
+
+        return match_data
+
+    def _rank_matches(self, project: Any, resources: Iterable[Any], automated: bool,
+                      filters: Optional[Dict], top_k: Optional[int] = None) -> List[Dict]:
+        """
+        Score the resources passing filters against a project, best first.
+
+        Args:
+            project: Project requirement to match
+            resources: Candidate resources
+            automated: Leave out the textual recommendation
+            filters: Optional location / work_type / min_experience filters
+            top_k: Return only the best top_k matches (payloads are built for those only)
+
+        Returns:
+            Match payloads sorted by rank, then descending score
+        """
+        candidates = (resource for resource in resources if self._passes_filters(resource, filters))
+
+        if top_k is None:
+            matches = [self._build_match(resource, project, automated) for resource in candidates]
+            # Sort matches by rank and score
+            matches.sort(key=lambda x: (self.match_rank_enum[x["match_rank"]].value, -x["match_score"]))
+            return matches
+
+        # Bounded heap over scalar keys; payloads are built for the survivors only
+        best = heapq.nsmallest(top_k, candidates, key=lambda resource: self._rank_key(resource, project))
+        return [self._build_match(resource, project, automated) for resource in best]
@@ -0,0 +1,184 @@
+"""
+Match Store for RME
+Indexed storage for the match records of the legacy web routes, replacing one
+JSON file per match. Records live in a SQLite database in WAL mode, so the
+dashboard reads recent matches and aggregates through indexes while batch
+matching writes, and ids come from the database instead of the clock.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "uploads/matches.sqlite"
+
+# Columns stored outside the JSON payload so they can be indexed
+INDEXED_FIELDS = ("job_id", "resume_name", "job_title", "score", "date", "status")
+
+
+def _payload(match: Dict[str, Any]) -> str:
+    """Serialize a match record without its id (the id is the row key)."""
+    return json.dumps({key: value for key, value in match.items() if key != "id"})
+
+
+def _record(match_id: int, data: str) -> Dict[str, Any]:
+    """Rebuild a match record from its id and stored payload."""
+    return {**json.loads(data), "id": match_id}
+
+
+class MatchStore:
+    """
+    SQLite-backed store of legacy match records.
+
+    Every record keeps its JSON payload plus the fields the routes filter and
+    sort on as columns. Ids are AUTOINCREMENT, so they are unique and increase
+    monotonically even when batch matches finish in the same second; records
+    imported from the old JSON files keep their ids.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        """
+        Initialize the match store.
+
+        Args:
+            path: SQLite database file (":memory:" for a private in-memory store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS matches ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, job_id INTEGER, resume_name TEXT, job_title TEXT, "
+            "score REAL NOT NULL, date TEXT NOT NULL, status TEXT, data TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS ix_matches_date_id ON matches (date, id);"
+            "CREATE INDEX IF NOT EXISTS ix_matches_score ON matches (score);"
+            "CREATE INDEX IF NOT EXISTS ix_matches_job_id_score ON matches (job_id, score);"
+            "CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+        self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+    def add(self, match: Dict[str, Any]) -> Dict[str, Any]:
+        """Store one match and return it with its assigned id."""
+        return self.add_many([match])[0]
+
+    def add_many(self, matches: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Store matches in a single transaction.
+
+        Args:
+            matches: Match records; an "id" is assigned to each
+
+        Returns:
+            The stored records with their ids, in input order
+        """
+        stored = []
+        with self._lock, self._db:
+            for match in matches:
+                cursor = self._db.execute(
+                    "INSERT INTO matches (job_id, resume_name, job_title, score, date, status, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (*(match.get(field) for field in INDEXED_FIELDS), _payload(match))
+                )
+                stored.append({**match, "id": cursor.lastrowid})
+        return stored
+
+    def get(self, match_id: int) -> Optional[Dict[str, Any]]:
+        """Return a match by id, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT id, data FROM matches WHERE id = ?", (match_id,)).fetchone()
+        return _record(*row) if row else None
+
+    def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return the most recent matches, newest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, data FROM matches ORDER BY date DESC, id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [_record(*row) for row in rows]
+
+    def stats(self, success_threshold: float = 0.7) -> Dict[str, int]:
+        """
+        Count all matches and those scoring at least success_threshold.
+
+        Args:
+            success_threshold: Minimum score of a successful match
+
+        Returns:
+            {"total", "successful"}
+        """
+        with self._lock:
+            total = self._db.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+            successful = self._db.execute(
+                "SELECT COUNT(*) FROM matches WHERE score >= ?", (success_threshold,)
+            ).fetchone()[0]
+        return {"total": total, "successful": successful}
+
+    def import_json_files(self, directory: str) -> int:
+        """
+        Import match_*.json files written before the store existed.
+
+        Runs once per directory: later calls return 0 without reading the
+        files. Records keep their original ids; the files are left in place.
+
+        Args:
+            directory: Directory holding the match JSON files
+
+        Returns:
+            Number of matches imported
+        """
+        marker = f"json_import:{Path(directory).absolute()}"
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM store_meta WHERE key = ?", (marker,)).fetchone():
+                return 0
+
+        rows = []
+        for match_file in sorted(Path(directory).glob("match_*.json")):
+            try:
+                match = json.loads(match_file.read_text())
+                rows.append((match["id"], *(match.get(field) for field in INDEXED_FIELDS), _payload(match)))
+            except Exception as e:
+                logger.error(f"Error importing {match_file}: {str(e)}")
+
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO matches (id, job_id, resume_name, job_title, score, date, status, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            imported = self._db.total_changes - before
+            self._db.execute("INSERT INTO store_meta (key, value) VALUES (?, ?)", (marker, str(imported)))
+        if imported:
+            logger.info(f"Imported {imported} match files from {directory}")
+        return imported
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+
+_stores: Dict[str, MatchStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_match_store(path: str = DEFAULT_PATH) -> MatchStore:
+    """Return the process-wide match store for a database file, creating it on first use."""
+    key = str(Path(path).absolute())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = MatchStore(path)
+        return _stores[key]
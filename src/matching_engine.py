@@ -7,22 +7,22 @@ import logging
 import time
 from typing import Dict, List, Any, Optional, Tuple, Union
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
-import spacy
 from .skill_categories import SkillRegistry, Skill, SkillCategory, SkillLevel
 from datetime import datetime, timezone
 from pathlib import Path
 import json
 import yaml
-import torch
-from transformers import AutoTokenizer, AutoModel
 import re
+import heapq
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
-import aiofiles
-import warnings
 from .enhanced_document_processor import EnhancedDocumentProcessor
+from .embedding_store import EmbeddingStore, get_embedding_store
+from .embedding_service import EmbeddingService, get_embedding_service
+from .model_registry import default_device, get_hf_model, get_hf_tokenizer
+from .embedding_backend import backend_options, get_sentence_encoder, store_version
+from .document_embedding import ChunkedEmbedder, chunking_options, pooled_store_version
+from .prepared_job import PreparedJob, engine_fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -35,19 +35,24 @@ class MatchingEngine:
         model_path: str = "models",
         device: Optional[str] = None,
         max_workers: int = 4,
-        cache_size: int = 1000
+        cache_size: int = 1000,
+        encode_batch_size: int = 64
     ):
         """Initialize the matching engine."""
         self.logger = logging.getLogger(__name__)
         self.config = config or {}
         self.model_path = Path(model_path)
-        self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
+        self._device = device
         self.max_workers = max_workers
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
         self.cache_size = cache_size
+        self.encode_batch_size = encode_batch_size
         
         # Initialize document processor
-        self.doc_processor = EnhancedDocumentProcessor()
+        self.doc_processor = EnhancedDocumentProcessor(
+            section_patterns=self.config.get('document_processing', {}).get('section_patterns')
+        )
+        self.skill_registry = SkillRegistry()
         
         # Initialize models
         self._load_models()
@@ -59,58 +64,145 @@ class MatchingEngine:
         self.weights = self._normalize_weights(self.config.get('weights'))
         
     def _load_models(self) -> None:
-        """Load required models with error handling."""
-        try:
-            # Load sentence transformer model
-            self.sentence_model = SentenceTransformer(
+        """Defer model loading; models come from the shared registry on first use."""
+        self._sentence_model = None
+        
+    @property
+    def device(self) -> str:
+        """Device models run on; detecting a GPU imports torch, so it is deferred."""
+        if self._device is None:
+            self._device = default_device()
+        return self._device
+        
+    @device.setter
+    def device(self, device: str) -> None:
+        self._device = device
+        
+    @property
+    def sentence_model(self) -> Any:
+        """Sentence encoder used for all embeddings (shared, loaded on first use).
+        
+        The inference backend (fp32 torch, int8 or ONNX) comes from the
+        embedding_backend section of the config.
+        """
+        if getattr(self, '_sentence_model', None) is None:
+            self._sentence_model = get_sentence_encoder(
                 'all-MiniLM-L6-v2',
                 device=self.device,
-                cache_folder=str(self.model_path)
-            )
-            
-            # Load BERT model for detailed analysis
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                'bert-base-uncased',
-                cache_dir=str(self.model_path)
+                cache_folder=str(self.model_path),
+                **backend_options(self.config.get('embedding_backend'))
             )
-            self.bert_model = AutoModel.from_pretrained(
-                'bert-base-uncased',
-                cache_dir=str(self.model_path)
-            ).to(self.device)
-            
-            logger.info("Successfully loaded all models")
-            
-        except Exception as e:
-            logger.error(f"Error loading models: {str(e)}")
-            raise
-            
+        return self._sentence_model
+        
+    @sentence_model.setter
+    def sentence_model(self, model: Any) -> None:
+        self._sentence_model = model
+        
+    @property
+    def tokenizer(self) -> Any:
+        """BERT tokenizer for detailed analysis (shared, loaded on first use)."""
+        return get_hf_tokenizer('bert-base-uncased', cache_dir=str(self.model_path))
+        
+    @property
+    def bert_model(self) -> Any:
+        """BERT model for detailed analysis (shared, loaded on first use)."""
+        return get_hf_model('bert-base-uncased', device=self.device, cache_dir=str(self.model_path))
+        
     def _init_caches(self) -> None:
         """Initialize caching for embeddings and results."""
         self.embedding_cache = {}
         self.result_cache = {}
         self.skill_cache = {}
         
+        # Stores are opened on first use, once the backend actually loaded is known
+        self._stores_opened = False
+        self._embedding_version = ''
+        self._embedding_store: Optional[EmbeddingStore] = None
+        self._document_embedder: Optional[ChunkedEmbedder] = None
+        
+    def _open_stores(self) -> None:
+        """Open the persistent embedding stores for the loaded sentence encoder."""
+        if self._stores_opened:
+            return
+        self._stores_opened = True
+        
+        # Persistent embedding store shared by every engine in the process; the
+        # version follows the backend that loaded (quantized/ONNX may fall back to fp32)
+        store_config = self.config.get('embedding_store', {})
+        version = store_version(
+            str(store_config.get('model_version', '1')),
+            getattr(self.sentence_model, 'name', 'torch')
+        )
+        self._embedding_version = version
+        directory = store_config.get('path', str(self.model_path / 'embeddings'))
+        if store_config.get('enabled', True):
+            try:
+                self._embedding_store = get_embedding_store('all-MiniLM-L6-v2', model_version=version, directory=directory)
+            except Exception as e:
+                logger.warning(f"Embedding store unavailable, using in-memory cache: {str(e)}")
+        
+        # Long documents are embedded as overlapping chunks when enabled
+        chunking_config = self.config.get('embedding_chunking', {})
+        if chunking_config.get('enabled', False):
+            options = chunking_options(chunking_config)
+            pooled_store = None
+            if self._embedding_store is not None:
+                pooled_store = get_embedding_store(
+                    'all-MiniLM-L6-v2',
+                    model_version=pooled_store_version(version, options),
+                    directory=directory
+                )
+            self._document_embedder = ChunkedEmbedder(self._encode_texts, pooled_store, **options)
+        
+    @property
+    def embedding_version(self) -> str:
+        """Embedding store version of the loaded sentence encoder."""
+        self._open_stores()
+        return self._embedding_version
+        
+    @property
+    def embedding_store(self) -> Optional[EmbeddingStore]:
+        """Persistent embedding store, or None when disabled or unavailable."""
+        self._open_stores()
+        return self._embedding_store
+        
+    @property
+    def document_embedder(self) -> Optional[ChunkedEmbedder]:
+        """Chunked document embedder, or None when embedding_chunking is disabled."""
+        self._open_stores()
+        return self._document_embedder
+        
+    @property
+    def embedding_service(self) -> EmbeddingService:
+        """Micro-batching service shared by every user of this engine's sentence model."""
+        model = self.sentence_model
+        batch_size = self.encode_batch_size
+        return get_embedding_service(
+            model,
+            lambda texts: model.encode(texts, batch_size=batch_size, convert_to_numpy=True),
+            name='all-MiniLM-L6-v2',
+            **self.config.get('embedding_service', {})
+        )
+        
     def _get_cached_embedding(self, text: str, cache: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
         """Get cached embedding or compute new one."""
         if not text.strip():
             return None
             
-        # Use text hash as key
-        text_hash = hash(text.strip())
-        
-        # Check cache
-        if text_hash in cache:
-            return cache[text_hash]
-            
         try:
-            # Compute embedding
-            embedding = self.sentence_model.encode(text, convert_to_numpy=True)
-            
-            # Update cache
+            if self.embedding_store is not None:
+                return self.embedding_store.get_or_compute([text], self.embedding_service.encode)[0]
+                
+            # In-memory fallback keyed by normalized text
+            text_key = EmbeddingStore.normalize_text(text)
+            if text_key in cache:
+                return cache[text_key]
+                
+            embedding = self.embedding_service.encode([text])[0]
             if len(cache) >= self.cache_size:
                 # Remove oldest entry
                 cache.pop(next(iter(cache)))
-            cache[text_hash] = embedding
+            cache[text_key] = embedding
             
             return embedding
             
@@ -118,78 +210,238 @@ class MatchingEngine:
             self.logger.error(f"Error computing embedding: {str(e)}")
             return None
             
-    def match(self, job_description: str, candidate_profile: str) -> Dict[str, Any]:
-        """Match a candidate profile against a job description."""
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in large batches, reusing stored embeddings, and L2-normalize rows."""
+        encode = self.embedding_service.encode
+        
+        if self.embedding_store is not None:
+            matrix = self.embedding_store.get_or_compute(texts, encode)
+        else:
+            keys = [EmbeddingStore.normalize_text(text) for text in texts]
+            embeddings = {key: self.embedding_cache[key] for key in keys if key in self.embedding_cache}
+            missing = {key: text for key, text in zip(keys, texts) if key not in embeddings}
+            if missing:
+                for key, embedding in zip(missing, encode(list(missing.values()))):
+                    embeddings[key] = embedding
+                    if len(self.embedding_cache) >= self.cache_size:
+                        # Remove oldest entry
+                        self.embedding_cache.pop(next(iter(self.embedding_cache)))
+                    self.embedding_cache[key] = embedding
+            matrix = np.asarray([embeddings[key] for key in keys], dtype=np.float32)
+            
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+        
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Return L2-normalized whole-document embeddings, e.g. for a CandidateIndex.
+        
+        With chunking enabled these are the pooled chunk embeddings, so text
+        past the model's token limit still counts.
+        """
+        if self.document_embedder is not None:
+            return self.document_embedder.pooled(texts)
+        return self._encode_texts(texts)
+        
+    def _error_result(self, message: str) -> Dict[str, Any]:
+        """Build the result returned for a failed match."""
+        return {
+            'error': message,
+            'score': 0.0,
+            'section_scores': {},
+            'matching_skills': [],
+            'missing_skills': [],
+            'processed_at': datetime.now(timezone.utc).isoformat()
+        }
+        
+    @property
+    def prepared_fingerprint(self) -> str:
+        """Fingerprint of the settings prepared jobs depend on; a change invalidates them."""
+        return engine_fingerprint({
+            'embedding': self.embedding_version,
+            'weights': self.weights,
+            'section_patterns': self.config.get('document_processing', {}).get('section_patterns'),
+            'skills': self.skill_registry.fingerprint()
+        })
+        
+    def prepare_job(self, job_description: str, title: Optional[str] = None) -> PreparedJob:
+        """
+        Parse and embed a job description once for matching many resumes.
+        
+        Args:
+            job_description: Job description text
+            title: Optional job title carried into batch_match results
+            
+        Returns:
+            PreparedJob accepted by match, match_many, rank and batch_match
+        """
+        if not job_description or not job_description.strip():
+            raise ValueError("Job description must not be empty")
+            
+        job_sections = self.doc_processor.extract_sections(job_description)
+        if not job_sections:
+            raise ValueError("Could not extract sections from job description")
+            
+        section_names = [
+            section for section in self.weights
+            if job_sections.get(section, '').strip()
+        ]
+        if section_names:
+            embeddings = self._encode_texts([job_sections[section] for section in section_names])
+        else:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+            
+        return PreparedJob(
+            description=job_description,
+            sections=job_sections,
+            section_names=section_names,
+            skills=self._extract_skills(job_sections.get('skills', '')),
+            embeddings=embeddings,
+            weights=np.asarray([self.weights[section] for section in section_names], dtype=np.float32),
+            fingerprint=self.prepared_fingerprint,
+            title=title
+        )
+        
+    def load_prepared_job(
+        self,
+        job_description: str,
+        cached: Optional[Dict[str, Any]] = None,
+        title: Optional[str] = None
+    ) -> PreparedJob:
+        """
+        Restore a serialized prepared job, re-preparing it if it is missing or stale.
+        
+        Args:
+            job_description: Current job description text
+            cached: PreparedJob.to_dict() output persisted with the job, if any
+            title: Optional job title
+            
+        Returns:
+            A prepared job that is current for this engine and description
+        """
+        if cached:
+            try:
+                prepared = PreparedJob.from_dict(cached, job_description)
+                if prepared.is_current(job_description, self.prepared_fingerprint):
+                    return prepared
+            except Exception as e:
+                self.logger.warning(f"Discarding unreadable prepared job: {str(e)}")
+        return self.prepare_job(job_description, title=title)
+        
+    def _as_prepared(self, job: Union[str, PreparedJob]) -> PreparedJob:
+        """Prepare a job description unless it already is prepared."""
+        return job if isinstance(job, PreparedJob) else self.prepare_job(job)
+        
+    def match_many(self, job: Union[str, PreparedJob], candidate_profiles: List[str]) -> List[Dict[str, Any]]:
+        """
+        Match many candidate profiles against one job description.
+        
+        The job is parsed and embedded once (or not at all when a PreparedJob
+        is passed), every candidate section is encoded in large batches and
+        all section similarities are computed with a single matrix product.
+        
+        Args:
+            job: Job description text or PreparedJob
+            candidate_profiles: Candidate profile texts
+            
+        Returns:
+            List of match results, in the same order as candidate_profiles
+        """
+        if not candidate_profiles:
+            return []
+            
         try:
-            if not job_description.strip() or not candidate_profile.strip():
-                raise ValueError("Job description and candidate profile must not be empty")
-                
-            # Process job description
-            job_sections = self.doc_processor.extract_sections(job_description)
-            if not job_sections:
-                raise ValueError("Could not extract sections from job description")
-                
-            # Process candidate profile
-            profile_sections = self.doc_processor.extract_sections(candidate_profile)
-            if not profile_sections:
-                raise ValueError("Could not extract sections from candidate profile")
-                
-            # Compute section scores
-            section_scores = {}
-            for section, weight in self.weights.items():
-                if section in job_sections and section in profile_sections:
-                    job_text = job_sections[section]
-                    profile_text = profile_sections[section]
+            prepared = self._as_prepared(job)
+            sections = prepared.section_names
+            column_of = {section: column for column, section in enumerate(sections)}
+            
+            # Process candidate profiles and collect unique section texts
+            results: List[Optional[Dict[str, Any]]] = [None] * len(candidate_profiles)
+            profile_skills: Dict[int, List[str]] = {}
+            texts: List[str] = []
+            rows: Dict[str, int] = {}
+            pairs: List[Tuple[int, int, int]] = []  # (profile index, section column, text row)
+            
+            for i, candidate_profile in enumerate(candidate_profiles):
+                if not candidate_profile or not candidate_profile.strip():
+                    results[i] = self._error_result("Job description and candidate profile must not be empty")
+                    continue
+                    
+                profile_sections = self.doc_processor.extract_sections(candidate_profile)
+                if not profile_sections:
+                    results[i] = self._error_result("Could not extract sections from candidate profile")
+                    continue
                     
-                    if job_text.strip() and profile_text.strip():
-                        # Get embeddings
-                        job_embedding = self._get_cached_embedding(job_text, self.embedding_cache)
-                        profile_embedding = self._get_cached_embedding(profile_text, self.embedding_cache)
+                profile_skills[i] = self._extract_skills(profile_sections.get('skills', ''))
+                for section in sections:
+                    profile_text = profile_sections.get(section, '')
+                    if profile_text.strip():
+                        if profile_text not in rows:
+                            rows[profile_text] = len(texts)
+                            texts.append(profile_text)
+                        pairs.append((i, column_of[section], rows[profile_text]))
                         
-                        if job_embedding is not None and profile_embedding is not None:
-                            # Compute similarity
-                            similarity = cosine_similarity(
-                                job_embedding.reshape(1, -1),
-                                profile_embedding.reshape(1, -1)
-                            )[0][0]
-                            
-                            section_scores[section] = float(similarity)
-                            
-            # Compute overall score
-            if not section_scores:
-                overall_score = 0.0
-            else:
-                overall_score = sum(
-                    score * self.weights.get(section, 0.0)
-                    for section, score in section_scores.items()
-                )
+            # One matrix product for every (profile section, job section) pair
+            section_scores: Dict[int, Dict[str, float]] = {i: {} for i in profile_skills}
+            overall_scores: Dict[int, float] = {i: 0.0 for i in profile_skills}
+            if pairs:
+                similarity = self._encode_texts(texts) @ prepared.embeddings.T
+                for i, column, row in pairs:
+                    score = float(similarity[row, column])
+                    section_scores[i][sections[column]] = score
+                    overall_scores[i] += score * float(prepared.weights[column])
+                    
+            job_skill_set = prepared.skill_set
+            for i, skills in profile_skills.items():
+                profile_skill_set = set(skills)
+                results[i] = {
+                    'score': float(overall_scores[i]),
+                    'section_scores': section_scores[i],
+                    'matching_skills': list(job_skill_set & profile_skill_set),
+                    'missing_skills': list(job_skill_set - profile_skill_set),
+                    'processed_at': datetime.now(timezone.utc).isoformat()
+                }
                 
-            # Extract skills
-            job_skills = self._extract_skills(job_sections.get('skills', ''))
-            profile_skills = self._extract_skills(profile_sections.get('skills', ''))
-            
-            # Find matching and missing skills
-            matching_skills = list(set(job_skills) & set(profile_skills))
-            missing_skills = list(set(job_skills) - set(profile_skills))
-            
-            return {
-                'score': float(overall_score),
-                'section_scores': section_scores,
-                'matching_skills': matching_skills,
-                'missing_skills': missing_skills,
-                'processed_at': datetime.now(timezone.utc).isoformat()
-            }
+            return results
             
         except Exception as e:
-            self.logger.error(f"Error in match: {str(e)}")
-            return {
-                'error': str(e),
-                'score': 0.0,
-                'section_scores': {},
-                'matching_skills': [],
-                'missing_skills': [],
-                'processed_at': datetime.now(timezone.utc).isoformat()
-            }
+            self.logger.error(f"Error in match_many: {str(e)}")
+            return [self._error_result(str(e)) for _ in candidate_profiles]
+            
+    def rank(
+        self,
+        job: Union[str, PreparedJob],
+        candidate_profiles: List[str],
+        top_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank candidate profiles against one job description.
+        
+        Args:
+            job: Job description text or PreparedJob
+            candidate_profiles: Candidate profile texts
+            top_k: Number of best matches to return (all if None)
+            
+        Returns:
+            Match results sorted by descending score, each with the 'index'
+            of the profile in candidate_profiles
+        """
+        results = self.match_many(job, candidate_profiles)
+        for index, result in enumerate(results):
+            result['index'] = index
+            
+        if top_k is None:
+            return sorted(results, key=lambda r: r['score'], reverse=True)
+        return heapq.nlargest(top_k, results, key=lambda r: r['score'])
+            
+    def match(self, job: Union[str, PreparedJob], candidate_profile: str) -> Dict[str, Any]:
+        """
+        Match a candidate profile against a job description.
+        
+        Pass a PreparedJob (see prepare_job) when matching several profiles
+        against the same job one at a time, so the job is processed only once.
+        """
+        return self.match_many(job, [candidate_profile])[0]
             
     def _extract_skills(self, text: str) -> List[str]:
         """Extract individual skills from text."""
@@ -294,11 +546,13 @@ class MatchingEngine:
         
         if remaining_job_skills and remaining_profile_skills:
             try:
-                # Get embeddings
-                job_embeddings = self.sentence_model.encode(remaining_job_skills)
-                profile_embeddings = self.sentence_model.encode(remaining_profile_skills)
+                # Get embeddings for both skill lists in one batch
+                embeddings = self.embedding_service.encode(remaining_job_skills + remaining_profile_skills)
+                job_embeddings = embeddings[:len(remaining_job_skills)]
+                profile_embeddings = embeddings[len(remaining_job_skills):]
                 
                 # Calculate similarity matrix
+                from sklearn.metrics.pairwise import cosine_similarity
                 similarity_matrix = cosine_similarity(job_embeddings, profile_embeddings)
                 
                 # Get maximum similarity for each job skill
@@ -370,12 +624,17 @@ class MatchingEngine:
         matches = len(required_set.intersection(actual_set))
         return matches / len(required_set)
     
-    def batch_match(self, jobs: List[Dict[str, Any]], profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def batch_match(
+        self,
+        jobs: List[Union[Dict[str, Any], PreparedJob]],
+        profiles: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
         """
         Match multiple jobs with multiple profiles.
         
         Args:
-            jobs: List of job dictionaries
+            jobs: Job dictionaries ('title', 'description' and optionally a
+                'prepared' PreparedJob) or PreparedJob objects
             profiles: List of profile dictionaries
             
         Returns:
@@ -386,19 +645,25 @@ class MatchingEngine:
         processed = 0
         
         for job in jobs:
-            for profile in profiles:
-                try:
-                    result = self.match(job['description'], profile['content'])
-                    result['job'] = job['title']
-                    result['profile'] = profile['name']
-                    results.append(result)
-                    
-                    processed += 1
-                    if processed % 10 == 0:
-                        logger.info(f"Processed {processed}/{total_matches} matches")
-                        
-                except Exception as e:
-                    logger.error(f"Error matching job {job['title']} with profile {profile['name']}: {str(e)}")
-                    continue
+            if isinstance(job, PreparedJob):
+                title, job_input = job.title, job
+            else:
+                title, job_input = job['title'], job.get('prepared') or job['description']
+            try:
+                job_results = self.match_many(
+                    job_input,
+                    [profile['content'] for profile in profiles]
+                )
+            except Exception as e:
+                logger.error(f"Error matching job {title}: {str(e)}")
+                continue
+                
+            for profile, result in zip(profiles, job_results):
+                result['job'] = title
+                result['profile'] = profile['name']
+                results.append(result)
+                
+            processed += len(profiles)
+            logger.info(f"Processed {processed}/{total_matches} matches")
         
-        return results 
\ No newline at end of file
+        return results
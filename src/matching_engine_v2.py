@@ -2,13 +2,14 @@ from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from typing import List, Dict, Optional, Tuple
-import pandas as pd
+import numpy as np
+from scipy import sparse
 import json
 import os
 from pathlib import Path
 import shutil
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from .match_ranking import RankedMatchingMixin
 
 class SkillLevel(Enum):
     PRIMARY = "PRIMARY"
@@ -107,7 +108,114 @@ class ProjectRequirement:
     required_experience_level: ExperienceLevel = None
     required_certifications: List[str] = None
 
-class MatchingEngineV2:
+class ResourceTable:
+    """
+    Columnar view of a bench of resources used for vectorized scoring.
+
+    Skill names are mapped to integer ids and each skill level is stored as a
+    sparse resource x skill matrix whose values point (1-based) into flat
+    per-entry arrays of proficiency, years and last-used timestamps. Only the
+    first occurrence of a skill name per resource and level is kept, matching
+    the per-object lookup. Project-independent values (weighted experience,
+    experience level, categorical columns) are computed once at build time.
+    """
+
+    def __init__(self, resources: List[Resource], engine: "MatchingEngineV2"):
+        self.resources = resources
+        self.rows = {id(resource): row for row, resource in enumerate(resources)}
+        self.skill_ids: Dict[str, int] = {}
+        self.cert_ids: Dict[str, int] = {}
+
+        n = len(resources)
+        entries = {"primary": ([], [], []), "secondary": ([], [], [])}
+        self.entry_skills: List[Optional[Skill]] = [None]  # entry 0 means "missing"
+        cert_rows, cert_cols = [], []
+        self.max_primary_years = np.full(n, -np.inf)
+        self.weighted_experience = []
+        self.experience_levels = []
+
+        for row, resource in enumerate(resources):
+            for level, skills in (("primary", resource.primary_skills), ("secondary", resource.secondary_skills)):
+                rows, cols, values = entries[level]
+                seen = set()
+                for skill in skills:
+                    if skill.name in seen:
+                        continue
+                    seen.add(skill.name)
+                    rows.append(row)
+                    cols.append(self.skill_ids.setdefault(skill.name, len(self.skill_ids)))
+                    values.append(len(self.entry_skills))
+                    self.entry_skills.append(skill)
+            if resource.primary_skills:
+                self.max_primary_years[row] = max(s.years_experience for s in resource.primary_skills)
+            for cert in resource.certifications or []:
+                cert_rows.append(row)
+                cert_cols.append(self.cert_ids.setdefault(cert, len(self.cert_ids)))
+
+            avg_experience, resource_level = engine._weighted_experience(resource)
+            self.weighted_experience.append(avg_experience)
+            self.experience_levels.append(resource_level)
+
+        shape = (n, len(self.skill_ids))
+        self.skills = {
+            level: sparse.csc_matrix((np.array(values, dtype=np.int64), (rows, cols)), shape=shape)
+            for level, (rows, cols, values) in entries.items()
+        }
+        # Duplicate certifications are summed, giving per-resource counts
+        self.certs = sparse.csc_matrix(
+            (np.ones(len(cert_rows)), (cert_rows, cert_cols)), shape=(n, len(self.cert_ids))
+        )
+        self.cert_totals = np.asarray(self.certs.sum(axis=1)).ravel()
+
+        skills = self.entry_skills[1:]
+        self.proficiency = np.array([0] + [s.proficiency for s in skills], dtype=np.float64)
+        self.years = np.array([0] + [s.years_experience for s in skills], dtype=np.float64)
+        self.last_used = np.array(
+            [np.datetime64("NaT")] + [s.last_used if s.last_used else np.datetime64("NaT") for s in skills],
+            dtype="datetime64[us]"
+        )
+
+        self.level_codes = {level: code for code, level in enumerate(ExperienceLevel)}
+        self.experience_level_codes = np.array(
+            [self.level_codes[level] for level in self.experience_levels], dtype=np.int64
+        )
+        self.location = np.array([r.location for r in resources], dtype=object)
+        self.preferred_location = np.array([r.preferred_location for r in resources], dtype=object)
+        self.preferred_work_type = np.array([r.preferred_work_type for r in resources], dtype=object)
+
+    def recency_scores(self, now: datetime) -> np.ndarray:
+        """Vectorized Skill.get_recency_score for every skill entry."""
+        with np.errstate(invalid="ignore"):  # NaT entries are overwritten below
+            days = (np.datetime64(now, "us") - self.last_used) // np.timedelta64(1, "D")
+        scores = np.select(
+            [days <= 30, days <= 90, days <= 180, days <= 365],
+            [1.0, 0.8, 0.6, 0.4],
+            default=0.2
+        )
+        scores[np.isnat(self.last_used)] = 0.5
+        return scores
+
+    def skill_entries(self, level: str, rows: np.ndarray, required_skills: List[str]) -> np.ndarray:
+        """Dense (rows x required) matrix of 1-based entry ids, 0 where the skill is missing."""
+        entries = np.zeros((len(rows), len(required_skills)), dtype=np.int64)
+        for col, name in enumerate(required_skills):
+            skill_id = self.skill_ids.get(name)
+            if skill_id is not None:
+                entries[:, col] = self.skills[level][:, skill_id].toarray().ravel()[rows]
+        return entries
+
+    def cert_columns(self, rows: np.ndarray, certs: List[str]) -> np.ndarray:
+        """Dense (rows x certs) matrix of certification counts."""
+        counts = np.zeros((len(rows), len(certs)))
+        for col, cert in enumerate(certs):
+            cert_id = self.cert_ids.get(cert)
+            if cert_id is not None:
+                counts[:, col] = self.certs[:, cert_id].toarray().ravel()[rows]
+        return counts
+
+class MatchingEngineV2(RankedMatchingMixin):
+    match_rank_enum = MatchRank
+
     def __init__(self):
         self.resources: Dict[str, Resource] = {}
         self.projects: Dict[str, ProjectRequirement] = {}
@@ -134,6 +242,11 @@ class MatchingEngineV2:
             "recency": 0.05
         }
 
+        # Columnar scoring backend, rebuilt when the bench changes
+        self.columnar = True
+        self._resource_table: Optional[ResourceTable] = None
+        self._resource_table_key: Optional[List[int]] = None
+
     def _clear_old_files(self):
         """Clear old output files before creating new ones."""
         for file_path in self.output_files.values():
@@ -181,11 +294,8 @@ class MatchingEngineV2:
         
         return (total_score / len(required_skills)), match_details
 
-    def _calculate_experience_match(self, resource: Resource, project: ProjectRequirement) -> Tuple[float, Dict]:
-        if not project.required_experience_level:
-            return 100.0, {"level": "Not specified"}
-        
-        # Calculate weighted experience based on primary skills
+    def _weighted_experience(self, resource: Resource) -> Tuple[float, ExperienceLevel]:
+        """Proficiency-weighted years across primary skills and the level it maps to."""
         total_weight = 0
         weighted_experience = 0
         for skill in resource.primary_skills:
@@ -199,17 +309,29 @@ class MatchingEngineV2:
                         ExperienceLevel.MID_LEVEL if avg_experience >= 3 else \
                         ExperienceLevel.JUNIOR if avg_experience >= 1 else \
                         ExperienceLevel.ENTRY
-        
+        return avg_experience, resource_level
+
+    def _experience_level_score(self, resource_level: ExperienceLevel,
+                                required_level: ExperienceLevel) -> float:
         # Calculate match score with more granular scoring
-        if resource_level == project.required_experience_level:
+        if resource_level == required_level:
             score = 100.0
-        elif resource_level.value < project.required_experience_level.value:
+        elif resource_level.value < required_level.value:
             # Penalize for lower experience
-            level_diff = project.required_experience_level.value - resource_level.value
+            level_diff = required_level.value - resource_level.value
             score = max(100.0 - (level_diff * 25.0), 0.0)  # 25% penalty per level
         else:
             # Bonus for higher experience, but not full score
             score = 85.0
+        return score
+
+    def _calculate_experience_match(self, resource: Resource, project: ProjectRequirement) -> Tuple[float, Dict]:
+        if not project.required_experience_level:
+            return 100.0, {"level": "Not specified"}
+        
+        # Calculate weighted experience based on primary skills
+        avg_experience, resource_level = self._weighted_experience(resource)
+        score = self._experience_level_score(resource_level, project.required_experience_level)
             
         return score, {
             "required_level": project.required_experience_level.value,
@@ -314,61 +436,211 @@ class MatchingEngineV2:
 
         return " | ".join(recommendation)
 
-    def find_matches(self, project_id: str, automated: bool = True, filters: Optional[Dict] = None) -> List[Dict]:
+    def find_matches(self, project_id: str, automated: bool = True, filters: Optional[Dict] = None,
+                     candidate_limit: Optional[int] = None, top_k: Optional[int] = None) -> List[Dict]:
         if project_id not in self.projects:
             return []
 
         project = self.projects[project_id]
-        matches = []
 
-        for resource in self.resources.values():
-            # Apply filters if provided
-            if filters:
-                if filters.get("location") and resource.location != filters["location"]:
-                    continue
-                if filters.get("work_type") and resource.preferred_work_type != filters["work_type"]:
-                    continue
-                if filters.get("min_experience"):
-                    min_exp = filters["min_experience"]
-                    if not any(s.years_experience >= min_exp for s in resource.primary_skills):
-                        continue
+        # Shortlist with the retrieval index before detailed scoring
+        resources = list(self.resources.values())
+        if candidate_limit and self.candidate_index is not None:
+            resources = self._shortlist_resources(project, candidate_limit)
+
+        if self.columnar:
+            return self._score_columnar(project, resources, automated, filters, top_k)
+        return self._score_objects(project, resources, automated, filters, top_k)
+
+    def _score_objects(self, project: ProjectRequirement, resources: List[Resource], automated: bool,
+                       filters: Optional[Dict], top_k: Optional[int] = None) -> List[Dict]:
+        """Score resources one at a time (reference implementation of _score_columnar)."""
+        return self._rank_matches(project, resources, automated, filters, top_k)
+
+    def invalidate_resource_table(self) -> None:
+        """Force a rebuild of the columnar table after editing resources in place."""
+        self._resource_table = None
+
+    def _get_resource_table(self) -> ResourceTable:
+        """Return the columnar table, rebuilding it if resources were added or removed."""
+        key = [id(resource) for resource in self.resources.values()]
+        if self._resource_table is None or key != self._resource_table_key:
+            self._resource_table = ResourceTable(list(self.resources.values()), self)
+            self._resource_table_key = key
+        return self._resource_table
+
+    def _columnar_skill_match(self, table: ResourceTable, level: str, rows: np.ndarray,
+                              required_skills: List[str], recency: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized _calculate_skill_match over many resources."""
+        entries = table.skill_entries(level, rows, required_skills)
+        if not required_skills:
+            return np.zeros(len(rows)), entries
+
+        proficiency_score = table.proficiency[entries] / 5.0
+        experience_score = np.minimum(table.years[entries] / 5.0, 1.0)
+        skill_score = (
+            proficiency_score * 0.5 +
+            recency[entries] * 0.3 +
+            experience_score * 0.2
+        ) * 100
+
+        # Accumulate column by column to keep the per-object summation order
+        total_score = np.zeros(len(rows))
+        for col in range(len(required_skills)):
+            total_score = total_score + np.where(entries[:, col] > 0, skill_score[:, col], 0.0)
+        return total_score / len(required_skills), entries
+
+    def _columnar_skill_details(self, table: ResourceTable, required_skills: List[str],
+                                entries: List[int], recency: List[float]) -> Dict:
+        """Build the _calculate_skill_match details for one resource from its entry row."""
+        if not required_skills:
+            return {}
+
+        match_details = {
+            "matched_skills": [],
+            "missing_skills": [],
+            "proficiency_scores": [],
+            "recency_scores": [],
+            "experience_years": []
+        }
+        for req_skill, entry in zip(required_skills, entries):
+            if entry:
+                skill = table.entry_skills[entry]
+                match_details["matched_skills"].append(req_skill)
+                match_details["proficiency_scores"].append(skill.proficiency / 5.0 * 100)
+                match_details["recency_scores"].append(recency[entry] * 100)
+                match_details["experience_years"].append(skill.years_experience)
+            else:
+                match_details["missing_skills"].append(req_skill)
+        return match_details
+
+    def _score_columnar(self, project: ProjectRequirement, resources: List[Resource], automated: bool,
+                        filters: Optional[Dict], top_k: Optional[int] = None) -> List[Dict]:
+        """Score resources with array operations over the columnar resource table."""
+        table = self._get_resource_table()
+        rows = np.array([table.rows[id(resource)] for resource in resources], dtype=np.int64)
+
+        # Apply filters if provided
+        if filters and len(rows):
+            mask = np.ones(len(rows), dtype=bool)
+            if filters.get("location"):
+                mask &= table.location[rows] == filters["location"]
+            if filters.get("work_type"):
+                mask &= table.preferred_work_type[rows] == filters["work_type"]
+            if filters.get("min_experience"):
+                mask &= table.max_primary_years[rows] >= filters["min_experience"]
+            rows = rows[mask]
+        if not len(rows):
+            return []
+
+        recency = table.recency_scores(datetime.now())
+        primary_match, primary_entries = self._columnar_skill_match(
+            table, "primary", rows, project.required_primary_skills, recency)
+        secondary_match, secondary_entries = self._columnar_skill_match(
+            table, "secondary", rows, project.required_secondary_skills, recency)
+
+        if project.required_experience_level:
+            level_codes = table.experience_level_codes[rows]
+            level_scores = np.zeros(len(table.level_codes))
+            for level, code in table.level_codes.items():
+                if code in level_codes:
+                    level_scores[code] = self._experience_level_score(level, project.required_experience_level)
+            experience_match = level_scores[level_codes]
+        else:
+            experience_match = np.full(len(rows), 100.0)
+
+        if project.required_certifications:
+            required_certs = project.required_certifications
+            matched = (table.cert_columns(rows, required_certs) > 0).sum(axis=1)
+            certification_match = (matched / len(required_certs)) * 100
+            in_required = table.cert_columns(rows, list(dict.fromkeys(required_certs))).sum(axis=1)
+            has_additional = table.cert_totals[rows] - in_required > 0
+            certification_match = np.where(
+                has_additional, np.minimum(certification_match + 10.0, 100.0), certification_match)
+        else:
+            certification_match = np.full(len(rows), 100.0)
+
+        location_match = np.where(
+            table.preferred_location[rows] == project.location,
+            100.0,
+            80.0 if project.work_type == "REMOTE" else 0.0
+        )
+
+        preferred_work_type = table.preferred_work_type[rows]
+        similar_work_type = {"HYBRID": "ONSITE", "ONSITE": "HYBRID"}.get(project.work_type)
+        work_type_match = np.where(preferred_work_type == project.work_type, 100.0, 0.0)
+        if similar_work_type:
+            work_type_match = np.where(
+                (work_type_match == 0.0) & (preferred_work_type == similar_work_type), 75.0, work_type_match)
+
+        match_score = np.minimum(
+            primary_match * self.weights["primary_skills"] +
+            secondary_match * self.weights["secondary_skills"] +
+            experience_match * self.weights["experience"] +
+            location_match * self.weights["location"] +
+            work_type_match * self.weights["work_type"] +
+            certification_match * self.weights["certifications"],
+            100.0
+        )
+
+        # Same thresholds as _determine_match_rank
+        match_rank = np.select(
+            [
+                (primary_match >= 90.0) & (experience_match >= 80.0) & (secondary_match >= 70.0),
+                (primary_match >= 80.0) & (experience_match >= 70.0) & (secondary_match >= 60.0),
+                (primary_match >= 60.0) & (experience_match >= 50.0) & (secondary_match >= 40.0),
+                (primary_match >= 40.0) & (experience_match >= 30.0)
+            ],
+            [MatchRank.PERFECT.value, MatchRank.EXCELLENT.value, MatchRank.GOOD.value, MatchRank.MODERATE.value],
+            default=MatchRank.POOR.value
+        )
+
+        # Sort by rank and score (stable, like list.sort) and build payloads for the top_k only
+        order = np.lexsort((-match_score, match_rank))
+        if top_k is not None:
+            order = order[:top_k]
+
+        # Plain Python values are much cheaper to index while building payloads
+        recency = recency.tolist()
+        ranks = {rank.value: rank for rank in MatchRank}
+        columns = zip(
+            rows[order].tolist(), match_rank[order].tolist(), match_score[order].tolist(),
+            primary_match[order].tolist(), secondary_match[order].tolist(), experience_match[order].tolist(),
+            certification_match[order].tolist(), location_match[order].tolist(),
+            work_type_match[order].tolist(), primary_entries[order].tolist(), secondary_entries[order].tolist()
+        )
 
-            # Calculate various match scores
-            primary_match, primary_details = self._calculate_skill_match(
-                resource.primary_skills, project.required_primary_skills)
-            secondary_match, secondary_details = self._calculate_skill_match(
-                resource.secondary_skills, project.required_secondary_skills)
-            experience_match, experience_details = self._calculate_experience_match(resource, project)
-            certification_match, certification_details = self._calculate_certification_match(resource, project)
-            location_match = self._calculate_location_match(resource, project)
-            work_type_match = self._calculate_work_type_match(resource, project)
-
-            # Calculate overall match score using weights
-            match_score = (
-                primary_match * self.weights["primary_skills"] +
-                secondary_match * self.weights["secondary_skills"] +
-                experience_match * self.weights["experience"] +
-                location_match * self.weights["location"] +
-                work_type_match * self.weights["work_type"] +
-                certification_match * self.weights["certifications"]
-            )
-
-            # Ensure score doesn't exceed 100%
-            match_score = min(match_score, 100.0)
-
-            match_rank = self._determine_match_rank(primary_match, secondary_match, experience_match)
+        matches = []
+        for (row, rank_value, score, primary, secondary, experience, certification,
+             location, work_type, primary_row, secondary_row) in columns:
+            resource = table.resources[row]
+            rank = ranks[rank_value]
+            primary_details = self._columnar_skill_details(
+                table, project.required_primary_skills, primary_row, recency)
+            secondary_details = self._columnar_skill_details(
+                table, project.required_secondary_skills, secondary_row, recency)
+            if project.required_experience_level:
+                experience_details = {
+                    "required_level": project.required_experience_level.value,
+                    "resource_level": table.experience_levels[row].value,
+                    "weighted_experience": table.weighted_experience[row],
+                    "raw_experience": resource.total_years_experience
+                }
+            else:
+                experience_details = {"level": "Not specified"}
+            certification_details = self._calculate_certification_match(resource, project)[1]
 
             match_data = {
                 "resource_id": resource.id,
                 "resource_name": resource.name,
-                "match_rank": match_rank.name,
-                "match_score": match_score,
-                "primary_match": primary_match,
-                "secondary_match": secondary_match,
-                "experience_match": experience_match,
-                "certification_match": certification_match,
-                "location_match": location_match,
-                "work_type_match": work_type_match,
+                "match_rank": rank.name,
+                "match_score": score,
+                "primary_match": primary,
+                "secondary_match": secondary,
+                "experience_match": experience,
+                "certification_match": certification,
+                "location_match": location,
+                "work_type_match": work_type,
                 "skill_analysis": {
                     "primary": primary_details,
                     "secondary": secondary_details
@@ -380,15 +652,13 @@ class MatchingEngineV2:
             if not automated:
                 match_data.update({
                     "recommendation": self._generate_recommendation(
-                        match_rank, primary_details, secondary_details, 
+                        rank, primary_details, secondary_details,
                         experience_details, certification_details
                     )
                 })
 
             matches.append(match_data)
 
-        # Sort matches by rank and score
-        matches.sort(key=lambda x: (MatchRank[x["match_rank"]].value, -x["match_score"]))
         return matches
 
     def export_matches(self, project_id: str, output_format: OutputFormat = OutputFormat.JSON) -> str:
@@ -408,7 +678,10 @@ class MatchingEngineV2:
                 json.dump(matches, f, indent=2)
             return str(file_path)
 
-        elif output_format == OutputFormat.CSV:
+        # pandas and the plotting libraries are only needed for table and chart exports
+        import pandas as pd
+
+        if output_format == OutputFormat.CSV:
             df = pd.DataFrame(matches)
             df.to_csv(file_path, index=False)
             return str(file_path)
@@ -424,6 +697,9 @@ class MatchingEngineV2:
             return str(file_path)
 
         elif output_format == OutputFormat.VISUAL:
+            import matplotlib.pyplot as plt
+            import seaborn as sns
+
             df = pd.DataFrame(matches)
             
             # Create visualizations
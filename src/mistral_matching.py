@@ -12,6 +12,9 @@ from typing import Dict, List, Any, Optional, Tuple
 import json
 import os
 from .matching_engine import MatchingEngine
+from .document_embedding import ChunkedEmbedder, DocumentEmbedding, chunking_options, max_sim, pooled_store_version
+from .embedding_backend import encode_bucketed, store_version
+from .embedding_store import EmbeddingStore, get_embedding_store
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +33,7 @@ class MistralMatchingEngine(MatchingEngine):
         super().__init__(config, model_path, device, max_workers, cache_size)
         self.model_name = "mistralai/Magistral-Small-2506"
         self._load_mistral_model()
+        self._open_mistral_stores()
         
     def _load_mistral_model(self) -> None:
         """Load Mistral model and tokenizer."""
@@ -45,7 +49,7 @@ class MistralMatchingEngine(MatchingEngine):
             model_dir.mkdir(parents=True, exist_ok=True)
             
             # Load tokenizer and model
-            self.tokenizer = AutoTokenizer.from_pretrained(
+            self.mistral_tokenizer = AutoTokenizer.from_pretrained(
                 self.model_name,
                 cache_dir=str(model_dir),
                 local_files_only=False  # Allow remote download if not found locally
@@ -68,7 +72,7 @@ class MistralMatchingEngine(MatchingEngine):
         except Exception as e:
             logger.warning(f"Mistral model not found locally. Attempting to download. This might take some time depending on your network speed.")
             try:
-                self.tokenizer = AutoTokenizer.from_pretrained(
+                self.mistral_tokenizer = AutoTokenizer.from_pretrained(
                     self.model_name,
                     cache_dir=str(model_dir),
                     local_files_only=False # Re-attempt download
@@ -85,34 +89,76 @@ class MistralMatchingEngine(MatchingEngine):
                 logger.error(f"Error downloading Mistral model: {str(download_e)}")
                 raise # Re-raise original error if download also fails
             
-    def _generate_embeddings(self, text: str) -> np.ndarray:
-        """Generate embeddings using Mistral model."""
-        try:
-            # Tokenize input
-            inputs = self.tokenizer(
-                text,
-                return_tensors="pt",
-                padding=True,
-                truncation=True,
-                max_length=512
-            ).to(self.device)
-            
-            # Get model outputs
+    def _encode_chunks(self, texts: List[str]) -> np.ndarray:
+        """Mean-pooled Mistral embeddings for chunk texts, run in length-sorted batches."""
+        def forward(inputs: Dict[str, np.ndarray]) -> np.ndarray:
+            tensors = {
+                name: torch.from_numpy(value).to(self.device)
+                for name, value in inputs.items()
+                if name != 'token_type_ids'
+            }
             with torch.no_grad():
-                outputs = self.mistral_model(**inputs, output_hidden_states=True)
-                
-            # Use last hidden state as embedding
-            last_hidden = outputs.hidden_states[-1]
+                outputs = self.mistral_model(**tensors, output_hidden_states=True)
+            return outputs.hidden_states[-1].float().cpu().numpy()
             
-            # Mean pooling
-            attention_mask = inputs['attention_mask'].unsqueeze(-1)
-            embeddings = (last_hidden * attention_mask).sum(dim=1) / attention_mask.sum(dim=1)
+        return encode_bucketed(texts, self.mistral_tokenizer, forward, max_length=512, batch_size=8)
+        
+    def _open_mistral_stores(self) -> None:
+        """Open the embedding store for Mistral vectors and, when enabled, the chunked embedder."""
+        self.mistral_store: Optional[EmbeddingStore] = None
+        self.mistral_embedder: Optional[ChunkedEmbedder] = None
+        
+        # fp16 (GPU) and fp32 (CPU) vectors of the same text are kept apart
+        store_config = self.config.get('embedding_store', {})
+        version = store_version(
+            str(store_config.get('model_version', '1')),
+            'fp16' if self.device == 'cuda' else 'torch'
+        )
+        directory = store_config.get('path', str(Path(self.model_path) / 'embeddings'))
+        if store_config.get('enabled', True):
+            try:
+                self.mistral_store = get_embedding_store(self.model_name, model_version=version, directory=directory)
+            except Exception as e:
+                logger.warning(f"Mistral embedding store unavailable, embeddings are not persisted: {str(e)}")
+        
+        chunking_config = self.config.get('embedding_chunking', {})
+        if chunking_config.get('enabled', False):
+            options = chunking_options(chunking_config)
+            pooled_store = None
+            if self.mistral_store is not None:
+                pooled_store = get_embedding_store(
+                    self.model_name,
+                    model_version=pooled_store_version(version, options),
+                    directory=directory
+                )
+            self.mistral_embedder = ChunkedEmbedder(self._embed_texts, pooled_store, **options)
             
-            return embeddings.cpu().numpy()
+    def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Mistral embeddings for texts, encoding only the ones not yet stored."""
+        if self.mistral_store is not None:
+            return self.mistral_store.get_or_compute(texts, self._encode_chunks)
+        return self._encode_chunks(texts)
+        
+    def _generate_embeddings(self, texts: List[str]) -> List[DocumentEmbedding]:
+        """Generate Mistral document embeddings, chunked when embedding_chunking is enabled."""
+        try:
+            if self.mistral_embedder is not None:
+                return self.mistral_embedder.embed(texts)
+                
+            # One whole-document vector each, used as a single-chunk embedding
+            vectors = np.asarray(self._embed_texts(list(texts)), dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            vectors = vectors / norms
+            return [DocumentEmbedding(vector, vector[np.newaxis, :]) for vector in vectors]
             
         except Exception as e:
             logger.error(f"Error generating embeddings: {str(e)}")
-            return np.zeros((1, 4096))  # Return zero vector as fallback
+            # Zero vector as fallback
+            return [
+                DocumentEmbedding(np.zeros(4096, dtype=np.float32), np.zeros((0, 4096), dtype=np.float32))
+                for _ in texts
+            ]
             
     def match(self, job_description: str, candidate_profile: str) -> Dict[str, Any]:
         """Enhanced matching using Mistral AI."""
@@ -121,24 +167,21 @@ class MistralMatchingEngine(MatchingEngine):
             base_results = super().match(job_description, candidate_profile)
             
             # Generate Mistral embeddings
-            job_embedding = self._generate_embeddings(job_description)
-            profile_embedding = self._generate_embeddings(candidate_profile)
+            job_embedding, profile_embedding = self._generate_embeddings([job_description, candidate_profile])
             
-            # Calculate semantic similarity
-            similarity = np.dot(job_embedding, profile_embedding.T) / (
-                np.linalg.norm(job_embedding) * np.linalg.norm(profile_embedding)
-            )
+            # Score every job chunk against its best-matching profile chunk
+            similarity = max_sim(job_embedding, profile_embedding)
             
             # Enhance base results with Mistral insights
             enhanced_results = {
                 **base_results,
-                'mistral_score': float(similarity[0][0]),
-                'enhanced_score': (base_results['score'] + float(similarity[0][0])) / 2,
+                'mistral_score': float(similarity),
+                'enhanced_score': (base_results['score'] + float(similarity)) / 2,
                 'model_version': 'mistral-magistral-small-2506',
                 'processing_details': {
                     'model': self.model_name,
                     'device': self.device,
-                    'embedding_dim': job_embedding.shape[1]
+                    'embedding_dim': job_embedding.pooled.shape[0]
                 }
             }
             
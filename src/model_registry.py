@@ -0,0 +1,172 @@
+"""
+Model Registry for RME
+Process-wide registry that loads each model lazily on first use and shares one
+instance between every engine, recording how long each load took and how much
+resident memory it added.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import psutil
+except ImportError:  # psutil is optional; fall back to /proc on Linux
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+def process_rss() -> Optional[int]:
+    """Return the resident set size of this process in bytes, if it can be measured."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class ModelRegistry:
+    """
+    Lazily loaded, shared models keyed by name.
+
+    Loads are serialized by one lock so the RSS measured around a load is
+    attributable to that model; lookups of already loaded models do not take
+    the lock.
+    """
+
+    def __init__(self):
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._models
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Return the model for a key, calling loader on first use.
+
+        Args:
+            key: Registry key identifying the model and its settings
+            loader: Zero-argument callable that loads the model
+        """
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            if key in self._models:
+                return self._models[key]
+
+            rss_before = process_rss()
+            started = time.perf_counter()
+            try:
+                model = loader()
+            except Exception as e:
+                logger.error(f"Error loading model {key}: {str(e)}")
+                raise
+            load_seconds = time.perf_counter() - started
+            rss_after = process_rss()
+
+            self._models[key] = model
+            self._stats[key] = {
+                "load_seconds": round(load_seconds, 3),
+                "rss_delta_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+                "loaded_at": datetime.now(timezone.utc).isoformat()
+            }
+            logger.info(f"Loaded model {key} in {load_seconds:.2f}s")
+            return model
+
+    def unload(self, key: str) -> None:
+        """Drop a model so it is reloaded on next use."""
+        with self._lock:
+            self._models.pop(key, None)
+            self._stats.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-model load time and memory, plus the current process RSS."""
+        with self._lock:
+            return {
+                "process_rss_bytes": process_rss(),
+                "models": {key: dict(stats) for key, stats in self._stats.items()}
+            }
+
+
+_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide model registry."""
+    return _registry
+
+
+def default_device() -> str:
+    """Return "cuda" when a GPU is available, else "cpu"."""
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def get_sentence_transformer(
+    name: str = "all-MiniLM-L6-v2",
+    device: Optional[str] = None,
+    cache_folder: Optional[str] = None
+) -> Any:
+    """Return the shared SentenceTransformer for a model name and device."""
+    device = device or default_device()
+
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(name, device=device, cache_folder=cache_folder)
+
+    return _registry.get(f"sentence-transformer:{name}@{device}", load)
+
+
+def get_hf_tokenizer(name: str, cache_dir: Optional[str] = None) -> Any:
+    """Return the shared Hugging Face tokenizer for a model name."""
+    def load():
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(name, cache_dir=cache_dir)
+
+    return _registry.get(f"tokenizer:{name}", load)
+
+
+def get_hf_model(
+    name: str,
+    device: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    auto_class: str = "AutoModel"
+) -> Any:
+    """Return the shared Hugging Face model (loaded with transformers.<auto_class>) on a device."""
+    device = device or default_device()
+
+    def load():
+        import transformers
+        return getattr(transformers, auto_class).from_pretrained(name, cache_dir=cache_dir).to(device)
+
+    return _registry.get(f"{auto_class}:{name}@{device}", load)
+
+
+def get_hf_pipeline(task: str, model: str, device: Optional[str] = None) -> Any:
+    """Return the shared transformers pipeline for a task and model."""
+    device = device or default_device()
+
+    def load():
+        from transformers import pipeline
+        return pipeline(task, model=model, device=0 if device == "cuda" else -1)
+
+    return _registry.get(f"pipeline:{task}:{model}@{device}", load)
+
+
+def get_spacy_model(name: str = "en_core_web_sm") -> Any:
+    """Return the shared spaCy pipeline for a package name."""
+    def load():
+        import spacy
+        return spacy.load(name)
+
+    return _registry.get(f"spacy:{name}", load)
@@ -0,0 +1,150 @@
+"""
+Parse Cache for RME
+Content-addressed cache of extracted document text, so re-uploading or
+re-processing the same file skips PDF/DOCX parsing entirely.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+
+
+class ParseCache:
+    """
+    Two-tier cache mapping document content digests to extracted text.
+
+    Keys are SHA-256 digests of the parser version, the document format and
+    the raw file bytes, so a file overwritten at the same path never returns
+    stale text and a parser upgrade invalidates old entries. The memory tier
+    is an LRU bounded by the total size of the cached strings; the optional
+    disk tier is a SQLite database that persists across restarts and can be
+    shared by worker processes.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_BYTES, path: Optional[str] = None, version: str = "1"):
+        """
+        Initialize the parse cache.
+
+        Args:
+            max_bytes: Memory tier budget in bytes (0 disables the memory tier)
+            path: SQLite file for the disk tier; memory only if None
+            version: Parser version; part of every key
+        """
+        self.max_bytes = max_bytes
+        self.path = Path(path) if path else None
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._db: Optional[sqlite3.Connection] = None
+
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS parsed_documents ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def key(self, data, kind: str) -> str:
+        """Return the cache key for raw document bytes (any buffer) of a given format."""
+        digest = hashlib.sha256(f"{self.version}\0{kind}\0".encode('utf-8'))
+        digest.update(data)
+        return digest.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Total size of the strings held by the memory tier."""
+        return self._memory_bytes
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached text for a key, or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT content FROM parsed_documents WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._remember(key, row[0])
+                    self.hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, content: str) -> None:
+        """Store extracted text in both tiers."""
+        with self._lock:
+            self._remember(key, content)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO parsed_documents (key, content, created_at) VALUES (?, ?, ?)",
+                        (key, content, time.time())
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Could not write parse cache entry to {self.path}: {str(e)}")
+
+    def _remember(self, key: str, content: str) -> None:
+        """Insert into the memory tier, evicting least recently used entries over budget."""
+        size = sys.getsizeof(content)
+        if size > self.max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous[1]
+        self._memory[key] = (content, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_bytes:
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM parsed_documents")
+                self._db.commit()
+
+
+_caches: Dict[Tuple[int, Optional[str], str], ParseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_parse_cache(
+    max_bytes: int = DEFAULT_MEMORY_BYTES,
+    path: Optional[str] = None,
+    version: str = "1"
+) -> ParseCache:
+    """Return the process-wide parse cache for a configuration, creating it on first use."""
+    key = (max_bytes, str(Path(path).absolute()) if path else None, version)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = ParseCache(max_bytes, path, version)
+        return _caches[key]
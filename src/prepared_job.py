@@ -0,0 +1,107 @@
+"""
+Prepared Job Descriptions for RME
+Job-side matching artifacts (sections, skills, section embeddings and weights)
+computed once per requisition and reused for every resume matched against it.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PREPARED_JOB_FORMAT = 1
+
+
+def text_hash(text: str) -> str:
+    """Hash of a job description, used to notice edited requisitions."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def engine_fingerprint(settings: Dict[str, Any]) -> str:
+    """Short hash of the engine settings that prepared artifacts depend on."""
+    encoded = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+@dataclass
+class PreparedJob:
+    """
+    Everything MatchingEngine derives from a job description.
+
+    sections lists the weighted sections with text, in the row order of
+    embeddings (L2-normalized, one row per section) and weights.
+    """
+    description: str
+    sections: Dict[str, str]
+    section_names: List[str]
+    skills: List[str]
+    embeddings: np.ndarray
+    weights: np.ndarray
+    fingerprint: str
+    title: Optional[str] = None
+    description_hash: str = field(default="")
+
+    def __post_init__(self):
+        if not self.description_hash:
+            self.description_hash = text_hash(self.description)
+
+    @property
+    def skill_set(self) -> set:
+        """Normalized job skills as a set."""
+        return set(self.skills)
+
+    def is_current(self, description: str, fingerprint: str) -> bool:
+        """True if this was prepared from description by an engine with fingerprint."""
+        return self.fingerprint == fingerprint and self.description_hash == text_hash(description)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a JSON-compatible dict (e.g. for a JSON column)."""
+        embeddings = np.ascontiguousarray(self.embeddings, dtype=np.float32)
+        return {
+            "format": PREPARED_JOB_FORMAT,
+            "fingerprint": self.fingerprint,
+            "description_hash": self.description_hash,
+            "title": self.title,
+            "sections": self.sections,
+            "section_names": self.section_names,
+            "skills": self.skills,
+            "weights": [float(weight) for weight in self.weights],
+            "embeddings": {
+                "shape": list(embeddings.shape),
+                "data": base64.b64encode(embeddings.tobytes()).decode("ascii")
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], description: str) -> "PreparedJob":
+        """
+        Rebuild a prepared job from to_dict() output.
+
+        Args:
+            data: Serialized prepared job
+            description: The job description it was prepared from (not stored twice)
+
+        Returns:
+            The prepared job
+        """
+        if data.get("format") != PREPARED_JOB_FORMAT:
+            raise ValueError(f"Unsupported prepared job format: {data.get('format')}")
+        shape = tuple(data["embeddings"]["shape"])
+        embeddings = np.frombuffer(base64.b64decode(data["embeddings"]["data"]), dtype=np.float32).reshape(shape)
+        return cls(
+            description=description,
+            sections=data["sections"],
+            section_names=list(data["section_names"]),
+            skills=list(data["skills"]),
+            embeddings=embeddings,
+            weights=np.asarray(data["weights"], dtype=np.float32),
+            fingerprint=data["fingerprint"],
+            title=data.get("title"),
+            description_hash=data["description_hash"]
+        )
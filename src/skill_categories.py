@@ -1,6 +1,8 @@
-from typing import Dict, List, Set, Optional
+from typing import Dict, Iterable, List, Set, Optional
 from dataclasses import dataclass
 from enum import Enum
+import hashlib
+import json
 import yaml
 import os
 
@@ -38,14 +40,41 @@ class Skill:
         if self.aliases is None:
             self.aliases = []
 
+@dataclass
+class _IndexEntry:
+    """Case-folded values a skill was indexed under, kept so it can be unindexed."""
+    seq: int
+    category: SkillCategory
+    level: SkillLevel
+    tags: Set[str]
+    aliases: Set[str]
+    fields: List[str]
+    grams: Set[str]
+
 class SkillRegistry:
     """
     Registry for managing skills and their categories.
     Loads skills from a YAML file (skills.yaml) if present, for enterprise-grade, data-driven extensibility.
+
+    Skills are indexed on insert: case-folded name and alias maps, tag postings,
+    category/level buckets and a trigram index for search_skills. Postings are
+    insertion-ordered dicts, so results keep registry order (re-adding a skill
+    moves it to the end, as before).
     """
-    def __init__(self):
-        """Initialize the skill registry."""
-        self._skills: List[Skill] = []
+    NGRAM = 3
+
+    def __init__(self, skills: Optional[Iterable[Skill]] = None):
+        """
+        Initialize the skill registry.
+
+        Args:
+            skills: Skills to register instead of skills.yaml or the defaults
+        """
+        self._reset()
+        if skills is not None:
+            for skill in skills:
+                self.add_skill(skill)
+            return
         # Try to load YAML from project root
         yaml_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'skills.yaml'))
         if os.path.exists(yaml_path):
@@ -89,29 +118,109 @@ class SkillRegistry:
         self.add_skill(Skill("MLOps", SkillCategory.SPECIALIZED, SkillLevel.ADVANCED))
         self.add_skill(Skill("CUDA", SkillCategory.SPECIALIZED, SkillLevel.ADVANCED))
     
+    def _reset(self):
+        """Drop all skills and indexes."""
+        self._by_name: Dict[str, Skill] = {}
+        self._entries: Dict[str, _IndexEntry] = {}
+        self._by_alias: Dict[str, Dict[str, None]] = {}
+        self._by_tag: Dict[str, Dict[str, None]] = {}
+        self._by_category: Dict[SkillCategory, Dict[str, None]] = {}
+        self._by_level: Dict[SkillLevel, Dict[str, None]] = {}
+        self._by_gram: Dict[str, Dict[str, None]] = {}
+        self._next_seq = 0
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def _skills(self) -> List[Skill]:
+        """All skills in registry order."""
+        return list(self._by_name.values())
+
+    @_skills.setter
+    def _skills(self, skills: List[Skill]):
+        self._reset()
+        for skill in skills:
+            self.add_skill(skill)
+
+    @staticmethod
+    def _fold(text: str) -> str:
+        return text.casefold()
+
+    @classmethod
+    def _ngrams(cls, text: str) -> Set[str]:
+        return {text[i:i + cls.NGRAM] for i in range(len(text) - cls.NGRAM + 1)}
+
+    def _ordered(self, keys: Iterable[str]) -> List[Skill]:
+        """Return the skills for keys in registry order."""
+        return [self._by_name[key] for key in sorted(keys, key=lambda key: self._entries[key].seq)]
+
+    def _index(self, key: str, skill: Skill):
+        tags = {self._fold(t) for t in (skill.tags or [])}
+        aliases = {self._fold(a) for a in (skill.aliases or [])}
+        fields = [key] + ([self._fold(skill.description)] if skill.description else []) + sorted(tags) + sorted(aliases)
+        grams = set().union(*(self._ngrams(field) for field in fields))
+
+        self._entries[key] = _IndexEntry(self._next_seq, skill.category, skill.level, tags, aliases, fields, grams)
+        self._next_seq += 1
+        self._by_category.setdefault(skill.category, {})[key] = None
+        self._by_level.setdefault(skill.level, {})[key] = None
+        for tag in tags:
+            self._by_tag.setdefault(tag, {})[key] = None
+        for alias in aliases:
+            self._by_alias.setdefault(alias, {})[key] = None
+        for gram in grams:
+            self._by_gram.setdefault(gram, {})[key] = None
+
+    def _unindex(self, key: str):
+        entry = self._entries.pop(key)
+        for index, values in (
+            (self._by_category, [entry.category]),
+            (self._by_level, [entry.level]),
+            (self._by_tag, entry.tags),
+            (self._by_alias, entry.aliases),
+            (self._by_gram, entry.grams)
+        ):
+            for value in values:
+                postings = index[value]
+                del postings[key]
+                if not postings:
+                    del index[value]
+
     def add_skill(self, skill: Skill):
         """Add a skill to the registry, overwriting if it already exists by name (case-insensitive)."""
-        self._skills = [s for s in self._skills if s.name.lower() != skill.name.lower()]
-        self._skills.append(skill)
+        key = self._fold(skill.name)
+        if key in self._by_name:
+            self._unindex(key)
+            del self._by_name[key]
+        self._by_name[key] = skill
+        self._index(key, skill)
+        self._fingerprint = None
+
+    def fingerprint(self) -> str:
+        """Short hash of the registered skills; changes whenever add_skill changes the registry."""
+        if self._fingerprint is None:
+            payload = [
+                [s.name, s.category.value, s.level.value, s.description, sorted(s.tags or []), sorted(s.aliases or [])]
+                for s in self._skills
+            ]
+            encoded = json.dumps(payload).encode("utf-8")
+            self._fingerprint = hashlib.sha256(encoded).hexdigest()[:16]
+        return self._fingerprint
     
     def get_skill(self, name: str) -> Optional[Skill]:
         """Get a skill by name."""
-        for skill in self._skills:
-            if skill.name.lower() == name.lower():
-                return skill
-        return None
+        return self._by_name.get(self._fold(name))
     
     def get_skills_by_category(self, category: SkillCategory) -> List[Skill]:
         """Get all skills in a category."""
-        return [s for s in self._skills if s.category == category]
+        return [self._by_name[key] for key in self._by_category.get(category, {})]
     
     def get_skills_by_level(self, level: SkillLevel) -> List[Skill]:
         """Get all skills at a specific level."""
-        return [s for s in self._skills if s.level == level]
+        return [self._by_name[key] for key in self._by_level.get(level, {})]
     
     def get_all_skills(self) -> List[Skill]:
         """Get all skills in the registry."""
-        return self._skills.copy()
+        return self._skills
     
     def get_skill_gaps(self, required_skills: List[str], candidate_skills: List[str]) -> List[str]:
         """Get skills that are required but not present in candidate's skills."""
@@ -140,13 +249,11 @@ class SkillRegistry:
 
     def get_skills_by_tag(self, tag: str) -> List[Skill]:
         """Return all skills that have the given tag (case-insensitive)."""
-        tag_lower = tag.lower()
-        return [s for s in self._skills if any(t.lower() == tag_lower for t in (s.tags or []))]
+        return [self._by_name[key] for key in self._by_tag.get(self._fold(tag), {})]
 
     def get_skills_by_alias(self, alias: str) -> List[Skill]:
         """Return all skills that have the given alias (case-insensitive)."""
-        alias_lower = alias.lower()
-        return [s for s in self._skills if any(a.lower() == alias_lower for a in (s.aliases or []))]
+        return [self._by_name[key] for key in self._by_alias.get(self._fold(alias), {})]
 
     def get_skills_by_multiple_tags(self, tags: List[str], match_all: bool = False) -> List[Skill]:
         """
@@ -159,10 +266,12 @@ class SkillRegistry:
         Returns:
             List of matching skills
         """
-        tags_lower = [t.lower() for t in tags]
+        postings = [set(self._by_tag.get(self._fold(t), {})) for t in tags]
+        if not postings:
+            return self._skills if match_all else []
         if match_all:
-            return [s for s in self._skills if all(t in [tag.lower() for tag in (s.tags or [])] for t in tags_lower)]
-        return [s for s in self._skills if any(t in [tag.lower() for tag in (s.tags or [])] for t in tags_lower)]
+            return self._ordered(set.intersection(*postings))
+        return self._ordered(set.union(*postings))
 
     def get_skills_by_experience_range(self, min_years: float = 0.0, max_years: float = float('inf')) -> List[Skill]:
         """
@@ -200,13 +309,16 @@ class SkillRegistry:
         Returns:
             List of skills matching all specified criteria
         """
-        filtered_skills = self._skills.copy()
+        keys = None
         
         if categories:
-            filtered_skills = [s for s in filtered_skills if s.category in categories]
+            keys = set().union(*(self._by_category.get(c, {}) for c in categories))
         
         if levels:
-            filtered_skills = [s for s in filtered_skills if s.level in levels]
+            level_keys = set().union(*(self._by_level.get(l, {}) for l in levels))
+            keys = level_keys if keys is None else keys & level_keys
+        
+        filtered_skills = self._skills if keys is None else self._ordered(keys)
         
         if tags:
             filtered_skills = self.get_skills_by_multiple_tags(tags, match_all_tags)
@@ -225,28 +337,17 @@ class SkillRegistry:
         Returns:
             List of matching skills
         """
-        query_lower = query.lower()
-        results = []
-        
-        for skill in self._skills:
-            # Check name
-            if query_lower in skill.name.lower():
-                results.append(skill)
-                continue
-                
-            # Check description
-            if skill.description and query_lower in skill.description.lower():
-                results.append(skill)
-                continue
-                
-            # Check tags
-            if skill.tags and any(query_lower in tag.lower() for tag in skill.tags):
-                results.append(skill)
-                continue
-                
-            # Check aliases
-            if skill.aliases and any(query_lower in alias.lower() for alias in skill.aliases):
-                results.append(skill)
-                continue
-        
-        return results 
\ No newline at end of file
+        query = self._fold(query)
+        
+        # Every trigram of the query must occur in the skill; verify the substring after
+        if len(query) >= self.NGRAM:
+            postings = sorted((self._by_gram.get(gram, {}) for gram in self._ngrams(query)), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        else:
+            candidates = self._entries.keys()
+        
+        # Check name, description, tags and aliases
+        return self._ordered(
+            key for key in candidates
+            if any(query in field for field in self._entries[key].fields)
+        )
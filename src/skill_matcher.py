@@ -0,0 +1,130 @@
+"""
+Skill Matcher for RME
+Aho-Corasick automaton over skill names and aliases that finds every skill
+mention in one linear scan of the text, independent of dictionary size.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .skill_categories import SkillRegistry
+
+logger = logging.getLogger(__name__)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def _normalize(text: str) -> str:
+    """Lower-case and map every whitespace character to a space (length preserving)."""
+    return ''.join(' ' if char.isspace() else char for char in text.lower())
+
+
+class SkillMatcher:
+    """
+    Multi-pattern matcher mapping terms (names, aliases) to skill labels.
+
+    Terms are matched case-insensitively and only on word boundaries, i.e. not
+    preceded or followed by a letter, digit or underscore, so "C++" and "Node.js"
+    work as expected while "Java" does not match inside "JavaScript".
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, str]], registry: Optional[SkillRegistry] = None):
+        """
+        Build the automaton.
+
+        Args:
+            terms: (term, label) pairs; a term may map to several labels
+            registry: Registry the labels come from, if any
+        """
+        self.registry = registry
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]
+
+        for term, label in terms:
+            term = _normalize(term).strip()
+            if not term:
+                continue
+            node = 0
+            for char in term:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = next_node
+            if (len(term), label) not in self._out[node]:
+                self._out[node].append((len(term), label))
+
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        """Breadth-first construction of failure links and merged outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0) if node else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    @classmethod
+    def from_registry(cls, registry: SkillRegistry) -> "SkillMatcher":
+        """Build a matcher over every skill name and alias in a registry."""
+        terms = []
+        for skill in registry.get_all_skills():
+            terms.append((skill.name, skill.name))
+            terms.extend((alias, skill.name) for alias in skill.aliases or [])
+        matcher = cls(terms, registry)
+        logger.info(f"Built skill matcher with {len(terms)} terms ({len(matcher._goto)} states)")
+        return matcher
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Find every skill mention in the text.
+
+        Returns:
+            List of (start, end, label) in order of end offset; offsets index
+            the lower-cased text, which has the input's length for all but a
+            handful of non-ASCII characters
+        """
+        text = _normalize(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, label in out[node]:
+                start, end = i - length + 1, i + 1
+                if (start == 0 or not _is_word_char(text[start - 1])) and \
+                   (end == len(text) or not _is_word_char(text[end])):
+                    matches.append((start, end, label))
+        return matches
+
+    def extract(self, text: str) -> List[str]:
+        """Return the distinct skill labels mentioned in the text, in order of appearance."""
+        return list(dict.fromkeys(label for _, _, label in self.find_all(text)))
+
+
+_shared_matcher: Optional[SkillMatcher] = None
+_shared_lock = threading.Lock()
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """Return the process-wide matcher built from the default SkillRegistry."""
+    global _shared_matcher
+    with _shared_lock:
+        if _shared_matcher is None:
+            _shared_matcher = SkillMatcher.from_registry(SkillRegistry())
+        return _shared_matcher
@@ -0,0 +1,192 @@
+"""
+Skill Store for RME
+Skills of the resumes uploaded through the legacy web routes, normalized into
+a profile_skills(profile_id, skill_id) association in a SQLite database (WAL
+mode), so the top-skills widget is a GROUP BY over distinct skills instead of
+a pass over every resume metadata file.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "uploads/skills.sqlite"
+
+# Seconds a top-skills result is served from cache
+TOP_SKILLS_TTL = 30.0
+
+
+def skill_entries(skills: Optional[Iterable[Any]]) -> List[Dict[str, Any]]:
+    """
+    Normalize extracted skills to one entry per distinct name.
+
+    Args:
+        skills: Skill names, or dicts with a name and optional category/level
+            (as produced by app.core.matching.extract_skills)
+
+    Returns:
+        Entries with a whitespace-normalized name, first spelling wins
+    """
+    entries = {}
+    for skill in skills or []:
+        entry = dict(skill) if isinstance(skill, dict) else {"name": skill}
+        name = " ".join(str(entry.get("name") or "").split())
+        if name and name.lower() not in entries:
+            entries[name.lower()] = {**entry, "name": name}
+    return list(entries.values())
+
+
+def normalize_skills(skills: Optional[Iterable[Any]]) -> List[str]:
+    """Whitespace-normalized skill names (or {"name": ...} dicts), deduplicated case-insensitively."""
+    return [entry["name"] for entry in skill_entries(skills)]
+
+
+class SkillStore:
+    """
+    SQLite-backed skill index of legacy resumes.
+
+    Profiles are keyed by the stem of their resume file (the prefix of its
+    *_metadata.json file). Skill names are unique case-insensitively; the
+    first spelling seen is kept. Top-skills results are cached for a few
+    seconds and invalidated by every write in this process.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        """
+        Initialize the skill store.
+
+        Args:
+            path: SQLite database file (":memory:" for a private in-memory store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._top_skills_cache: Dict[int, Tuple[float, List[Dict[str, Any]]]] = {}
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS profiles (id INTEGER PRIMARY KEY, filename TEXT NOT NULL UNIQUE);"
+            "CREATE TABLE IF NOT EXISTS skills (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE COLLATE NOCASE);"
+            "CREATE TABLE IF NOT EXISTS profile_skills ("
+            "profile_id INTEGER NOT NULL REFERENCES profiles (id) ON DELETE CASCADE, "
+            "skill_id INTEGER NOT NULL REFERENCES skills (id) ON DELETE CASCADE, "
+            "PRIMARY KEY (profile_id, skill_id));"
+            "CREATE INDEX IF NOT EXISTS ix_profile_skills_skill_id ON profile_skills (skill_id, profile_id);"
+            "CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+        self._db.commit()
+
+    def _set_profile_skills(self, filename: str, skills: Iterable[Any]) -> int:
+        """Replace a profile's skills inside the caller's transaction."""
+        self._db.execute("INSERT OR IGNORE INTO profiles (filename) VALUES (?)", (filename,))
+        profile_id = self._db.execute("SELECT id FROM profiles WHERE filename = ?", (filename,)).fetchone()[0]
+        names = normalize_skills(skills)
+        self._db.execute("DELETE FROM profile_skills WHERE profile_id = ?", (profile_id,))
+        self._db.executemany("INSERT OR IGNORE INTO skills (name) VALUES (?)", [(name,) for name in names])
+        self._db.executemany(
+            "INSERT OR IGNORE INTO profile_skills (profile_id, skill_id) SELECT ?, id FROM skills WHERE name = ?",
+            [(profile_id, name) for name in names]
+        )
+        return profile_id
+
+    def set_profile_skills(self, filename: str, skills: Iterable[Any]) -> int:
+        """
+        Replace the skills of a resume, creating its profile if needed.
+
+        Args:
+            filename: Resume file stem identifying the profile
+            skills: Extracted skill names
+
+        Returns:
+            The profile id
+        """
+        with self._lock, self._db:
+            profile_id = self._set_profile_skills(filename, skills)
+            self._top_skills_cache.clear()
+        return profile_id
+
+    def top_skills(self, limit: int = 10, ttl: float = TOP_SKILLS_TTL) -> List[Dict[str, Any]]:
+        """
+        Most common skills across profiles.
+
+        Args:
+            limit: Number of skills to return
+            ttl: Seconds a cached result stays valid
+
+        Returns:
+            [{"name", "count"}] by descending count, then name
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._top_skills_cache.get(limit)
+            if cached is not None and now - cached[0] < ttl:
+                return cached[1]
+            rows = self._db.execute(
+                "SELECT skills.name, COUNT(*) AS profiles FROM profile_skills "
+                "JOIN skills ON skills.id = profile_skills.skill_id "
+                "GROUP BY profile_skills.skill_id ORDER BY profiles DESC, skills.name LIMIT ?",
+                (limit,)
+            ).fetchall()
+            skills = [{"name": name, "count": count} for name, count in rows]
+            self._top_skills_cache[limit] = (now, skills)
+        return skills
+
+    def import_metadata_files(self, directory: str) -> int:
+        """
+        Import resume *_metadata.json files written before the store existed.
+
+        Runs once per directory: later calls return 0 without reading the files.
+
+        Args:
+            directory: Directory holding the metadata files
+
+        Returns:
+            Number of profiles imported
+        """
+        marker = f"metadata_import:{Path(directory).absolute()}"
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM store_meta WHERE key = ?", (marker,)).fetchone():
+                return 0
+
+        profiles = []
+        for metadata_file in sorted(Path(directory).glob("*_metadata.json")):
+            try:
+                metadata = json.loads(metadata_file.read_text())
+                profiles.append((metadata_file.name[:-len("_metadata.json")], metadata.get("skills", [])))
+            except Exception as e:
+                logger.error(f"Error importing {metadata_file}: {str(e)}")
+
+        with self._lock, self._db:
+            for filename, skills in profiles:
+                self._set_profile_skills(filename, skills)
+            self._db.execute("INSERT INTO store_meta (key, value) VALUES (?, ?)", (marker, str(len(profiles))))
+            self._top_skills_cache.clear()
+        if profiles:
+            logger.info(f"Imported skills of {len(profiles)} resumes from {directory}")
+        return len(profiles)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+
+_stores: Dict[str, SkillStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_skill_store(path: str = DEFAULT_PATH) -> SkillStore:
+    """Return the process-wide skill store for a database file, creating it on first use."""
+    key = str(Path(path).absolute())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = SkillStore(path)
+        return _stores[key]
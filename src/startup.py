@@ -0,0 +1,161 @@
+"""
+Startup Helpers for RME
+Background model warm-up, so the web app can serve /health while models load,
+and an import-time profiler that reports what each module costs to import.
+
+Usage:
+    python -m src.startup main_standalone app.main --top 25
+"""
+
+import argparse
+import logging
+import re
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+class ModelWarmup:
+    """
+    Loads models on a background thread and records the state of each one.
+
+    Requests that need a model before it is warm simply load it themselves
+    through the shared model registry; warm-up only moves that cost off the
+    first request.
+    """
+
+    def __init__(self, loaders: Dict[str, Callable[[], Any]]):
+        """
+        Initialize the warm-up.
+
+        Args:
+            loaders: Zero-argument callables keyed by a display name
+        """
+        self.loaders = loaders
+        self.state: Dict[str, str] = {name: "pending" for name in loaders}
+        self.seconds: Dict[str, float] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ModelWarmup":
+        """Start warming models on a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="model-warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        for name, loader in self.loaders.items():
+            self.state[name] = "loading"
+            started = time.perf_counter()
+            try:
+                loader()
+                self.state[name] = "ready"
+            except Exception as e:
+                logger.error(f"Error warming model {name}: {str(e)}")
+                self.state[name] = "failed"
+            self.seconds[name] = round(time.perf_counter() - started, 3)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for warm-up to finish."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def ready(self) -> bool:
+        """True once every model has loaded."""
+        return all(state == "ready" for state in self.state.values())
+
+    def status(self) -> Dict[str, Any]:
+        """Return the warm-up state and load time of each model."""
+        return {
+            "ready": self.ready,
+            "models": {
+                name: {"state": state, "seconds": self.seconds.get(name)}
+                for name, state in self.state.items()
+            }
+        }
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    Parse the stderr of ``python -X importtime``.
+
+    Returns:
+        One entry per imported module with self and cumulative time in
+        milliseconds and its nesting depth, in import order
+    """
+    entries = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append({
+                "module": module,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2
+            })
+    return entries
+
+
+def profile_imports(module: str, python: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Import a module in a fresh interpreter and measure what each import costs.
+
+    Args:
+        module: Dotted module name, e.g. "main_standalone"
+        python: Interpreter to run (defaults to the current one)
+
+    Returns:
+        Wall-clock seconds for the import and the parsed per-module timings
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    seconds = time.perf_counter() - started
+    entries = parse_importtime(completed.stderr)
+    error = None
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "import failed"
+    return {"module": module, "seconds": round(seconds, 3), "modules": entries, "error": error}
+
+
+def format_profile(profile: Dict[str, Any], top: int = 20) -> str:
+    """Format a profile as a table of the most expensive modules."""
+    lines = [f"{profile['module']}: {profile['seconds']:.2f}s wall clock"]
+    if profile["error"]:
+        lines.append(f"  import failed: {profile['error']}")
+    entries = sorted(profile["modules"], key=lambda entry: entry["cumulative_ms"], reverse=True)
+    lines.append(f"  {'cumulative ms':>13}  {'self ms':>9}  module")
+    for entry in entries[:top]:
+        lines.append(f"  {entry['cumulative_ms']:>13.1f}  {entry['self_ms']:>9.1f}  {entry['module']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Profile the import cost of one or more modules."""
+    parser = argparse.ArgumentParser(description="Report the import cost of each module")
+    parser.add_argument("modules", nargs="+", help="Modules to import, e.g. main_standalone app.main")
+    parser.add_argument("--top", type=int, default=20, help="Number of most expensive modules to list")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        profile = profile_imports(module)
+        print(format_profile(profile, args.top))
+        print()
+        failed = failed or profile["error"] is not None
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from src import candidate_index
+from src.candidate_index import CandidateIndex
+
+BACKENDS = [(False, "flat")]
+if candidate_index.faiss is not None:
+    BACKENDS += [(True, "flat"), (True, "hnsw")]
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((50, 16)).astype(np.float32)
+
+@pytest.mark.parametrize("use_faiss,index_type", BACKENDS)
+def test_search_returns_nearest_first(vectors, use_faiss, index_type):
+    index = CandidateIndex(16, index_type=index_type, use_faiss=use_faiss)
+    index.add([f"p{i}" for i in range(50)], vectors)
+    results = index.search(vectors[7], 5)
+    assert len(results) == 5
+    assert results[0][0] == "p7"
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+@pytest.mark.parametrize("use_faiss,index_type", BACKENDS)
+def test_remove_and_replace(vectors, use_faiss, index_type):
+    index = CandidateIndex(16, index_type=index_type, use_faiss=use_faiss)
+    index.add([f"p{i}" for i in range(50)], vectors)
+    index.remove(["p7"])
+    assert "p7" not in index
+    assert len(index) == 49
+    assert "p7" not in [candidate_id for candidate_id, _ in index.search(vectors[7], 10)]
+
+    index.add(["p3"], vectors[7:8])
+    assert len(index) == 49
+    assert index.search(vectors[7], 1)[0][0] == "p3"
+
+@pytest.mark.skipif(candidate_index.faiss is None, reason="faiss is not installed")
+def test_hnsw_tombstones_are_compacted(vectors):
+    index = CandidateIndex(16, index_type="hnsw", use_faiss=True)
+    index.add([f"p{i}" for i in range(50)], vectors)
+    for i in range(40):
+        index.remove([f"p{i}"])
+        assert len(index._deleted) <= candidate_index.COMPACT_FRACTION * index._index.ntotal
+    assert index._index.ntotal < 50
+    assert index.ids() == {f"p{i}" for i in range(40, 50)}
+    assert index.search(vectors[45], 1)[0][0] == "p45"
+    assert len(index.search(vectors[0], 20)) == 10
+
+def test_rejects_wrong_dimension():
+    index = CandidateIndex(16, use_faiss=False)
+    with pytest.raises(ValueError):
+        index.add(["p0"], np.zeros((1, 8)))
@@ -0,0 +1,122 @@
+import asyncio
+import importlib.util
+from datetime import datetime, timedelta
+from pathlib import Path
+import pytest
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.models.database import Base, DashboardStat, Match
+from app.core import dashboard_stats
+from app.core.matches import upsert_matches
+from app.routes import web
+
+MIGRATION = Path(__file__).parents[2] / "alembic" / "versions" / "dashboard_stats.py"
+TODAY = datetime.utcnow().replace(hour=12)
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(
+        Match(profile_id=i, job_id=i % 2 + 1, score=0.1 * i, status="pending", created_at=TODAY - timedelta(days=i % 3))
+        for i in range(1, 10)
+    )
+    session.commit()
+    yield session
+    session.close()
+
+def rollup(db):
+    return {
+        (row.day, row.job_id, row.status): (row.match_count, round(row.score_sum, 6))
+        for row in db.query(DashboardStat) if row.match_count
+    }
+
+def test_triggers_follow_every_kind_of_write(db):
+    upsert_matches(db, [
+        {"profile_id": 1, "job_id": 2, "score": 0.9, "analysis": {}, "created_at": TODAY},
+        {"profile_id": 20, "job_id": 1, "score": 0.5, "analysis": {}, "created_at": TODAY}
+    ])
+    db.execute(update(Match).where(Match.profile_id == 2).values(status="reviewed"))
+    db.delete(db.query(Match).filter(Match.profile_id == 3).one())
+    db.commit()
+
+    before = rollup(db)
+    assert dashboard_stats.reconcile(db) == 0
+    assert rollup(db) == before
+    assert dashboard_stats.totals(db)["total_matches"] == db.query(Match).count() == 9
+    assert dashboard_stats.status_totals(db)["reviewed"][0] == 1
+
+def test_reconcile_repairs_drift(db):
+    expected = rollup(db)
+    rows = db.query(DashboardStat).order_by(DashboardStat.day).all()
+    rows[0].match_count += 5
+    db.delete(rows[1])
+    db.add(DashboardStat(day="2001-01-01", job_id=7, status="pending", match_count=3, score_sum=1.0))
+    db.commit()
+
+    assert dashboard_stats.reconcile(db) == 3
+    assert rollup(db) == expected
+
+def test_dashboard_endpoints_read_only_the_rollup(db):
+    statements = []
+    engine = db.get_bind()
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    activity = asyncio.run(web.get_dashboard_activity(db=db))
+    stats = asyncio.run(web.get_dashboard_stats(db=db))
+    event.remove(engine, "before_cursor_execute", record)
+
+    assert sum(activity["data"]) == 9
+    assert activity["labels"] == sorted(activity["labels"])
+    assert stats["totalMatches"] == 9
+    assert stats["averageScore"] == pytest.approx(0.5, abs=0.01)
+    assert not any(" matches" in statement for statement in statements)
+
+def test_migration_backfills_existing_matches(db):
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+    spec = importlib.util.spec_from_file_location("dashboard_stats_migration", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    expected = rollup(db)
+    connection = db.connection()
+    with Operations.context(MigrationContext.configure(connection)):
+        migration.downgrade()
+        db.add(Match(profile_id=50, job_id=1, score=0.25, created_at=TODAY))
+        db.flush()
+        migration.upgrade()
+    key = (TODAY.date().isoformat(), 1, "pending")
+    assert rollup(db)[key] == (expected[key][0] + 1, round(expected[key][1] + 0.25, 6))
+    db.add(Match(profile_id=51, job_id=1, score=0.5, created_at=TODAY))
+    db.flush()
+    assert rollup(db)[key][0] == expected[key][0] + 2
+
+def test_reconcile_blocks_writes_between_its_reads_and_commit(tmp_path):
+    url = f"sqlite:///{tmp_path / 'stats.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    writer = create_engine(url, connect_args={"timeout": 0.1})
+    db = sessionmaker(bind=engine)()
+    db.add(Match(profile_id=1, job_id=1, score=0.5, created_at=TODAY))
+    db.commit()
+
+    blocked = []
+    def write_between_reads(conn, cursor, statement, *args):
+        if statement.startswith("SELECT") and "FROM dashboard_stats" in statement:
+            try:
+                with writer.begin() as connection:
+                    connection.execute(Match.__table__.insert().values(profile_id=2, job_id=1, score=0.5, created_at=TODAY))
+            except OperationalError:
+                blocked.append(statement)
+    event.listen(engine, "before_cursor_execute", write_between_reads)
+    try:
+        dashboard_stats.reconcile(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", write_between_reads)
+
+    assert blocked
+    assert dashboard_stats.reconcile(db) == 0
+    db.close()
@@ -0,0 +1,69 @@
+import asyncio
+import numpy as np
+import pytest
+from src.document_embedding import ChunkedEmbedder, DocumentEmbedding, max_sim, split_chunks
+from src.embedding_store import EmbeddingStore
+
+def words(prefix, count):
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+class KeywordEncoder:
+    """Encodes a text by which topic words it contains, recording each call."""
+    TOPICS = ["python", "java", "kubernetes", "sales"]
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[float(topic in text) for topic in self.TOPICS] + [0.1] for text in texts])
+
+def test_short_text_is_one_chunk():
+    assert split_chunks("Skills: Python\n\nExperience: 5 years") == ["Skills: Python Experience: 5 years"]
+
+def test_long_text_is_split_into_overlapping_windows():
+    text = "\n\n".join([words("a", 120), words("b", 120), words("c", 400)])
+    chunks = split_chunks(text, chunk_words=100, overlap_words=20)
+    assert all(len(chunk.split()) <= 100 for chunk in chunks)
+    assert chunks[0].split()[-20:] == chunks[1].split()[:20]
+    assert {word for chunk in chunks for word in chunk.split()} == set(text.split())
+
+def test_max_chunks_caps_the_document():
+    assert len(split_chunks(words("w", 1000), chunk_words=50, overlap_words=0, max_chunks=4)) == 4
+
+def test_all_chunks_are_encoded_in_one_batch():
+    encoder = KeywordEncoder()
+    embedder = ChunkedEmbedder(encoder, chunk_words=50, overlap_words=10)
+    resume = "\n\n".join([words("x", 60) + " java", words("y", 60), words("z", 40) + " python kubernetes"])
+    job, profile = embedder.embed(["python kubernetes", resume])
+
+    assert len(encoder.calls) == 1
+    assert len(profile.chunks) > 1
+    assert np.isclose(np.linalg.norm(profile.pooled), 1.0)
+    # The requirement matches the last chunk of the resume exactly
+    assert max_sim(job, profile) == pytest.approx(1.0)
+    assert max_sim(job, profile) > float(job.pooled @ profile.pooled)
+
+def test_async_embedding_matches_sync():
+    encoder = KeywordEncoder()
+    embedder = ChunkedEmbedder(encoder, chunk_words=50, overlap_words=10)
+    async def encode_async(texts):
+        return encoder(texts)
+    text = "\n\n".join([words("x", 60) + " sales", words("y", 60)])
+    [sync] = embedder.embed([text])
+    [async_result] = asyncio.run(embedder.embed_async([text], encode_async))
+    assert np.allclose(sync.chunks, async_result.chunks)
+
+def test_pooled_vectors_are_read_from_the_store(tmp_path):
+    encoder = KeywordEncoder()
+    store = EmbeddingStore(str(tmp_path), model_version="pooled")
+    embedder = ChunkedEmbedder(encoder, store, chunk_words=50, overlap_words=10)
+    first = embedder.pooled(["python developer", words("w", 200)])
+    assert first.shape == (2, 5)
+    calls = len(encoder.calls)
+    assert np.allclose(embedder.pooled(["python developer", words("w", 200)]), first)
+    assert len(encoder.calls) == calls
+
+def test_empty_documents_score_zero():
+    empty = DocumentEmbedding(np.zeros(3), np.zeros((0, 3)))
+    assert max_sim(empty, empty) == 0.0
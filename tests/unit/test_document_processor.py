@@ -1,9 +1,12 @@
+import io
+import mmap
 import pytest
 from pathlib import Path
 import os
 import tempfile
 from datetime import datetime, UTC
 from src.document_processor import DocumentProcessor
+from src.parse_cache import ParseCache
 
 @pytest.fixture
 def document_processor():
@@ -276,4 +279,98 @@ def test_extract_from_txt_with_error(document_processor):
         with pytest.raises(Exception):
             document_processor._extract_from_txt(Path(f.name))
     finally:
-        os.unlink(f.name) 
\ No newline at end of file
+        os.unlink(f.name) 
+
+
+def test_section_spans_are_offsets_into_text(document_processor):
+    text = "Summary:\nBackend engineer with 5 years of experience\nRequired Skills: Python, SQL\n\nEDUCATION\nBSc Computer Science"
+    spans = document_processor.section_spans(text)
+    assert text[slice(*spans['summary'])] == "Backend engineer with 5 years of experience"
+    assert text[slice(*spans['skills'])] == "Python, SQL"
+    assert text[slice(*spans['education'])] == "BSc Computer Science"
+    assert 'experience' not in spans
+
+def test_section_patterns_are_configurable():
+    processor = DocumentProcessor(section_patterns={'projects': r'projects|portfolio'})
+    sections = processor.extract_sections("Portfolio:\n- Search engine\n\nSkills: Go")
+    assert sections == {'projects': "- Search engine"}
+
+def test_section_patterns_match_case_insensitively():
+    processor = DocumentProcessor(section_patterns={'experience': r'Work Experience|Employment'})
+    sections = processor.extract_sections("WORK EXPERIENCE:\nAcme, 2019-2024\n\nemployment:\nInitech")
+    assert sections == {'experience': "Acme, 2019-2024"}
+
+def test_section_patterns_are_read_from_config_once(monkeypatch):
+    import src.document_processor as document_processor
+    calls = []
+    def load_section_patterns(config_path=None):
+        calls.append(config_path)
+        return {'skills': r'skills'}
+    monkeypatch.setattr(document_processor, "load_section_patterns", load_section_patterns)
+    processor = DocumentProcessor()
+    assert len(calls) == 1
+    assert processor.extract_sections("Skills: Go") == {'skills': "Go"}
+
+def test_parallel_batch_matches_serial(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"resume_{i}.txt"
+        path.write_text(f"Skills: Python {i}\n\nEducation:\nBSc {i}")
+        paths.append(str(path))
+    paths.append(str(tmp_path / "missing.txt"))
+    serial = DocumentProcessor().process_batch(paths)
+    parallel = DocumentProcessor(max_workers=2).process_batch(paths, batch_size=3)
+    assert list(parallel) == list(serial) == paths[:6]
+    assert [r['content'] for r in parallel.values()] == [r['content'] for r in serial.values()]
+    assert [r['sections'] for r in parallel.values()] == [r['sections'] for r in serial.values()]
+
+@pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason="needs named pipes")
+def test_hung_parser_does_not_stall_batch(tmp_path):
+    hung = tmp_path / "hung.txt"
+    os.mkfifo(hung)  # opening a FIFO with no writer blocks forever
+    good = tmp_path / "good.txt"
+    good.write_text("Skills: Go")
+    processor = DocumentProcessor(max_workers=2, parse_timeout=1.0)
+    results = dict(processor.iter_process_batch([str(hung), str(good)]))
+    assert results[str(hung)] is None
+    assert results[str(good)]['content'] == "Skills: Go"
+
+@pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason="needs named pipes")
+def test_files_queued_behind_a_hung_parser_are_still_parsed(tmp_path):
+    hung = tmp_path / "hung.txt"
+    os.mkfifo(hung)
+    paths = [str(hung)]
+    for i in range(2):
+        path = tmp_path / f"good_{i}.txt"
+        path.write_text(f"Skills: Go {i}")
+        paths.append(str(path))
+    processor = DocumentProcessor(max_workers=1, parse_timeout=1.0)
+    results = dict(processor.iter_process_batch(paths, batch_size=3))
+    assert results[str(hung)] is None
+    assert [results[path]['content'] for path in paths[1:]] == ["Skills: Go 0", "Skills: Go 1"]
+
+def test_batch_results_warm_the_parent_parse_cache(tmp_path):
+    path = tmp_path / "resume.txt"
+    path.write_text("Skills: Rust")
+    cache = ParseCache()
+    processor = DocumentProcessor(max_workers=2, parse_cache=cache)
+    assert dict(processor.iter_process_batch([str(path)]))[str(path)]['content'] == "Skills: Rust"
+    assert cache.get(cache.key(path.read_bytes(), ".txt")) == "Skills: Rust"
+
+@pytest.mark.parametrize("sample", ["sample_text_file", "sample_docx_file", "sample_pdf_file"])
+def test_extract_text_from_memory_matches_file(document_processor, sample, request):
+    path = request.getfixturevalue(sample)
+    expected = document_processor.process_document(path)['content']
+    data = Path(path).read_bytes()
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        sources = [data, bytearray(data), memoryview(data), mapped, io.BytesIO(data)]
+        for source in sources:
+            assert document_processor.extract_text(source, path) == expected
+
+def test_process_bytes_from_stream(document_processor, sample_docx_file):
+    with open(sample_docx_file, 'rb') as f:
+        result = document_processor.process_bytes(f, "resume.docx")
+    assert "Python" in result['content']
+    assert result['metadata']['filename'] == "resume.docx"
+    assert result['metadata']['file_size'] == os.path.getsize(sample_docx_file)
+    assert DocumentProcessor(max_file_size=10).process_bytes(io.BytesIO(b"x" * 11), "a.txt") is None
@@ -0,0 +1,109 @@
+import json
+import numpy as np
+import pytest
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+from src import embedding_backend
+from src.embedding_backend import (
+    PARITY_TEXTS, QuantizedTorchBackend, TorchBackend, bucket_batches, check_parity, encode_bucketed,
+    load_embedding_backend, mean_pool, torch_forward
+)
+from src.model_registry import get_model_registry
+
+WORDS = sorted({word.strip(".,:;").lower() for text in PARITY_TEXTS for word in text.split()})
+
+@pytest.fixture(scope="module")
+def tokenizer(tmp_path_factory):
+    vocab = tmp_path_factory.mktemp("tokenizer") / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS))
+    return transformers.BertTokenizerFast(str(vocab))
+
+@pytest.fixture(scope="module")
+def model(tokenizer):
+    torch.manual_seed(0)
+    config = transformers.BertConfig(
+        vocab_size=tokenizer.vocab_size, hidden_size=64, num_hidden_layers=2,
+        num_attention_heads=4, intermediate_size=128
+    )
+    return transformers.BertModel(config).eval()
+
+@pytest.fixture
+def fake_hub(monkeypatch, tokenizer, model):
+    calls = []
+    def get_model(name, device=None, cache_dir=None):
+        calls.append(name)
+        return model
+    monkeypatch.setattr(embedding_backend, "get_hf_tokenizer", lambda name, cache_dir=None: tokenizer)
+    monkeypatch.setattr(embedding_backend, "get_hf_model", get_model)
+    yield calls
+    registry = get_model_registry()
+    for key in [key for key in registry.stats()["models"] if key.startswith("embedding-backend:")]:
+        registry.unload(key)
+
+def test_mean_pool_ignores_padding():
+    tokens = np.array([[[1.0, 3.0], [3.0, 5.0], [100.0, 100.0]]])
+    pooled = mean_pool(tokens, np.array([[1, 1, 0]]), normalize=False)
+    assert pooled.tolist() == [[2.0, 4.0]]
+    assert np.isclose(np.linalg.norm(mean_pool(tokens, np.array([[1, 1, 0]]))), 1.0)
+
+def test_bucket_batches_group_similar_lengths():
+    lengths = [5, 40, 7, 38, 6, 39]
+    assert bucket_batches(lengths, batch_size=3) == [[1, 5, 3], [2, 4, 0]]
+    assert bucket_batches(lengths, batch_size=3, max_tokens=80) == [[1, 5], [3, 2], [4, 0]]
+
+def test_bucketed_encoding_keeps_order_and_matches_unpadded(tokenizer, model):
+    forward = torch_forward(model)
+    calls = []
+    def counting_forward(inputs):
+        calls.append(inputs["input_ids"].shape)
+        return forward(inputs)
+
+    texts = PARITY_TEXTS * 3
+    embeddings = encode_bucketed(texts, tokenizer, counting_forward, batch_size=8)
+    assert len(calls) == 3
+    for text, embedding in zip(texts, embeddings):
+        expected = encode_bucketed([text], tokenizer, forward)[0]
+        assert np.allclose(embedding, expected, atol=1e-5)
+
+def test_encode_matches_sentence_transformer_shapes(tokenizer, model):
+    backend = TorchBackend(tokenizer, model)
+    assert backend.encode(PARITY_TEXTS, batch_size=3).shape == (len(PARITY_TEXTS), 64)
+    assert backend.encode("react").shape == (64,)
+
+def test_quantized_backend_round_trips_and_passes_parity(tmp_path, tokenizer, model):
+    reference = TorchBackend(tokenizer, model)
+    quantized = QuantizedTorchBackend(tokenizer, QuantizedTorchBackend.quantize(model))
+    assert check_parity(quantized, reference)["passed"]
+
+    quantized.save(tmp_path)
+    reloaded = QuantizedTorchBackend.load(tmp_path)
+    assert np.array_equal(reloaded.encode(PARITY_TEXTS), quantized.encode(PARITY_TEXTS))
+
+def test_exported_backend_is_cached_with_its_parity_report(tmp_path, fake_hub):
+    backend = load_embedding_backend("tiny-bert", "torch-int8", device="cpu", cache_dir=str(tmp_path))
+    assert isinstance(backend, QuantizedTorchBackend)
+    [parity_file] = tmp_path.glob("tiny-bert/torch-int8-256-norm/parity.json")
+    assert json.loads(parity_file.read_text())["passed"]
+
+    get_model_registry().unload("embedding-backend:torch-int8:tiny-bert:256:1@cpu")
+    fake_hub.clear()
+    reloaded = load_embedding_backend("tiny-bert", "torch-int8", device="cpu", cache_dir=str(tmp_path))
+    assert isinstance(reloaded, QuantizedTorchBackend)
+    assert fake_hub == []
+
+def test_failed_parity_falls_back_to_fp32(tmp_path, fake_hub, monkeypatch):
+    backend = load_embedding_backend(
+        "tiny-bert-strict", "torch-int8", device="cpu", cache_dir=str(tmp_path), parity_threshold=1.01
+    )
+    assert type(backend) is TorchBackend
+
+    # The cached failure is honoured: no export or parity check on the next start
+    get_model_registry().unload("embedding-backend:torch-int8:tiny-bert-strict:256:1@cpu")
+    checks = []
+    monkeypatch.setattr(embedding_backend, "check_parity", lambda *args, **kwargs: checks.append(args))
+    reloaded = load_embedding_backend(
+        "tiny-bert-strict", "torch-int8", device="cpu", cache_dir=str(tmp_path), parity_threshold=1.01
+    )
+    assert type(reloaded) is TorchBackend
+    assert reloaded.name == "torch"
+    assert checks == []
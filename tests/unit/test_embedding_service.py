@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+import numpy as np
+import pytest
+from src.embedding_service import EmbeddingService, get_embedding_service
+
+class SlowEncoder:
+    """Encoder that records batch sizes and takes a while per call."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.batches = []
+
+    def encode(self, texts, convert_to_numpy=True):
+        self.batches.append(len(texts))
+        time.sleep(self.delay)
+        return np.array([[len(text), text.count("a")] for text in texts], dtype=np.float32)
+
+@pytest.fixture
+def encoder():
+    return SlowEncoder()
+
+@pytest.fixture
+def service(encoder):
+    service = EmbeddingService(encoder.encode, max_batch_size=16, max_wait_ms=20)
+    yield service
+    service.close()
+
+def test_concurrent_requests_are_coalesced(service, encoder):
+    texts = [f"text {'a' * i}" for i in range(40)]
+    results = {}
+    def call(i):
+        results[i] = service.encode([texts[i]])
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for i, text in enumerate(texts):
+        assert results[i].tolist() == [[len(text), text.count("a")]]
+    assert sum(encoder.batches) == 40
+    assert len(encoder.batches) < 40
+    assert max(encoder.batches) <= 16
+
+    metrics = service.metrics()
+    assert metrics["requests"] == 40
+    assert metrics["batches"] == len(encoder.batches)
+    assert metrics["batch_size"]["max"] == max(encoder.batches)
+    assert sum(metrics["batch_size"]["histogram"].values()) == metrics["batches"]
+    assert metrics["queue_wait_ms"]["max"] >= metrics["queue_wait_ms"]["p50"] >= 0
+
+def test_duplicate_texts_are_encoded_once(service, encoder):
+    result = service.encode(["same", "other", "same"])
+    assert encoder.batches == [2]
+    assert result[0].tolist() == result[2].tolist()
+
+def test_async_callers_share_batches(service, encoder):
+    async def run():
+        return await asyncio.gather(*(service.encode_async([f"job {i}"]) for i in range(8)))
+    results = asyncio.run(run())
+    assert [r.shape for r in results] == [(1, 2)] * 8
+    assert len(encoder.batches) < 8
+
+def test_encode_errors_reach_every_caller():
+    def fail(texts):
+        raise RuntimeError("model crashed")
+    service = EmbeddingService(fail)
+    with pytest.raises(RuntimeError, match="model crashed"):
+        service.encode(["a"])
+    service.close()
+
+def test_failing_request_does_not_fail_its_batch(encoder):
+    blocked, release = threading.Event(), threading.Event()
+    calls = []
+    def encode(texts):
+        calls.append(texts)
+        if "block" in texts:
+            blocked.set()
+            release.wait()
+        if "bad" in texts:
+            raise ValueError("bad input")
+        return encoder.encode(texts)
+    service = EmbeddingService(encode, max_batch_size=16, max_wait_ms=50)
+    blocker = service.submit(["block"])
+    blocked.wait()
+    futures = [service.submit([text]) for text in ("good", "bad", "also good")]
+    release.set()
+
+    assert blocker.result().shape == (1, 2)
+    assert futures[0].result().tolist() == [[4.0, 0.0]]
+    with pytest.raises(ValueError, match="bad input"):
+        futures[1].result()
+    assert futures[2].result().tolist() == [[9.0, 1.0]]
+    assert calls == [["block"], ["good", "bad", "also good"], ["good"], ["bad"], ["also good"]]
+    service.close()
+
+def test_service_is_shared_per_model(encoder):
+    assert get_embedding_service(encoder) is get_embedding_service(encoder)
+    assert get_embedding_service(encoder) is not get_embedding_service(SlowEncoder())
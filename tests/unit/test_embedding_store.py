@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from src.embedding_store import EmbeddingStore, get_embedding_store, model_directory_version
+
+def test_key_is_stable_and_normalized(tmp_path):
+    store = EmbeddingStore(str(tmp_path), model_name="model-a")
+    assert store.key("Python  developer\n") == store.key(" Python developer")
+    assert store.key("Python") == EmbeddingStore(str(tmp_path / "other"), model_name="model-a").key("Python")
+    assert store.key("Python") != EmbeddingStore(str(tmp_path), model_name="model-b").key("Python")
+    assert store.key("Python") != EmbeddingStore(str(tmp_path), model_name="model-a", model_version="2").key("Python")
+
+def test_put_and_get(tmp_path):
+    store = EmbeddingStore(str(tmp_path), dim=4)
+    store.put("python", np.array([1, 2, 3, 4]))
+    assert "python" in store
+    assert np.allclose(store.get("python"), [1, 2, 3, 4])
+    assert store.get("java") is None
+
+def test_persists_across_reopen(tmp_path):
+    store = EmbeddingStore(str(tmp_path), initial_capacity=2)
+    vectors = np.random.rand(5, 8).astype(np.float32)
+    store.put_many([f"text {i}" for i in range(5)], vectors)
+    reopened = EmbeddingStore(str(tmp_path))
+    assert len(reopened) == 5
+    assert reopened.dim == 8
+    assert np.allclose(reopened.get("text 3"), vectors[3])
+
+def test_get_or_compute_only_encodes_missing(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return np.array([[len(t), 1.0] for t in texts])
+
+    first = store.get_or_compute(["a", "bb", "a"], encode)
+    second = store.get_or_compute(["bb", "ccc"], encode)
+    assert calls == [["a", "bb"], ["ccc"]]
+    assert first.shape == (3, 2)
+    assert np.allclose(second[:, 0], [2, 3])
+
+def test_dimension_mismatch_raises(tmp_path):
+    store = EmbeddingStore(str(tmp_path), dim=4)
+    with pytest.raises(ValueError):
+        store.put("python", np.zeros(3))
+
+def test_get_embedding_store_is_shared(tmp_path):
+    assert get_embedding_store("m", directory=str(tmp_path)) is get_embedding_store("m", directory=str(tmp_path))
+
+def test_instances_sharing_a_directory_never_overwrite_rows(tmp_path):
+    # Two instances stand in for two processes opening the same store
+    first = EmbeddingStore(str(tmp_path), initial_capacity=2)
+    second = EmbeddingStore(str(tmp_path), initial_capacity=2)
+    first.put("alpha", np.array([1.0, 0.0]))
+    second.put("beta", np.array([0.0, 1.0]))
+    first.put_many([f"text {i}" for i in range(4)], np.full((4, 2), 2.0))
+    assert np.allclose(first.get("beta"), [0.0, 1.0])
+
+    reader = EmbeddingStore(str(tmp_path))
+    assert len(reader) == 6
+    assert np.allclose(reader.get("alpha"), [1.0, 0.0])
+    assert np.allclose(reader.get("beta"), [0.0, 1.0])
+    assert np.allclose(reader.get("text 3"), [2.0, 2.0])
+
+def test_model_directory_version_follows_the_model_files(tmp_path):
+    (tmp_path / "config.json").write_text("{}")
+    version = model_directory_version(str(tmp_path))
+    assert model_directory_version(str(tmp_path)) == version
+    (tmp_path / "model.safetensors").write_bytes(b"weights")
+    assert model_directory_version(str(tmp_path)) != version
@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models.database import Base, JobDescription, Match, Profile, User
+from app.routes.web import get_recent_matches, list_matches
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(id=1, email="hr@example.com", username="hr"))
+    session.add_all(Profile(id=i, user_id=1, filename=f"resume{i}.pdf", content="") for i in range(1, 8))
+    session.add_all(JobDescription(id=j, user_id=1, title=f"Engineer {j}", description="") for j in (1, 2, 3))
+    start = datetime(2025, 1, 1)
+    session.add_all(
+        Match(
+            user_id=1, profile_id=i, job_id=j, score=round(((i * 7 + j) % 5) / 5, 1),
+            status=("pending", "reviewed", "rejected")[(i + j) % 3], created_at=start + timedelta(hours=i * j % 4)
+        )
+        for i in range(1, 8) for j in (1, 2, 3)
+    )
+    session.commit()
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *args: queries.append((args[2], args[3])))
+    session.queries = queries
+    yield session
+    session.close()
+
+def fetch(db, cursor=None, sort_by="score_desc", **filters):
+    params = dict(search=None, job_id=None, status=None, score_range=None)
+    params.update(filters)
+    return asyncio.run(list_matches(None, cursor=cursor, per_page=4, sort_by=sort_by, db=db, **params))
+
+def test_keyset_pages_cover_every_match_once_in_order(db):
+    for sort_by, key in [("score_desc", lambda m: (-m.score, -m.id)), ("date_asc", lambda m: (m.created_at, m.id))]:
+        expected = [match.id for match in sorted(db.query(Match).all(), key=key)]
+        seen, cursor = [], None
+        while True:
+            page = fetch(db, cursor, sort_by)
+            seen += [match["id"] for match in page["matches"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == expected
+
+def test_every_page_costs_the_same_queries(db):
+    first = fetch(db, job_id=2)
+    assert first["total"] == 7
+    assert first["stats"]["total_matches"] == 21
+    assert sum(first["stats"]["status_counts"].values()) == 21
+
+    db.queries.clear()
+    page = fetch(db, first["next_cursor"], job_id=2)
+    assert page["total"] is None
+    assert all(match["job"]["id"] == 2 for match in page["matches"])
+    # one grouped stats query and one joined page query, no per-row lookups
+    assert len(db.queries) == 2
+    # SQLite always renders "LIMIT ? OFFSET ?"; the page is reached by seeking, not skipping
+    statement, parameters = db.queries[-1]
+    assert statement.rstrip().endswith("LIMIT ? OFFSET ?") and parameters[-2:] == (5, 0)
+
+def test_cursor_must_match_sort_order(db):
+    cursor = fetch(db)["next_cursor"]
+    with pytest.raises(Exception) as error:
+        fetch(db, cursor, "date_desc")
+    assert error.value.status_code == 400
+
+def test_recent_matches_load_in_one_query(db):
+    db.queries.clear()
+    recent = asyncio.run(get_recent_matches(db=db))["matches"]
+    assert len(recent) == 10
+    assert len(db.queries) == 1
+    assert [match["date"] for match in recent] == sorted((match["date"] for match in recent), reverse=True)
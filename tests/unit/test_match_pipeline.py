@@ -0,0 +1,129 @@
+import asyncio
+import io
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from starlette.datastructures import UploadFile
+from src.document_processor import DocumentProcessor
+from src.match_pipeline import MatchPipeline
+
+class RecordingEngine:
+    """Stand-in for MatchingEngine that records how it was called."""
+
+    def __init__(self):
+        self.batches = []
+        self.threads = set()
+        self.prepared = []
+        self.jobs = set()
+
+    def prepare_job(self, job_description):
+        self.prepared.append(job_description)
+        return ("prepared", job_description)
+
+    def match_many(self, job, profiles):
+        self.batches.append(len(profiles))
+        self.jobs.add(job)
+        self.threads.add(threading.get_ident())
+        return [{'score': len(profile) / 100, 'section_scores': {}, 'matching_skills': [], 'missing_skills': []}
+                for profile in profiles]
+
+@pytest.fixture
+def pipeline():
+    engine = RecordingEngine()
+    pipeline = MatchPipeline(DocumentProcessor(max_workers=2), engine, queue_size=2, batch_size=4)
+    yield pipeline
+    pipeline.close()
+
+def uploads(contents):
+    return [UploadFile(file=io.BytesIO(data), filename=name) for name, data in contents]
+
+async def collect(pipeline, files):
+    return [item async for item in pipeline.run("Skills: Python", files)]
+
+def test_pipeline_matches_every_parsable_upload(pipeline):
+    contents = [(f"cv_{i}.txt", f"Skills: Python {'x' * i}".encode()) for i in range(10)]
+    contents.append(("broken.pdf", b"not a pdf"))
+    results = asyncio.run(collect(pipeline, uploads(contents)))
+
+    assert sorted(name for name, _ in results) == sorted(name for name, _ in contents[:10])
+    assert dict(results)["cv_3.txt"]['score'] == len("Skills: Python xxx") / 100
+    assert sum(pipeline.matching_engine.batches) == 10
+    assert max(pipeline.matching_engine.batches) <= 4
+    assert len(pipeline.matching_engine.threads) == 1
+    assert pipeline.matching_engine.prepared == ["Skills: Python"]
+    assert pipeline.matching_engine.jobs == {("prepared", "Skills: Python")}
+
+def test_pipeline_surfaces_stage_failures(pipeline):
+    def fail(job, profiles):
+        raise RuntimeError("model unavailable")
+    pipeline.matching_engine.match_many = fail
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        asyncio.run(collect(pipeline, uploads([("cv.txt", b"Skills: Go")])))
+
+def test_parse_timeout_only_drops_the_stuck_file(monkeypatch):
+    events = []
+    def parse(data, filename):
+        time.sleep({"slow.txt": 1.0, "a.txt": 0.3, "b.txt": 0.3}[filename])
+        events.append(("parsed", filename))
+        return {'content': data.decode()}
+    monkeypatch.setattr("src.match_pipeline.process_bytes_in_worker", parse)
+
+    processor = DocumentProcessor(max_workers=2, parse_timeout=0.5)
+    pools = []
+    monkeypatch.setattr(processor, "create_worker_pool", lambda workers: pools.append(ThreadPoolExecutor(workers)) or pools[-1])
+    monkeypatch.setattr(processor, "shutdown_worker_pool", lambda pool: events.append(("shutdown", pools.index(pool))))
+    pipeline = MatchPipeline(processor, RecordingEngine(), batch_size=4)
+    try:
+        files = uploads([(name, b"Skills: Python") for name in ("slow.txt", "a.txt", "b.txt")])
+        results = asyncio.run(collect(pipeline, files))
+    finally:
+        pipeline.close()
+
+    assert sorted(name for name, _ in results) == ["a.txt", "b.txt"]
+    # b.txt was still parsing in the first pool when slow.txt timed out
+    assert events.index(("parsed", "b.txt")) < events.index(("shutdown", 0))
+
+class CrashingPool(Executor):
+    """Pool stand-in where parsing crash.txt breaks every pending parse, like a dying worker."""
+
+    def __init__(self, workers):
+        self.lock = threading.Lock()
+        self.pending = []
+        self.broken = False
+
+    def submit(self, fn, data, filename):
+        future = Future()
+        with self.lock:
+            if self.broken:
+                future.set_exception(BrokenProcessPool("pool is broken"))
+                return future
+            self.pending.append(future)
+        def work():
+            time.sleep(0.05 if filename == "crash.txt" else 0.2)
+            with self.lock:
+                if self.broken:
+                    return
+                if filename == "crash.txt":
+                    self.broken = True
+                    for pending in self.pending:
+                        pending.set_exception(BrokenProcessPool("worker died"))
+                    return
+                self.pending.remove(future)
+            future.set_result({'content': data.decode()})
+        threading.Thread(target=work).start()
+        return future
+
+def test_parser_crash_only_drops_the_crashing_file(monkeypatch):
+    processor = DocumentProcessor(max_workers=2)
+    monkeypatch.setattr(processor, "create_worker_pool", CrashingPool)
+    monkeypatch.setattr(processor, "shutdown_worker_pool", lambda pool: None)
+    pipeline = MatchPipeline(processor, RecordingEngine(), batch_size=4)
+    try:
+        files = uploads([(name, b"Skills: Python") for name in ("crash.txt", "a.txt", "b.txt")])
+        results = asyncio.run(collect(pipeline, files))
+    finally:
+        pipeline.close()
+
+    assert sorted(name for name, _ in results) == ["a.txt", "b.txt"]
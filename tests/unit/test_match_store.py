@@ -0,0 +1,51 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.match_store import MatchStore
+
+def match(score, date, **fields):
+    return {"job_id": 1, "resume_name": "cv.pdf", "job_title": "Engineer", "score": score,
+            "date": date, "status": "Pending", **fields}
+
+@pytest.fixture
+def store(tmp_path):
+    store = MatchStore(str(tmp_path / "matches.sqlite"))
+    yield store
+    store.close()
+
+def test_ids_are_unique_and_monotonic_under_concurrent_writes(store):
+    with ThreadPoolExecutor(8) as pool:
+        batches = list(pool.map(
+            lambda i: store.add_many([match(0.5, "2026-10-18T12:00:00")] * 5), range(8)
+        ))
+    ids = [record["id"] for batch in batches for record in batch]
+    assert len(set(ids)) == len(ids) == len(store) == 40
+    assert all(batch == sorted(batch, key=lambda record: record["id"]) for batch in batches)
+    assert store.add(match(0.5, "2026-10-18T12:00:00"))["id"] == max(ids) + 1
+
+def test_recent_and_stats_use_indexes(store):
+    store.add_many([match(0.1 * i, f"2026-10-{i + 10:02d}T09:00:00", matching_skills=["Python"]) for i in range(9)])
+
+    recent = store.recent(3)
+    assert [record["date"][:10] for record in recent] == ["2026-10-18", "2026-10-17", "2026-10-16"]
+    assert recent[0]["matching_skills"] == ["Python"]
+    assert store.get(recent[0]["id"]) == recent[0]
+    assert store.stats(success_threshold=0.7) == {"total": 9, "successful": 2}
+    for query in ("SELECT id, data FROM matches ORDER BY date DESC, id DESC LIMIT 3",
+                  "SELECT COUNT(*) FROM matches WHERE score >= 0.7"):
+        plan = " ".join(row[-1] for row in store._db.execute("EXPLAIN QUERY PLAN " + query))
+        assert "INDEX" in plan and "TEMP B-TREE" not in plan
+
+def test_json_files_are_imported_once(store, tmp_path):
+    matches_dir = tmp_path / "matches"
+    matches_dir.mkdir()
+    for match_id, score in ((1750050744, 0.9), (1750050985, 0.4)):
+        record = {**match(score, f"2025-06-16T0{score * 10:.0f}:00:00"), "id": match_id}
+        (matches_dir / f"match_{match_id}.json").write_text(json.dumps(record))
+    (matches_dir / "match_broken.json").write_text("{")
+
+    assert store.import_json_files(str(matches_dir)) == 2
+    assert store.import_json_files(str(matches_dir)) == 0
+    assert store.get(1750050744)["score"] == 0.9
+    assert store.stats() == {"total": 2, "successful": 1}
+    assert store.add(match(0.5, "2026-10-18T12:00:00"))["id"] == 1750050986
@@ -1,3 +1,5 @@
+import json
+import numpy as np
 import pytest
 from src.matching_engine import MatchingEngine
 from typing import Dict, Any
@@ -215,4 +217,112 @@ def test_match_candidate_missing_fields():
     job = {"skills": []}
     engine = MatchingEngine()
     with pytest.raises(ValueError):
-        engine.match_candidate(profile, job) 
\ No newline at end of file
+        engine.match_candidate(profile, job) 
+
+
+class HashingEncoder:
+    """Deterministic bag-of-words encoder standing in for SentenceTransformer."""
+    dim = 64
+
+    def __init__(self):
+        self.calls = []
+
+    def _vector(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in text.lower().split():
+            vector[sum(map(ord, token)) % self.dim] += 1.0
+        return vector
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        if isinstance(texts, str):
+            self.calls.append(1)
+            return self._vector(texts)
+        self.calls.append(len(texts))
+        return np.stack([self._vector(t) for t in texts])
+
+@pytest.fixture
+def hashing_engine(monkeypatch, tmp_path):
+    encoder = HashingEncoder()
+    monkeypatch.setattr(MatchingEngine, '_load_models', lambda self: setattr(self, 'sentence_model', encoder))
+    return MatchingEngine(config={'embedding_store': {'path': str(tmp_path)}})
+
+BATCH_JOB = """Skills: Python, SQL, Docker
+
+Experience: 5 years building data pipelines
+
+Education: Bachelor in Computer Science
+"""
+
+BATCH_PROFILES = [
+    "Skills: Python, SQL\n\nExperience: 6 years building data pipelines\n\nEducation: Bachelor in Computer Science\n",
+    "Skills: Java\n\nExperience: 2 years of web development\n",
+    "",
+    "Skills: Python, Docker, SQL\n\nExperience: 5 years building data pipelines\n",
+]
+
+def test_match_many_agrees_with_match(hashing_engine):
+    """match_many returns the same scores as calling match() per profile."""
+    batched = hashing_engine.match_many(BATCH_JOB, BATCH_PROFILES)
+    assert len(batched) == len(BATCH_PROFILES)
+    for profile, result in zip(BATCH_PROFILES, batched):
+        single = hashing_engine.match(BATCH_JOB, profile)
+        assert result['score'] == pytest.approx(single['score'], abs=1e-5)
+        assert result['section_scores'].keys() == single['section_scores'].keys()
+        assert sorted(result['matching_skills']) == sorted(single['matching_skills'])
+        assert sorted(result['missing_skills']) == sorted(single['missing_skills'])
+        assert ('error' in result) == ('error' in single)
+
+def test_match_many_encodes_in_batches(hashing_engine):
+    """The job is encoded once and all candidate sections in one call."""
+    hashing_engine.match_many(BATCH_JOB, BATCH_PROFILES)
+    assert len(hashing_engine.sentence_model.calls) == 2
+
+def test_rank_orders_and_truncates(hashing_engine):
+    """rank() sorts by score and keeps the original profile index."""
+    ranked = hashing_engine.rank(BATCH_JOB, BATCH_PROFILES, top_k=2)
+    assert len(ranked) == 2
+    assert ranked[0]['score'] >= ranked[1]['score']
+    assert {r['index'] for r in ranked} <= {0, 3}
+
+def test_prepared_job_is_reused(hashing_engine):
+    """A prepared job scores like the raw text without re-encoding the job."""
+    prepared = hashing_engine.prepare_job(BATCH_JOB)
+    hashing_engine.sentence_model.calls.clear()
+    reused = hashing_engine.match_many(prepared, BATCH_PROFILES)
+    assert len(hashing_engine.sentence_model.calls) == 1
+    for result, expected in zip(reused, hashing_engine.match_many(BATCH_JOB, BATCH_PROFILES)):
+        assert result['score'] == pytest.approx(expected['score'], abs=1e-5)
+        assert sorted(result['missing_skills']) == sorted(expected['missing_skills'])
+
+def test_prepared_job_round_trips_and_expires(hashing_engine):
+    """Persisted artifacts are reused until the description or engine settings change."""
+    prepared = hashing_engine.prepare_job(BATCH_JOB, title="Data Engineer")
+    stored = json.loads(json.dumps(prepared.to_dict()))
+
+    restored = hashing_engine.load_prepared_job(BATCH_JOB, stored)
+    assert restored.section_names == prepared.section_names
+    assert (restored.embeddings == prepared.embeddings).all()
+    assert restored.title == "Data Engineer"
+
+    edited = BATCH_JOB.replace("Docker", "Kubernetes")
+    assert "kubernetes" in hashing_engine.load_prepared_job(edited, stored).skills
+    hashing_engine.weights = hashing_engine._normalize_weights({'skills': 1.0, 'experience': 1.0})
+    assert not hashing_engine.load_prepared_job(BATCH_JOB, stored).is_current(BATCH_JOB, prepared.fingerprint)
+
+def test_prepared_jobs_expire_when_the_skill_registry_changes(hashing_engine):
+    """Adding a skill to the registry changes the prepared-job fingerprint."""
+    fingerprint = hashing_engine.prepared_fingerprint
+    assert hashing_engine.prepared_fingerprint == fingerprint
+    hashing_engine.skill_registry.add_skill(Skill("Dagster", SkillCategory.DATA_SCIENCE, SkillLevel.INTERMEDIATE))
+    assert hashing_engine.prepared_fingerprint != fingerprint
+    with pytest.raises(ValueError, match="^Job description must not be empty$"):
+        hashing_engine.prepare_job("  ")
+
+def test_store_version_follows_the_loaded_backend(monkeypatch, tmp_path):
+    """A configured ONNX backend that fell back to fp32 stores under the fp32 version."""
+    encoder = HashingEncoder()
+    monkeypatch.setattr(MatchingEngine, '_load_models', lambda self: setattr(self, 'sentence_model', encoder))
+    config = {'embedding_store': {'path': str(tmp_path)}, 'embedding_backend': {'type': 'onnx'}}
+    assert MatchingEngine(config=config).embedding_version == '1'
+    encoder.name = 'onnx'
+    assert MatchingEngine(config=config).embedding_version == '1+onnx'
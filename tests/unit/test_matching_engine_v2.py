@@ -0,0 +1,129 @@
+import random
+from datetime import datetime, timedelta
+import pytest
+from src.matching_engine_v2 import (
+    MatchingEngineV2, Resource, ProjectRequirement, Skill, SkillLevel, ExperienceLevel
+)
+from src.advanced_matching import AdvancedMatchingEngine
+from src.enhanced_matching import EnhancedMatchingEngine
+
+SKILLS = ["Python", "Java", "SQL", "AWS", "Docker", "React", "Go", "Kubernetes"]
+CERTS = ["AWS-SA", "CKA", "PMP", "OCP"]
+LOCATIONS = ["London", "Berlin", "Remote"]
+WORK_TYPES = ["REMOTE", "HYBRID", "ONSITE"]
+
+def make_skill(rng, name, level):
+    last_used = rng.choice([None, datetime.now() - timedelta(days=rng.randint(0, 800))])
+    return Skill(name, level, rng.choice([0, 1.5, 3, 4, 7]), rng.randint(1, 5), last_used)
+
+def make_resource(rng, i):
+    return Resource(
+        id=f"R{i}",
+        name=f"Resource {i}",
+        primary_skills=[make_skill(rng, name, SkillLevel.PRIMARY) for name in rng.sample(SKILLS, rng.randint(0, 4))],
+        secondary_skills=[make_skill(rng, name, SkillLevel.SECONDARY) for name in rng.sample(SKILLS, rng.randint(0, 3))],
+        certifications=rng.sample(CERTS, rng.randint(0, 3)),
+        availability_date=datetime.now(),
+        current_status="AVAILABLE",
+        location=rng.choice(LOCATIONS),
+        preferred_roles=["Developer"],
+        notice_period_days=30,
+        salary_expectations=100000,
+        preferred_work_type=rng.choice(WORK_TYPES),
+        preferred_location=rng.choice(LOCATIONS),
+        total_years_experience=rng.randint(0, 10)
+    )
+
+def make_project(project_id, **overrides):
+    fields = dict(
+        id=project_id,
+        title="Platform Engineer",
+        description="Build services",
+        required_primary_skills=["Python", "AWS", "Docker"],
+        required_secondary_skills=["SQL", "Go"],
+        preferred_skills=[],
+        start_date=datetime.now(),
+        duration_months=6,
+        priority=1,
+        location="London",
+        work_type="HYBRID",
+        budget_range=(80000, 120000),
+        client_name="Client",
+        industry="Tech",
+        team_size=5,
+        required_experience_level=ExperienceLevel.ENTRY,
+        required_certifications=["AWS-SA", "CKA"]
+    )
+    fields.update(overrides)
+    return ProjectRequirement(**fields)
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rng = random.Random(42)
+    engine = MatchingEngineV2()
+    for i in range(200):
+        engine.add_resource(make_resource(rng, i))
+    engine.projects["P1"] = make_project("P1")
+    engine.projects["P2"] = make_project(
+        "P2", work_type="REMOTE", required_experience_level=None, required_certifications=["AWS-SA"]
+    )
+    engine.projects["P3"] = make_project("P3", required_secondary_skills=[], work_type="ONSITE")
+    return engine
+
+def find_both(engine, *args, **kwargs):
+    engine.columnar = True
+    columnar = engine.find_matches(*args, **kwargs)
+    engine.columnar = False
+    objects = engine.find_matches(*args, **kwargs)
+    return columnar, objects
+
+@pytest.mark.parametrize("project_id,automated", [("P1", True), ("P2", False), ("P3", True)])
+@pytest.mark.parametrize("filters", [None, {"location": "London"}, {"work_type": "ONSITE", "min_experience": 3}])
+def test_columnar_matches_per_object_path(engine, project_id, automated, filters):
+    columnar, objects = find_both(engine, project_id, automated=automated, filters=filters)
+    assert columnar == objects
+    assert [m["resource_id"] for m in columnar] == [m["resource_id"] for m in objects]
+
+def test_columnar_table_tracks_bench_changes(engine):
+    engine.find_matches("P1")
+    engine.remove_resource("R0")
+    engine.resources["R999"] = make_resource(random.Random(7), 999)
+    columnar, objects = find_both(engine, "P1")
+    assert columnar == objects
+    assert "R0" not in [m["resource_id"] for m in columnar]
+    assert "R999" in [m["resource_id"] for m in columnar]
+
+@pytest.mark.parametrize("columnar", [True, False])
+def test_top_k_matches_head_of_full_ranking(engine, columnar):
+    engine.columnar = columnar
+    full = engine.find_matches("P1")
+    assert engine.find_matches("P1", top_k=25) == full[:25]
+    assert engine.find_matches("P1", top_k=1000) == full
+    assert engine.find_matches("P1", top_k=0) == []
+
+def other_engine(engine, engine_class):
+    other = engine_class()
+    other.resources = dict(engine.resources)
+    other.projects = dict(engine.projects)
+    return other
+
+@pytest.mark.parametrize("engine_class", [AdvancedMatchingEngine, EnhancedMatchingEngine])
+@pytest.mark.parametrize("project_id,automated,filters", [
+    ("P1", True, None), ("P2", False, {"location": "London"}), ("P3", True, {"min_experience": 3})
+])
+def test_top_k_in_other_engines(engine, engine_class, project_id, automated, filters):
+    other = other_engine(engine, engine_class)
+    full = other.find_matches(project_id, automated=automated, filters=filters)
+    assert other.find_matches(project_id, automated=automated, filters=filters, top_k=10) == full[:10]
+    assert other.find_matches(project_id, filters=filters, top_k=1000) == other.find_matches(project_id, filters=filters)
+    assert other.find_matches(project_id, filters=filters, top_k=0) == []
+
+@pytest.mark.parametrize("engine_class", [AdvancedMatchingEngine, EnhancedMatchingEngine, MatchingEngineV2])
+def test_rank_key_agrees_with_match_payload(engine, engine_class):
+    other = other_engine(engine, engine_class)
+    for project in other.projects.values():
+        for resource in other.resources.values():
+            match = other._build_match(resource, project, automated=True)
+            rank = other.match_rank_enum[match["match_rank"]].value
+            assert other._rank_key(resource, project) == (rank, -match["match_score"])
@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from src.mistral_matching import MistralMatchingEngine
+
+def make_engine(tmp_path, chunking):
+    # Skip the multi-GB model download; only the embedding plumbing is exercised
+    engine = MistralMatchingEngine.__new__(MistralMatchingEngine)
+    engine.config = {"embedding_store": {"path": str(tmp_path)}, "embedding_chunking": {"enabled": chunking, "chunk_words": 4, "overlap_words": 0}}
+    engine.model_path = tmp_path
+    engine.model_name = "mistralai/Magistral-Small-2506"
+    engine.device = "cpu"
+    engine.executor = ThreadPoolExecutor(max_workers=1)
+    engine.encoded = []
+    def encode_chunks(texts):
+        engine.encoded.extend(texts)
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+    engine._encode_chunks = encode_chunks
+    engine._open_mistral_stores()
+    return engine
+
+def test_unchunked_embeddings_are_stored(tmp_path):
+    engine = make_engine(tmp_path, chunking=False)
+    job, profile = engine._generate_embeddings(["python developer", "senior python developer with sql"])
+    assert job.chunks.shape == (1, 2) and profile.chunks.shape == (1, 2)
+    assert np.linalg.norm(job.pooled) == pytest.approx(1.0)
+    engine._generate_embeddings(["python developer", "senior python developer with sql"])
+    assert engine.encoded == ["python developer", "senior python developer with sql"]
+
+def test_chunking_follows_the_config_flag(tmp_path):
+    engine = make_engine(tmp_path, chunking=True)
+    (document,) = engine._generate_embeddings(["one two three four five six"])
+    assert document.chunks.shape == (2, 2)
+    assert engine.encoded == ["one two three four", "five six"]
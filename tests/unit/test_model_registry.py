@@ -0,0 +1,52 @@
+import threading
+import pytest
+from src.model_registry import ModelRegistry, process_rss
+
+@pytest.fixture
+def registry():
+    return ModelRegistry()
+
+def test_model_is_loaded_once_and_shared(registry):
+    loads = []
+    def loader():
+        loads.append(1)
+        return object()
+
+    first = registry.get("encoder", loader)
+    assert registry.get("encoder", loader) is first
+    assert "encoder" in registry
+    assert len(loads) == 1
+
+def test_concurrent_first_use_loads_once(registry):
+    loads = []
+    def loader():
+        loads.append(1)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("encoder", loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1
+    assert len({id(model) for model in results}) == 1
+
+def test_stats_report_load_time_and_memory(registry):
+    registry.get("encoder", lambda: bytearray(8 * 1024 * 1024))
+    stats = registry.stats()
+    assert set(stats["models"]) == {"encoder"}
+    assert stats["models"]["encoder"]["load_seconds"] >= 0
+    if process_rss() is not None:
+        assert stats["process_rss_bytes"] > 0
+        assert stats["models"]["encoder"]["rss_delta_bytes"] is not None
+
+def test_failed_load_is_retried(registry):
+    def fail():
+        raise OSError("weights missing")
+    with pytest.raises(OSError):
+        registry.get("encoder", fail)
+    assert "encoder" not in registry
+    assert registry.get("encoder", lambda: "model") == "model"
+    registry.unload("encoder")
+    assert registry.stats()["models"] == {}
@@ -0,0 +1,59 @@
+import pytest
+from src.document_processor import DocumentProcessor
+from src.parse_cache import ParseCache
+
+@pytest.fixture
+def processor():
+    return DocumentProcessor(parse_cache=ParseCache())
+
+def test_overwritten_file_is_not_served_stale(processor, tmp_path):
+    path = tmp_path / "rme_temp_resume.txt"
+    path.write_text("Skills: Python")
+    assert processor.process_document(str(path))['content'] == "Skills: Python"
+    path.write_text("Skills: Rust")
+    assert processor.process_document(str(path))['content'] == "Skills: Rust"
+
+def test_same_content_skips_parsing(processor, tmp_path, monkeypatch):
+    calls = []
+    read_txt = processor.stream_readers['.txt']
+    monkeypatch.setitem(processor.stream_readers, '.txt', lambda *args: calls.append(1) or read_txt(*args))
+    path = tmp_path / "a.txt"
+    path.write_text("Skills: Go")
+    processor.process_document(str(path))
+    result = processor.process_bytes(b"Skills: Go", "upload.txt")
+    assert result['content'] == "Skills: Go"
+    assert result['metadata']['filename'] == "upload.txt"
+    assert len(calls) == 1
+    assert processor.parse_cache.hits == 1
+
+def test_key_depends_on_format_and_version():
+    cache = ParseCache()
+    assert cache.key(b"data", ".txt") != cache.key(b"data", ".pdf")
+    assert cache.key(b"data", ".txt") != ParseCache(version="2").key(b"data", ".txt")
+    assert cache.key(memoryview(b"data"), ".txt") == cache.key(b"data", ".txt")
+
+def test_memory_tier_evicts_least_recently_used_by_size():
+    text = "x" * 1000
+    cache = ParseCache(max_bytes=2500)
+    cache.put("a", text)
+    cache.put("b", text)
+    cache.get("a")
+    cache.put("c", text)
+    assert cache.get("b") is None
+    assert cache.get("a") == text and cache.get("c") == text
+    assert cache.memory_bytes <= 2500
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = tmp_path / "parse_cache.sqlite"
+    ParseCache(path=str(path)).put("k", "Skills: SQL")
+    reopened = ParseCache(path=str(path))
+    assert reopened.get("k") == "Skills: SQL"
+    assert len(reopened) == 1
+
+def test_injected_empty_cache_is_used():
+    cache = ParseCache()
+    assert len(cache) == 0
+    processor = DocumentProcessor(parse_cache=cache)
+    assert processor.parse_cache is cache
+    processor.process_bytes(b"Skills: Kotlin", "upload.txt")
+    assert len(cache) == 1
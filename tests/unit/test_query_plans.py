@@ -0,0 +1,110 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+import pytest
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import sessionmaker
+from app.models.database import Base, JobDescription, Match, Profile, User
+from app.core.matches import upsert_matches
+from app.core.rematch import mark_dirty
+from app.routes import web
+
+MIGRATION = Path(__file__).parents[2] / "alembic" / "versions" / "match_indexes.py"
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return engine
+
+def route_queries(engine):
+    """Run the Match routes and return every statement they sent to SQLite."""
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    db = sessionmaker(bind=engine)()
+    filters = dict(search=None, job_id=None, status=None, score_range=None)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for sort_by in ("score_desc", "date_desc"):
+            for extra in ({}, {"job_id": 1}, {"status": "pending"}):
+                asyncio.run(web.list_matches(None, cursor=None, per_page=10, sort_by=sort_by, db=db, **{**filters, **extra}))
+        asyncio.run(web.get_recent_matches(db=db))
+        asyncio.run(web.get_dashboard_stats(db=db))
+        asyncio.run(web.get_dashboard_activity(db=db))
+        db.query(Match).filter(Match.user_id == 1).all()  # api.list_matches
+        mark_dirty(db, profile_ids=[1], job_ids=[1])
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+        db.close()
+    return [(statement, parameters) for statement, parameters in statements if " matches" in statement]
+
+def query_plan(engine, statement, parameters):
+    with engine.connect() as connection:
+        return [row[-1] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+
+def test_match_routes_use_indexes(engine):
+    statements = route_queries(engine)
+    assert len(statements) > 10
+    for statement, parameters in statements:
+        for step in query_plan(engine, statement, parameters):
+            if step.startswith("SCAN matches"):
+                assert "INDEX" in step, f"full table scan of matches:\n{statement}\n{step}"
+
+def test_keyset_orderings_need_no_sort(engine):
+    statements = [
+        (statement, parameters) for statement, parameters in route_queries(engine)
+        if "ORDER BY matches.score DESC, matches.id DESC" in statement and "WHERE" not in statement
+    ]
+    assert statements
+    for statement, parameters in statements:
+        assert not any("TEMP B-TREE" in step for step in query_plan(engine, statement, parameters))
+
+def test_upsert_updates_existing_pair(engine):
+    db = sessionmaker(bind=engine)()
+    db.add_all([User(id=1, email="hr@example.com", username="hr"), Profile(id=1, content=""), JobDescription(id=1, description="")])
+    db.commit()
+    upsert_matches(db, [{"user_id": 1, "profile_id": 1, "job_id": 1, "score": 0.2, "analysis": {}}])
+    db.commit()
+    db.query(Match).one().status = "reviewed"
+    db.commit()
+    upsert_matches(db, [{"user_id": 1, "profile_id": 1, "job_id": 1, "score": 0.9, "analysis": {"v": 2}}])
+    db.commit()
+    match = db.query(Match).one()
+    db.refresh(match)
+    assert (match.score, match.analysis, match.status) == (0.9, {"v": 2}, "reviewed")
+    db.close()
+
+def test_migration_dedupes_and_indexes_existing_database(engine):
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+    spec = importlib.util.spec_from_file_location("match_indexes", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    with engine.begin() as connection:
+        # Schema as it was before the migration (001), with a duplicated pair
+        connection.exec_driver_sql("DROP TABLE matches")
+        connection.exec_driver_sql(
+            "CREATE TABLE matches (id INTEGER NOT NULL PRIMARY KEY, profile_id INTEGER, job_id INTEGER, "
+            "score FLOAT NOT NULL, analysis JSON, status VARCHAR, created_at DATETIME, updated_at DATETIME)"
+        )
+        connection.exec_driver_sql("CREATE INDEX ix_matches_score ON matches (score)")
+        for score in (0.1, 0.2, 0.3):
+            connection.exec_driver_sql(f"INSERT INTO matches (profile_id, job_id, score) VALUES (1, 1, {score})")
+        connection.exec_driver_sql("INSERT INTO matches (profile_id, job_id, score) VALUES (2, 1, 0.5)")
+
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+        names = {index["name"] for index in inspect(connection).get_indexes("matches")}
+        assert {"uq_matches_profile_job", "ix_matches_score_id", "ix_matches_job_id_score"} <= names
+        assert "ix_matches_score" not in names
+        rows = connection.exec_driver_sql("SELECT profile_id, score FROM matches ORDER BY profile_id").fetchall()
+        assert [tuple(row) for row in rows] == [(1, 0.3), (2, 0.5)]
+        columns = {column["name"]: column for column in inspect(connection).get_columns("matches")}
+        assert not columns["created_at"]["nullable"]
+        assert connection.exec_driver_sql("SELECT COUNT(*) FROM matches WHERE created_at IS NULL").scalar() == 0
+
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.downgrade()
+        assert {index["name"] for index in inspect(connection).get_indexes("matches")} >= {"ix_matches_score"}
@@ -0,0 +1,147 @@
+import asyncio
+import importlib.util
+import threading
+from pathlib import Path
+import pytest
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models.database import Base, JobDescription, Match, MatchDirty, Profile, User
+from app.core.rematch import RematchWorker, enable_change_tracking, enqueue_pairs
+
+MIGRATION = Path(__file__).parents[2] / "alembic" / "versions" / "match_dirty.py"
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    enable_change_tracking(factory)
+
+    session = factory()
+    session.add(User(id=1, email="hr@example.com", username="hr"))
+    session.add_all(Profile(id=i, user_id=1, filename=f"p{i}.txt", content=f"resume {i}", is_active=True) for i in (1, 2))
+    session.add_all(JobDescription(id=j, user_id=1, title=f"job {j}", description=f"job text {j}", is_active=True) for j in (1, 2))
+    session.add_all(
+        Match(user_id=1, profile_id=i, job_id=j, score=0.0, analysis={}, status="pending")
+        for i in (1, 2) for j in (1, 2)
+    )
+    session.commit()
+    session.close()
+    return factory
+
+def queued(factory):
+    session = factory()
+    pairs = {(row.profile_id, row.job_id) for row in session.query(MatchDirty)}
+    session.close()
+    return pairs
+
+def make_worker(factory, calls, fail=()):
+    async def match_fn(profile_text, job_text):
+        calls.append((profile_text, job_text))
+        if (profile_text, job_text) in fail:
+            raise RuntimeError("model error")
+        return 0.5, {"profile": profile_text, "job": job_text}
+    return RematchWorker(factory, match_fn=match_fn)
+
+def test_edits_queue_only_affected_pairs(session_factory):
+    session = session_factory()
+    session.get(Profile, 1).filename = "renamed.txt"
+    session.commit()
+    assert queued(session_factory) == set()
+
+    session.get(Profile, 1).content = "resume 1, now with Kubernetes"
+    session.get(JobDescription, 2).skills = ["kubernetes"]
+    session.commit()
+    session.close()
+    assert queued(session_factory) == {(1, 1), (1, 2), (2, 2)}
+
+def test_worker_rescores_dirty_pairs_in_bulk(session_factory):
+    session = session_factory()
+    session.get(Profile, 2).content = "updated resume"
+    session.commit()
+    session.close()
+
+    calls = []
+    assert asyncio.run(make_worker(session_factory, calls).run_once()) == 2
+    assert sorted(calls) == [("updated resume", "job text 1"), ("updated resume", "job text 2")]
+    assert queued(session_factory) == set()
+
+    session = session_factory()
+    scores = {(match.profile_id, match.job_id): match.score for match in session.query(Match)}
+    session.close()
+    assert scores == {(1, 1): 0.0, (1, 2): 0.0, (2, 1): 0.5, (2, 2): 0.5}
+
+def test_new_pairs_are_inserted_and_failures_retried(session_factory):
+    session = session_factory()
+    session.add(Profile(id=3, user_id=1, filename="p3.txt", content="resume 3", is_active=True))
+    session.flush()
+    enqueue_pairs(session, [(3, 1), (3, 2)], reason="new profile")
+    session.commit()
+    session.close()
+
+    calls = []
+    worker = make_worker(session_factory, calls, fail={("resume 3", "job text 2")})
+    asyncio.run(worker.run_once())
+    assert queued(session_factory) == {(3, 2)}
+    assert worker.stats()["failed"] == 1
+
+    session = session_factory()
+    assert session.query(Match).filter(Match.profile_id == 3).one().job_id == 1
+    assert session.query(MatchDirty).one().attempts == 1
+    session.close()
+
+def test_edits_bind_ids_not_pairs(session_factory):
+    session = session_factory()
+    session.add_all(Profile(id=i, user_id=1, filename=f"p{i}.txt", content=f"resume {i}", is_active=True) for i in range(3, 503))
+    session.add_all(Match(user_id=1, profile_id=i, job_id=1, score=0.0, analysis={}, status="pending") for i in range(3, 503))
+    session.commit()
+
+    parameters = []
+    def record(conn, cursor, statement, params, context, executemany):
+        if "match_dirty" in statement:
+            parameters.append(len(params))
+    engine = session_factory.kw["bind"]
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        session.get(JobDescription, 1).description = "job text 1, now remote"
+        session.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    session.close()
+    assert len(queued(session_factory)) == 502
+    assert parameters and max(parameters) < 10
+
+def test_database_work_runs_off_the_event_loop(session_factory):
+    session = session_factory()
+    session.get(Profile, 1).content = "edited resume"
+    session.commit()
+    session.close()
+
+    threads = []
+    def record(conn, cursor, statement, *args):
+        threads.append(threading.get_ident())
+    engine = session_factory.kw["bind"]
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        asyncio.run(make_worker(session_factory, []).run_once())
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert threads and threading.get_ident() not in threads
+
+def test_migration_creates_the_queue_table(session_factory):
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+    spec = importlib.util.spec_from_file_location("match_dirty_migration", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    session = session_factory()
+    with Operations.context(MigrationContext.configure(session.connection())):
+        migration.downgrade()
+        assert "match_dirty" not in inspect(session.connection()).get_table_names()
+        migration.upgrade()
+    session.get(Profile, 1).content = "edited after migrating"
+    session.commit()
+    session.close()
+    assert queued(session_factory) == {(1, 1), (1, 2)}
@@ -86,4 +86,25 @@ def test_get_skills_by_tag_and_alias():
     assert any('Agile Methodologies' == s.name for s in devops_skills)
     # Test alias
     agile_skills = registry.get_skills_by_alias('Agile')
-    assert any('Agile Methodologies' == s.name for s in agile_skills) 
\ No newline at end of file
+    assert any('Agile Methodologies' == s.name for s in agile_skills)
+
+def test_readding_skill_updates_indexes():
+    registry = SkillRegistry()
+    registry.add_skill(Skill("Rust", SkillCategory.PROGRAMMING, SkillLevel.BEGINNER, tags=["systems"], aliases=["rustlang"]))
+    registry.add_skill(Skill("rust", SkillCategory.SPECIALIZED, SkillLevel.EXPERT, tags=["embedded"]))
+    assert registry.get_skills_by_tag("SYSTEMS") == []
+    assert registry.get_skills_by_alias("rustlang") == []
+    assert [s.level for s in registry.get_skills_by_tag("Embedded")] == [SkillLevel.EXPERT]
+    assert all(s.name.lower() != "rust" for s in registry.get_skills_by_category(SkillCategory.PROGRAMMING))
+    assert registry.get_all_skills()[-1].name == "rust"
+
+def test_search_skills_matches_substrings_in_order():
+    registry = SkillRegistry(skills=[])
+    registry.add_skill(Skill("Google Cloud", SkillCategory.CLOUD, SkillLevel.INTERMEDIATE))
+    registry.add_skill(Skill("Terraform", SkillCategory.DEVOPS, SkillLevel.ADVANCED, description="Infrastructure for any CLOUD"))
+    registry.add_skill(Skill("Kubernetes", SkillCategory.DEVOPS, SkillLevel.ADVANCED, aliases=["k8s"]))
+    assert [s.name for s in registry.search_skills("cloud")] == ["Google Cloud", "Terraform"]
+    assert [s.name for s in registry.search_skills("K8")] == ["Kubernetes"]
+    assert [s.name for s in registry.search_skills("ubernete")] == ["Kubernetes"]
+    assert registry.search_skills("cloudy") == []
+    assert len(registry.search_skills("")) == 3
@@ -0,0 +1,34 @@
+import pytest
+from src.skill_categories import Skill, SkillCategory, SkillLevel, SkillRegistry
+from src.skill_matcher import SkillMatcher, get_skill_matcher
+
+@pytest.fixture
+def matcher():
+    registry = SkillRegistry()
+    registry._skills = []
+    registry.add_skill(Skill("Java", SkillCategory.PROGRAMMING, SkillLevel.INTERMEDIATE))
+    registry.add_skill(Skill("JavaScript", SkillCategory.PROGRAMMING, SkillLevel.INTERMEDIATE, aliases=["JS"]))
+    registry.add_skill(Skill("C++", SkillCategory.PROGRAMMING, SkillLevel.ADVANCED))
+    registry.add_skill(Skill("Machine Learning", SkillCategory.ML_FRAMEWORKS, SkillLevel.ADVANCED, aliases=["ML"]))
+    registry.add_skill(Skill("Kubernetes", SkillCategory.DEVOPS, SkillLevel.ADVANCED, aliases=["k8s"]))
+    return SkillMatcher.from_registry(registry)
+
+def test_matches_names_and_aliases_on_word_boundaries(matcher):
+    text = "Built JavaScript (JS) apps, some C++, and machine\nlearning on K8S."
+    assert matcher.extract(text) == ["JavaScript", "C++", "Machine Learning", "Kubernetes"]
+    assert "Java" not in matcher.extract("Javanese and JavaScripting")
+
+def test_find_all_reports_offsets(matcher):
+    text = "Java, ML and Java"
+    assert matcher.find_all(text) == [(0, 4, "Java"), (6, 8, "Machine Learning"), (13, 17, "Java")]
+    assert matcher.extract(text) == ["Java", "Machine Learning"]
+
+def test_overlapping_terms_are_all_reported():
+    matcher = SkillMatcher([("he", "he"), ("she", "she"), ("hers", "hers"), ("his", "his")])
+    assert [label for _, _, label in matcher.find_all("ushers")] == []
+    assert matcher.extract("she said hers, not his") == ["she", "hers", "his"]
+
+def test_shared_matcher_uses_default_registry():
+    matcher = get_skill_matcher()
+    assert matcher is get_skill_matcher()
+    assert "Agile Methodologies" in matcher.extract("Worked in Scrum teams")
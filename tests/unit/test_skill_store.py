@@ -0,0 +1,45 @@
+import json
+import pytest
+from src.skill_store import SkillStore
+
+@pytest.fixture
+def store(tmp_path):
+    store = SkillStore(str(tmp_path / "skills.sqlite"))
+    yield store
+    store.close()
+
+def test_top_skills_groups_normalized_skills(store):
+    store.set_profile_skills("jane_cv", ["Python", {"name": "SQL"}, " python "])
+    store.set_profile_skills("john_cv", ["python", "Machine  Learning"])
+    profile_id = store.set_profile_skills("joe_cv", ["Python", "SQL"])
+
+    assert store.top_skills(limit=2) == [{"name": "Python", "count": 3}, {"name": "SQL", "count": 2}]
+    assert store.set_profile_skills("joe_cv", ["Docker"]) == profile_id
+    assert store.top_skills() == [
+        {"name": "Python", "count": 2}, {"name": "Docker", "count": 1},
+        {"name": "Machine Learning", "count": 1}, {"name": "SQL", "count": 1}
+    ]
+    assert store._db.execute("SELECT COUNT(*) FROM skills").fetchone()[0] == 4
+
+def test_top_skills_are_cached_until_a_write(store):
+    store.set_profile_skills("jane_cv", ["Python"])
+    statements = []
+    store._db.set_trace_callback(statements.append)
+    store.top_skills()
+    store.top_skills()
+    store.set_profile_skills("john_cv", ["Python"])
+    assert store.top_skills() == [{"name": "Python", "count": 2}]
+    assert store.top_skills(ttl=0) == [{"name": "Python", "count": 2}]
+    store._db.set_trace_callback(None)
+    assert sum("GROUP BY" in statement for statement in statements) == 3
+
+def test_metadata_files_are_imported_once(store, tmp_path):
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    (resumes / "jane_cv_metadata.json").write_text(json.dumps({"skills": ["Python", "SQL"]}))
+    (resumes / "john_cv_metadata.json").write_text(json.dumps({"skills": ["SQL"]}))
+    (resumes / "broken_metadata.json").write_text("{")
+
+    assert store.import_metadata_files(str(resumes)) == 2
+    assert store.import_metadata_files(str(resumes)) == 0
+    assert store.top_skills() == [{"name": "SQL", "count": 2}, {"name": "Python", "count": 1}]
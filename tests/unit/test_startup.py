@@ -0,0 +1,40 @@
+import subprocess
+import sys
+import pytest
+from src.startup import ModelWarmup, parse_importtime, profile_imports
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2500 |      40000 |     numpy._core
+import time:      1800 |      93000 |   numpy
+"""
+
+def test_parse_importtime():
+    entries = parse_importtime(IMPORTTIME_OUTPUT)
+    assert [entry["module"] for entry in entries] == ["_io", "numpy._core", "numpy"]
+    assert entries[2]["cumulative_ms"] == 93.0
+    assert entries[1]["self_ms"] == 2.5
+    assert entries[1]["depth"] == 2
+
+def test_profile_reports_imported_modules():
+    profile = profile_imports("json")
+    assert profile["error"] is None
+    assert "json" in {entry["module"] for entry in profile["modules"]}
+
+@pytest.mark.parametrize("module", ["src.matching_engine", "src.matching_engine_v2"])
+def test_engines_import_without_heavy_libraries(module):
+    heavy = ["torch", "transformers", "sentence_transformers", "spacy", "sklearn", "matplotlib", "seaborn"]
+    code = f"import sys, {module}; print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+def test_warmup_reports_each_model():
+    def fail():
+        raise OSError("weights missing")
+    warmup = ModelWarmup({"encoder": lambda: "model", "ner": fail})
+    assert warmup.status()["models"]["encoder"]["state"] == "pending"
+    warmup.start().join()
+    status = warmup.status()
+    assert status["models"]["encoder"]["state"] == "ready"
+    assert status["models"]["ner"]["state"] == "failed"
+    assert not status["ready"]
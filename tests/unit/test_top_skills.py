@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.models.database import Base, Profile, Skill
+from app.core import skills
+from app.routes import web
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    skills.invalidate_top_skills()
+    yield session
+    session.close()
+    skills.invalidate_top_skills()
+
+def ingest(db, *names):
+    profile = Profile(filename=f"resume_{len(names)}", content="")
+    db.add(profile)
+    skills.set_profile_skills(db, profile, names)
+    db.commit()
+    return profile
+
+def test_skills_are_normalized_and_shared(db):
+    ingest(db, "Python", {"name": "SQL", "category": "database"}, " python ")
+    profile = ingest(db, "python", "Machine  Learning")
+
+    assert sorted(skill.name for skill in profile.skills) == ["Machine Learning", "Python"]
+    assert db.query(Skill).count() == 3
+    assert db.query(Skill).filter(Skill.name == "SQL").one().category == "database"
+
+def test_top_skills_groups_by_skill(db):
+    ingest(db, "Python", "SQL")
+    ingest(db, "Python", "React")
+    profile = ingest(db, "Python", "SQL", "Docker")
+
+    assert skills.top_skills(db, limit=2) == [{"name": "Python", "count": 3}, {"name": "SQL", "count": 2}]
+    skills.set_profile_skills(db, profile, ["Docker"])
+    db.commit()
+    assert skills.top_skills(db) == [
+        {"name": "Python", "count": 2}, {"name": "Docker", "count": 1}, {"name": "React", "count": 1}, {"name": "SQL", "count": 1}
+    ]
+    assert asyncio.run(web.get_top_skills(db=db))["skills"][0] == {"name": "Python", "count": 2}
+
+def test_top_skills_are_cached_until_ingestion(db):
+    ingest(db, "Python")
+    statements = []
+    engine = db.get_bind()
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        skills.top_skills(db)
+        skills.top_skills(db)
+        assert len(statements) == 1
+        ingest(db, "Python")
+        assert skills.top_skills(db) == [{"name": "Python", "count": 2}]
+        assert skills.top_skills(db, ttl=0) == [{"name": "Python", "count": 2}]
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert sum("GROUP BY" in statement for statement in statements) == 3
+
+def test_existing_profiles_are_backfilled(db):
+    db.add(Profile(filename="old.pdf", content="", profile_metadata={"skills": [{"name": "Python"}]}))
+    db.commit()
+    assert skills.backfill_profile_skills(db) == 1
+    assert skills.backfill_profile_skills(db) == 0
+    assert skills.top_skills(db) == [{"name": "Python", "count": 1}]
+
+def test_top_skills_skip_deactivated_profiles(db):
+    ingest(db, "Python", "SQL")
+    profile = ingest(db, "Python")
+    profile.is_active = False
+    db.commit()
+    assert skills.top_skills(db) == [{"name": "Python", "count": 1}, {"name": "SQL", "count": 1}]